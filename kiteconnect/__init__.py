@@ -111,5 +111,22 @@ from __future__ import unicode_literals, absolute_import
 from kiteconnect import exceptions
 from kiteconnect.connect import KiteConnect
 from kiteconnect.ticker import KiteTicker
-
-__all__ = ["KiteConnect", "KiteTicker", "exceptions"]
+from kiteconnect.async_connect import AsyncKiteConnect
+from kiteconnect.async_ticker import AsyncKiteTicker
+from kiteconnect.ticker_pool import KiteTickerPool
+from kiteconnect.tick_queue import TickQueue
+from kiteconnect.shared_ticks import SharedTickTable
+from kiteconnect.market_state import MarketStateBook
+from kiteconnect.candles import CandleAggregator
+from kiteconnect.runner import Strategy, StrategyRunner
+from kiteconnect.state import StateStore
+from kiteconnect.order_tracker import OrderTracker
+from kiteconnect.margin_estimator import MarginEstimator
+from kiteconnect.ratelimit import RateLimiter
+from kiteconnect.cache import ResponseCache
+from kiteconnect.instruments import InstrumentCache, InstrumentIndex
+
+__all__ = ["KiteConnect", "AsyncKiteConnect", "KiteTicker", "AsyncKiteTicker", "KiteTickerPool", "TickQueue",
+           "SharedTickTable", "MarketStateBook", "CandleAggregator", "Strategy", "StrategyRunner",
+           "StateStore", "OrderTracker", "MarginEstimator", "RateLimiter", "ResponseCache", "InstrumentCache",
+           "InstrumentIndex", "exceptions"]
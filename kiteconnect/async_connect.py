@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""
+    async_connect.py
+
+    asyncio API wrapper for Kite Connect REST APIs.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import csv
+import asyncio
+import hashlib
+import logging
+
+from .connect import KiteConnect
+from .ratelimit import RateLimiter
+from .dateparse import parse_datetime
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+log = logging.getLogger(__name__)
+
+
+class AsyncKiteConnect(KiteConnect):
+    """
+    The Kite Connect API wrapper class for asyncio applications.
+
+    `AsyncKiteConnect` exposes the same methods as `KiteConnect`, but every API call
+    returns an awaitable and is sent over a single pooled `aiohttp` session, so many
+    calls can be in flight from one event loop. It requires the `aiohttp` package
+    (`pip install kiteconnect[async]`).
+
+        #!python
+        import asyncio
+        from kiteconnect import AsyncKiteConnect
+
+        async def main():
+            async with AsyncKiteConnect(api_key="your_api_key", access_token="your_access_token") as kite:
+                orders, positions = await asyncio.gather(kite.orders(), kite.positions())
+
+        asyncio.run(main())
+
+    Methods which only send a request return the transport coroutine directly, the
+    rest are coroutine functions that format the response the same way `KiteConnect` does.
+    """
+
+    # Default size of the shared connection pool.
+    _default_pool_size = 100
+
+    def __init__(self,
+                 api_key,
+                 access_token=None,
+                 root=None,
+                 debug=False,
+                 timeout=None,
+                 proxy=None,
+                 pool=None,
+                 disable_ssl=False,
+                 rate_limiter=None,
+                 response_cache=None):
+        """
+        Initialise a new asyncio Kite Connect client instance.
+
+        - `api_key`, `access_token`, `root`, `debug`, `timeout`, `disable_ssl`, `rate_limiter`
+        and `response_cache` are the same as in `KiteConnect`.
+        - `proxy` is the proxy url to send requests through.
+        - `pool` is a dict of params accepted by `aiohttp.TCPConnector`, for example `{"limit": 200}`.
+        The default pool allows 100 simultaneous connections.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncKiteConnect requires aiohttp. Install it with `pip install kiteconnect[async]`.")
+
+        self.debug = debug
+        self.api_key = api_key
+        self.session_expiry_hook = None
+        self.disable_ssl = disable_ssl
+        self.access_token = access_token
+        self.proxy = proxy
+        self.pool = pool or {}
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self._pacer = RateLimiter()
+
+        self.root = root or self._default_root_uri
+        self.timeout = timeout or self._default_timeout
+
+        # aiohttp sessions have to be created inside a running event loop,
+        # so the shared session is created on the first request.
+        self.reqsession = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP session and its pooled connections."""
+        if self.reqsession is not None:
+            await self.reqsession.close()
+            self.reqsession = None
+
+    def _get_session(self):
+        """Get the shared HTTP session, creating it if required."""
+        if self.reqsession is None or self.reqsession.closed:
+            pool = {"limit": self._default_pool_size}
+            pool.update(self.pool)
+            if self.disable_ssl:
+                pool["ssl"] = False
+
+            # Like the `requests` timeout of `KiteConnect`, `timeout` applies to connecting and to
+            # every read, not the whole request, so long downloads and streams aren't cut short.
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+            self.reqsession = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**pool), timeout=timeout)
+
+        return self.reqsession
+
+    async def generate_session(self, request_token, api_secret):
+        """
+        Generate user session details like `access_token` etc by exchanging `request_token`.
+        Access token is automatically set if the session is retrieved successfully.
+
+        - `request_token` is the token obtained from the GET paramers after a successful login redirect.
+        - `api_secret` is the API api_secret issued with the API key.
+        """
+        h = hashlib.sha256(self.api_key.encode("utf-8") + request_token.encode("utf-8") + api_secret.encode("utf-8"))
+        checksum = h.hexdigest()
+
+        resp = await self._post("api.token", params={
+            "api_key": self.api_key,
+            "request_token": request_token,
+            "checksum": checksum
+        })
+
+        if "access_token" in resp:
+            self.set_access_token(resp["access_token"])
+
+        if resp["login_time"] and len(resp["login_time"]) == 19:
+            resp["login_time"] = parse_datetime(resp["login_time"])
+
+        return resp
+
+    async def renew_access_token(self, refresh_token, api_secret):
+        """
+        Renew expired `refresh_token` using valid `refresh_token`.
+
+        - `refresh_token` is the token obtained from previous successful login flow.
+        - `api_secret` is the API api_secret issued with the API key.
+        """
+        h = hashlib.sha256(self.api_key.encode("utf-8") + refresh_token.encode("utf-8") + api_secret.encode("utf-8"))
+        checksum = h.hexdigest()
+
+        resp = await self._post("api.token.renew", params={
+            "api_key": self.api_key,
+            "refresh_token": refresh_token,
+            "checksum": checksum
+        })
+
+        if "access_token" in resp:
+            self.set_access_token(resp["access_token"])
+
+        return resp
+
+    # orders
+    async def place_order(self,
+                          variety,
+                          exchange,
+                          tradingsymbol,
+                          transaction_type,
+                          quantity,
+                          product,
+                          order_type,
+                          price=None,
+                          validity=None,
+                          validity_ttl=None,
+                          disclosed_quantity=None,
+                          trigger_price=None,
+                          iceberg_legs=None,
+                          iceberg_quantity=None,
+                          auction_number=None,
+                          tag=None):
+        """Place an order."""
+        params = locals()
+        del (params["self"])
+
+        for k in list(params.keys()):
+            if params[k] is None:
+                del (params[k])
+
+        return (await self._post("order.place",
+                                 url_args={"variety": variety},
+                                 params=params))["order_id"]
+
+    async def modify_order(self,
+                           variety,
+                           order_id,
+                           parent_order_id=None,
+                           quantity=None,
+                           price=None,
+                           order_type=None,
+                           trigger_price=None,
+                           validity=None,
+                           disclosed_quantity=None):
+        """Modify an open order."""
+        params = locals()
+        del (params["self"])
+
+        for k in list(params.keys()):
+            if params[k] is None:
+                del (params[k])
+
+        return (await self._put("order.modify",
+                                url_args={"variety": variety, "order_id": order_id},
+                                params=params))["order_id"]
+
+    async def cancel_order(self, variety, order_id, parent_order_id=None):
+        """Cancel an order."""
+        return (await self._delete("order.cancel",
+                                   url_args={"variety": variety, "order_id": order_id},
+                                   params={"parent_order_id": parent_order_id}))["order_id"]
+
+    async def place_orders(self, orders, max_workers=10):
+        """Place several orders concurrently. Takes the same arguments as `KiteConnect.place_orders`."""
+        self._validate_bulk(orders, self._bulk_place_args)
+        return await self._dispatch_bulk("order.place", lambda order: self.place_order(**order), orders, max_workers)
+
+    async def cancel_orders(self, orders, max_workers=10):
+        """Cancel several orders concurrently. Takes the same arguments as `KiteConnect.cancel_orders`."""
+        self._validate_bulk(orders, self._bulk_cancel_args)
+        return await self._dispatch_bulk("order.cancel", lambda order: self.cancel_order(**order), orders,
+                                         max_workers)
+
+    async def exit_all_positions(self, product=None, variety=KiteConnect.VARIETY_REGULAR, tag=None, max_workers=10):
+        """Square off every open net position. Takes the same arguments as `KiteConnect.exit_all_positions`."""
+        orders = self._exit_orders((await self.positions())["net"], product, variety, tag)
+        return (await self.place_orders(orders, max_workers=max_workers)) if orders else []
+
+    async def _dispatch_bulk(self, route, send, orders, max_workers):
+        """Send every order with at most `max_workers` in flight as in `KiteConnect._dispatch_bulk`."""
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(order):
+            async with semaphore:
+                try:
+                    await self._pace(route)
+                    return {"order": order, "order_id": await send(order), "error": None}
+                except Exception as e:
+                    log.warning("Bulk order request failed: {}".format(e))
+                    return {"order": order, "order_id": None, "error": e}
+
+        return list(await asyncio.gather(*[run(order) for order in orders]))
+
+    # orderbook and tradebook
+    async def orders(self):
+        """Get list of orders."""
+        return self._format_response(await self._get("orders"))
+
+    async def order_history(self, order_id):
+        """
+        Get history of individual order.
+
+        - `order_id` is the ID of the order to retrieve order history.
+        """
+        return self._format_response(await self._get("order.info", url_args={"order_id": order_id}))
+
+    async def trades(self):
+        """Retrieve the list of trades executed."""
+        return self._format_response(await self._get("trades"))
+
+    async def order_trades(self, order_id):
+        """
+        Retrieve the list of trades executed for a particular order.
+
+        - `order_id` is the ID of the order to retrieve trade history.
+        """
+        return self._format_response(await self._get("order.trades", url_args={"order_id": order_id}))
+
+    async def mf_orders(self, order_id=None):
+        """Get all mutual fund orders or individual order info."""
+        if order_id:
+            return self._format_response(await self._get("mf.order.info", url_args={"order_id": order_id}))
+        else:
+            return self._format_response(await self._get("mf.orders"))
+
+    async def mf_sips(self, sip_id=None):
+        """Get list of all mutual fund SIP's or individual SIP info."""
+        if sip_id:
+            return self._format_response(await self._get("mf.sip.info", url_args={"sip_id": sip_id}))
+        else:
+            return self._format_response(await self._get("mf.sips"))
+
+    async def mf_instruments(self):
+        """Get list of mutual fund instruments."""
+        return self._parse_mf_instruments(await self._get("mf.instruments"))
+
+    async def instruments(self, exchange=None):
+        """
+        Retrieve the list of market instruments available to trade.
+
+        - `exchange` is specific exchange to fetch (Optional)
+        """
+        if exchange:
+            return self._parse_instruments(await self._get("market.instruments", url_args={"exchange": exchange}))
+        else:
+            return self._parse_instruments(await self._get("market.instruments.all"))
+
+    async def iter_instruments(self, exchange=None, segment=None, compact=False):
+        """
+        Stream the list of market instruments available to trade.
+
+        Takes the same arguments as `KiteConnect.iter_instruments` and is used with `async for`.
+        """
+        if exchange:
+            route, url_args = "market.instruments", {"exchange": exchange}
+        else:
+            route, url_args = "market.instruments.all", None
+
+        url, headers, _ = self._prepare_request(route, "GET", url_args=url_args)
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(route)
+
+        async with self._get_session().request("GET", url, headers=headers, proxy=self.proxy) as r:
+            content_type = r.headers.get("content-type", "")
+            if "csv" not in content_type:
+                # Raises the matching Kite exception for error responses.
+                self._parse_response(r.status, content_type, await r.read())
+                return
+
+            convert = None
+            buffer = b""
+            eof = False
+            while not eof:
+                chunk = await r.content.read(64 * 1024)
+                eof = not chunk
+                if eof:
+                    lines, buffer = buffer, b""
+                else:
+                    lines, _, buffer = (buffer + chunk).rpartition(b"\n")
+
+                for row in csv.reader(lines.decode("utf-8").splitlines()):
+                    if not row:
+                        continue
+
+                    if convert is None:
+                        convert = self._instrument_row_converter(row, segment=segment, compact=compact)
+                        continue
+
+                    record = convert(row)
+                    if record is not None:
+                        yield record
+
+    async def quote(self, *instruments):
+        """
+        Retrieve quote for list of instruments.
+
+        - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+        """
+        ins = list(instruments)
+
+        # If first element is a list then accept it as instruments list for legacy reason
+        if len(instruments) > 0 and type(instruments[0]) == list:
+            ins = instruments[0]
+
+        data = await self._get_quotes("market.quote", ins)
+        return {key: self._format_response(data[key]) for key in data}
+
+    async def ohlc(self, *instruments):
+        """
+        Retrieve OHLC and market depth for list of instruments.
+
+        - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+        """
+        ins = list(instruments)
+
+        # If first element is a list then accept it as instruments list for legacy reason
+        if len(instruments) > 0 and type(instruments[0]) == list:
+            ins = instruments[0]
+
+        return await self._get_quotes("market.quote.ohlc", ins)
+
+    async def ltp(self, *instruments):
+        """
+        Retrieve last price for list of instruments.
+
+        - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+        """
+        ins = list(instruments)
+
+        # If first element is a list then accept it as instruments list for legacy reason
+        if len(instruments) > 0 and type(instruments[0]) == list:
+            ins = instruments[0]
+
+        return await self._get_quotes("market.quote.ltp", ins)
+
+    async def _get_quotes(self, route, ins):
+        """
+        Fetch quotes for a list of instruments in concurrent batches of the per request limit.
+
+        Batches are paced to the quote API rate limit as in `KiteConnect._get_quotes`.
+        """
+        limit = self._quote_limits[route]
+        if len(ins) <= limit:
+            return await self._get(route, params={"i": ins})
+
+        chunks = [ins[i:i + limit] for i in range(0, len(ins), limit)]
+        semaphore = asyncio.Semaphore(self._quote_max_workers)
+
+        async def fetch(chunk):
+            async with semaphore:
+                await self._pace(route)
+                return await self._get(route, params={"i": chunk})
+
+        data = {}
+        for chunk in await asyncio.gather(*[fetch(c) for c in chunks]):
+            data.update(chunk)
+
+        return data
+
+    async def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False,
+                              as_columns=False):
+        """
+        Retrieve historical data (candles) for an instrument.
+
+        Takes the same arguments and returns the same structure as `KiteConnect.historical_data`.
+        """
+        data = await self._get("market.historical",
+                               url_args={"instrument_token": instrument_token, "interval": interval},
+                               params=self._historical_params(from_date, to_date, interval, continuous, oi))
+
+        return self._format_historical_columns(data, oi=oi) if as_columns else self._format_historical(data)
+
+    async def historical_data_range(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False,
+                                    as_columns=False, max_workers=3):
+        """
+        Retrieve historical data (candles) for a date range longer than a single request allows.
+
+        Takes the same arguments and returns the same structure as `KiteConnect.historical_data_range`.
+        """
+        windows = self._historical_windows(from_date, to_date, interval)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(window):
+            async with semaphore:
+                await self._pace("market.historical")
+                return await self.historical_data(instrument_token, window[0], window[1], interval,
+                                                  continuous=continuous, oi=oi, as_columns=as_columns)
+
+        chunks = await asyncio.gather(*[fetch(w) for w in windows])
+        return self._merge_historical_columns(chunks) if as_columns else self._merge_historical(chunks)
+
+    async def _pace(self, route):
+        """Wait for a slot of `route` before one of several requests sent concurrently, as in `KiteConnect._pace`."""
+        if self.rate_limiter is None:
+            await self._pacer.acquire_async(route)
+
+    async def _request(self, route, method, url_args=None, params=None, is_json=False, query_params=None):
+        """Make an HTTP request."""
+        url, headers, query_params = self._prepare_request(route, method, url_args=url_args, params=params,
+                                                           query_params=query_params)
+
+        if method == "GET" and self.response_cache and self.response_cache.is_cached(route):
+            status_code, content_type, content = await self.response_cache.fetch_async(
+                route, self._cache_key(url, query_params),
+                lambda: self._send(route, method, url, headers, params, is_json, query_params),
+                store=lambda raw: raw[0] == 200)
+            return self._parse_response(status_code, content_type, content)
+
+        try:
+            status_code, content_type, content = await self._send(route, method, url, headers, params, is_json,
+                                                                  query_params)
+        finally:
+            if method != "GET" and self.response_cache:
+                self.response_cache.invalidate(route)
+
+        return self._parse_response(status_code, content_type, content)
+
+    async def _send(self, route, method, url, headers, params, is_json, query_params):
+        """Send a prepared request and return its status code, content type and body."""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(route)
+
+        body = {}
+        if method in ["POST", "PUT"]:
+            if is_json:
+                body["json"] = params
+            else:
+                body["data"] = self._encode_params(params)
+
+        async with self._get_session().request(method,
+                                               url,
+                                               params=self._encode_params(query_params),
+                                               headers=headers,
+                                               allow_redirects=True,
+                                               proxy=self.proxy,
+                                               **body) as r:
+            content = await r.read()
+
+        if self.debug:
+            log.debug("Response: {code} {content}".format(code=r.status, content=content))
+
+        return r.status, r.headers.get("content-type", ""), content
+
+    @staticmethod
+    def _encode_params(params):
+        """
+        Flatten params to a list of key, value pairs the way `requests` encodes them.
+
+        `None` values are dropped and list values are sent as repeated keys (`i=NSE:INFY&i=NSE:SBIN`).
+        """
+        if not params:
+            return None
+
+        pairs = []
+        for key, value in params.items():
+            for v in (value if isinstance(value, (list, tuple)) else [value]):
+                if v is not None:
+                    pairs.append((key, v if isinstance(v, str) else str(v)))
+
+        return pairs
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+    async_ticker.py
+
+    asyncio WebSocket client for Kite Connect's streaming quotes service.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import time
+import random
+import asyncio
+import logging
+
+from .ticker import KiteTicker
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+log = logging.getLogger(__name__)
+
+# Marks the end of a `stream()`.
+_stream_end = object()
+
+
+class AsyncKiteTicker(KiteTicker):
+    """
+    The WebSocket client for asyncio applications, without the Twisted reactor.
+
+    `AsyncKiteTicker` has the same callbacks, subscription methods and reconnection options as
+    `KiteTicker`, but runs as a task in the current event loop on an `aiohttp` WebSocket
+    (`pip install kiteconnect[async]`). Ticks can be consumed with the callbacks, or with
+    `stream()` in the same loop as `AsyncKiteConnect` calls:
+
+        #!python
+        import asyncio
+        from kiteconnect import AsyncKiteTicker
+
+        async def main():
+            kws = AsyncKiteTicker("your_api_key", "your_access_token")
+
+            # Subscriptions made before connecting are sent once connected,
+            # and every subscription is sent again after a reconnect.
+            kws.subscribe([738561, 5633])
+            kws.set_mode(kws.MODE_FULL, [738561])
+
+            async for ticks in kws.stream():
+                print(ticks)
+
+        asyncio.run(main())
+
+    Unlike `KiteTicker`, a closed ticker can be connected again.
+    """
+
+    # Interval (seconds) between pings. The connection is dropped if there's no pong for twice as long.
+    PING_INTERVAL = 2.5
+
+    # Reconnect backoff, the same as Twisted's `ReconnectingClientFactory`.
+    _reconnect_initial_delay = 1.0
+    _reconnect_factor = 2.7182818284590451
+    _reconnect_jitter = 0.11962656472
+
+    def __init__(self, api_key, access_token, debug=False, root=None,
+                 reconnect=True, reconnect_max_tries=KiteTicker.RECONNECT_MAX_TRIES,
+                 reconnect_max_delay=KiteTicker.RECONNECT_MAX_DELAY, connect_timeout=KiteTicker.CONNECT_TIMEOUT,
+                 lazy_ticks=False, proxy=None, disable_ssl_verification=False):
+        """
+        Initialise the asyncio WebSocket client.
+
+        - `api_key`, `access_token`, `debug`, `root`, `reconnect_max_tries`, `reconnect_max_delay`,
+        `connect_timeout` and `lazy_ticks` are the same as in `KiteTicker`.
+        - `reconnect` is a boolean to enable reconnection when the connection drops.
+        - `proxy` is the proxy url to connect through.
+        - `disable_ssl_verification` disables the SSL certificate verification.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncKiteTicker requires aiohttp. Install it with `pip install kiteconnect[async]`.")
+
+        super(AsyncKiteTicker, self).__init__(api_key, access_token, debug=debug, root=root,
+                                              reconnect=reconnect, reconnect_max_tries=reconnect_max_tries,
+                                              reconnect_max_delay=reconnect_max_delay,
+                                              connect_timeout=connect_timeout, lazy_ticks=lazy_ticks)
+
+        self.reconnect = reconnect
+        self.proxy = proxy
+        self.disable_ssl_verification = disable_ssl_verification
+
+        # Messages sent while disconnected are dropped, `subscribed_tokens` is sent again on connect.
+        self.ws = _WebSocket(None)
+        self.factory = None
+
+        self._running = False
+        self._retry = True
+        self._stopped = None
+        self._streams = []
+
+    async def connect(self):
+        """
+        Connect and keep the connection open, reconnecting when it drops.
+
+        Returns when the ticker is closed or runs out of reconnection attempts.
+        Run it with `asyncio.ensure_future(kws.connect())` to do other work meanwhile.
+        """
+        self._running = True
+        self._retry = True
+        self._stopped = asyncio.Event()
+        retries = 0
+        delay = self._reconnect_initial_delay
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                while self._retry:
+                    try:
+                        await self._run(session)
+                    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                        log.error("Connection error: {}".format(str(e)))
+                    else:
+                        retries = 0
+                        delay = self._reconnect_initial_delay
+
+                    if not self._retry or not self.reconnect:
+                        break
+
+                    retries += 1
+                    if self.reconnect_max_tries is not None and retries > self.reconnect_max_tries:
+                        if self.debug:
+                            log.debug("Maximum retries ({}) exhausted.".format(self.reconnect_max_tries))
+
+                        self._on_noreconnect()
+                        break
+
+                    delay = min(delay * self._reconnect_factor, self.reconnect_max_delay)
+                    delay = max(0, random.normalvariate(delay, delay * self._reconnect_jitter))
+
+                    log.error("Retrying connection. Retry attempt count: {}. Next retry in around: {} seconds".format(
+                        retries, int(round(delay))))
+                    self._on_reconnect(retries)
+
+                    # Wait for the next attempt, unless the ticker is closed meanwhile.
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._running = False
+            for queue, _ in self._streams:
+                queue.put_nowait(_stream_end)
+
+    async def stream(self, as_columns=False):
+        """
+        Iterate over the ticks of every message with `async for`.
+
+        Connects if the ticker isn't connected yet, and ends when the ticker is closed
+        or runs out of reconnection attempts.
+
+        - `as_columns` yields each message as NumPy columns, the same as `on_tick_batch`,
+        instead of a list of ticks.
+        """
+        stream = (asyncio.Queue(), as_columns)
+        self._streams.append(stream)
+
+        task = None
+        if not self._running:
+            task = asyncio.ensure_future(self.connect())
+
+        try:
+            while True:
+                ticks = await stream[0].get()
+                if ticks is _stream_end:
+                    break
+
+                yield ticks
+        finally:
+            self._streams.remove(stream)
+
+            # Stop the connection this stream started if the consumer stops early.
+            if task is not None and not task.done():
+                self.close()
+
+    def close(self, code=None, reason=None):
+        """Close the WebSocket connection and stop reconnecting."""
+        self.stop_retry()
+        self._close(code, reason)
+
+    def stop(self):
+        """Close the connection. The ticker can be connected again later."""
+        self.close()
+
+    def stop_retry(self):
+        """Stop auto retry when it is in progress."""
+        self._retry = False
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _run(self, session):
+        """Open a connection and read from it until it closes or stops responding to pings."""
+        ws = await session.ws_connect(self.socket_url,
+                                      headers={"X-Kite-Version": "3", "User-Agent": self._user_agent()},
+                                      autoping=False,
+                                      proxy=self.proxy,
+                                      ssl=False if self.disable_ssl_verification else True)
+
+        self.ws = _WebSocket(ws)
+        tasks = [asyncio.ensure_future(self._read(self.ws)),
+                 asyncio.ensure_future(self._ping(self.ws)),
+                 asyncio.ensure_future(self.ws.write())]
+
+        try:
+            # Tokens subscribed before the first connection.
+            if self._is_first_connect and self.subscribed_tokens:
+                self.resubscribe()
+
+            self._on_connect(self.ws, None)
+            self._on_open(self.ws)
+
+            # Closed while connecting.
+            if not self._retry:
+                self.ws.sendClose()
+
+            await asyncio.wait(tasks[:2], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.ws.state = _WebSocket.STATE_CLOSED
+            for task in tasks:
+                task.cancel()
+
+            # Don't wait for a close handshake on a dead connection.
+            try:
+                await asyncio.wait_for(ws.close(), self.PING_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            self._on_close(self.ws, ws.close_code, None)
+
+        # Errors raised by callbacks.
+        if tasks[0].done() and not tasks[0].cancelled() and tasks[0].exception():
+            raise tasks[0].exception()
+
+    async def _read(self, ws):
+        async for msg in ws.ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                self._on_message(ws, msg.data, True)
+            elif msg.type == aiohttp.WSMsgType.TEXT:
+                self._on_message(ws, msg.data, False)
+            elif msg.type == aiohttp.WSMsgType.PING:
+                await ws.ws.pong(msg.data)
+            elif msg.type == aiohttp.WSMsgType.PONG:
+                ws.last_pong_time = time.monotonic()
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                self._on_error(ws, 0, str(ws.ws.exception()))
+
+    async def _ping(self, ws):
+        """Send pings and return if pongs stop, so the connection doesn't become a ghost connection."""
+        ws.last_pong_time = time.monotonic()
+
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+
+            last_pong_diff = time.monotonic() - ws.last_pong_time
+            if last_pong_diff > 2 * self.PING_INTERVAL:
+                if self.debug:
+                    log.debug("Last pong was {} seconds ago. So dropping connection to reconnect.".format(
+                        last_pong_diff))
+                return
+
+            await ws.ws.ping()
+
+    def _on_message(self, ws, payload, is_binary):
+        super(AsyncKiteTicker, self)._on_message(ws, payload, is_binary)
+
+        if self._streams and is_binary and len(payload) > 4:
+            ticks = None
+            batch = None
+            for queue, as_columns in self._streams:
+                if as_columns:
+                    batch = self._parse_binary_batch(payload) if batch is None else batch
+                    queue.put_nowait(batch)
+                else:
+                    if ticks is None:
+                        ticks = self._parse_binary_lazy(payload) if self.lazy_ticks else self._parse_binary(payload)
+                    queue.put_nowait(ticks)
+
+
+class _WebSocket(object):
+    """
+    Adapts an aiohttp WebSocket to the parts of the autobahn protocol used by `KiteTicker`.
+
+    Messages are written in order by a single writer task, so `subscribe()` etc. can be
+    called from synchronous callbacks.
+    """
+
+    STATE_CLOSED = 0
+    STATE_OPEN = 1
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.state = self.STATE_OPEN if ws is not None else self.STATE_CLOSED
+        self.last_pong_time = None
+        self._outbox = asyncio.Queue() if ws is not None else None
+
+    def sendMessage(self, payload, isBinary=False):  # noqa
+        if self.state == self.STATE_OPEN:
+            self._outbox.put_nowait((payload, isBinary))
+
+    def sendClose(self, code=None, reason=None):  # noqa
+        if self.state == self.STATE_OPEN:
+            self._outbox.put_nowait((None, (code, reason)))
+
+    async def write(self):
+        while True:
+            payload, arg = await self._outbox.get()
+            if payload is None:
+                code, reason = arg
+                await self.ws.close(code=code or aiohttp.WSCloseCode.OK, message=(reason or "").encode("utf-8"))
+                return
+            elif arg:
+                await self.ws.send_bytes(payload)
+            else:
+                await self.ws.send_str(payload.decode("utf-8") if isinstance(payload, bytes) else payload)
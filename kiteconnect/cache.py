@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+    cache.py
+
+    Short lived read-through cache for Kite Connect GET requests.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Read routes whose responses change when orders are placed, modified or cancelled.
+# CNC orders change holdings as well.
+_order_reads = ("orders", "trades", "order.info", "order.trades", "portfolio.positions",
+                "portfolio.holdings", "user.margins", "user.margins.segment")
+
+
+class ResponseCache(object):
+    """
+    Cache responses of idempotent GET routes for a short time and coalesce concurrent requests.
+
+    Only routes with a TTL are cached. Identical requests made while one is in flight wait
+    for and share its response instead of hitting the network again (single flight).
+    Write calls such as `place_order` drop the cached responses of the routes they affect.
+
+        #!python
+        from kiteconnect import KiteConnect, ResponseCache
+
+        kite = KiteConnect(api_key="your_api_key", response_cache=ResponseCache())
+
+        # Calls from many threads within the TTL share one request.
+        kite.positions()
+
+    Cached responses are stored raw and parsed on every hit, so callers never share
+    (and can safely modify) the returned objects. Responses are cached per `api_key` and
+    `access_token`, so a new login never gets the previous user's responses. A cache
+    shared between clients only shares responses of the same login, but writes through
+    any of them drop the affected routes for all of them.
+    """
+
+    # Seconds for which a response of a route is reused.
+    DEFAULT_TTLS = {
+        "orders": 0.5,
+        "trades": 0.5,
+        "order.info": 0.5,
+        "order.trades": 0.5,
+        "portfolio.positions": 0.5,
+        "portfolio.holdings": 1,
+        "user.margins": 0.5,
+        "user.margins.segment": 0.5,
+        "user.profile": 60,
+        "market.quote": 0.25,
+        "market.quote.ohlc": 0.25,
+        "market.quote.ltp": 0.25,
+        "gtt": 1,
+        "gtt.info": 1,
+    }
+
+    # Cached routes which are invalidated by a write route.
+    INVALIDATES = {
+        "order.place": _order_reads,
+        "order.modify": _order_reads,
+        "order.cancel": _order_reads,
+        "portfolio.positions.convert": ("portfolio.positions", "portfolio.holdings",
+                                        "user.margins", "user.margins.segment"),
+        "gtt.place": ("gtt", "gtt.info"),
+        "gtt.modify": ("gtt", "gtt.info"),
+        "gtt.delete": ("gtt", "gtt.info"),
+    }
+
+    def __init__(self, ttls=None):
+        """
+        Initialise the cache.
+
+        - `ttls` is a dict of route to TTL (seconds) which overrides `DEFAULT_TTLS`.
+        A TTL of 0 or None disables caching for that route.
+        """
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._entries = {}
+        # Threads and event loops wait on different kinds of futures.
+        self._inflight = {}
+        self._inflight_async = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def is_cached(self, route):
+        """Check if responses of `route` are cached."""
+        return bool(self.ttls.get(route))
+
+    def fetch(self, route, key, fetch, store=None):
+        """
+        Get a cached response or call `fetch` to get it.
+
+        - `key` identifies the request within the route, for example its url and params.
+        - `fetch` is called without arguments to send the request.
+        - `store` is an optional predicate which decides if a fetched response is cached.
+        """
+        with self._lock:
+            value, future, owner, generation = self._lookup(route, key, self._inflight, Future)
+
+        if not owner:
+            return value if future is None else future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            self._finish(self._inflight, route, key, generation)
+            future.set_exception(e)
+            raise
+
+        self._finish(self._inflight, route, key, generation, value, store)
+        future.set_result(value)
+        return value
+
+    async def fetch_async(self, route, key, fetch, store=None):
+        """The same as `fetch()`, where `fetch` returns an awaitable."""
+        with self._lock:
+            value, future, owner, generation = self._lookup(route, key, self._inflight_async,
+                                                            asyncio.get_running_loop().create_future)
+
+        if not owner:
+            if future is None:
+                return value
+
+            return await asyncio.shield(future)
+
+        try:
+            value = await fetch()
+        except BaseException as e:
+            self._finish(self._inflight_async, route, key, generation)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Don't warn about an exception nobody else waited for.
+                future.exception()
+            raise
+
+        self._finish(self._inflight_async, route, key, generation, value, store)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, route):
+        """Drop cached responses of the routes affected by a write to `route`."""
+        self.invalidate_routes(self.INVALIDATES.get(route, ()))
+
+    def invalidate_routes(self, routes):
+        """Drop cached responses of the given read routes."""
+        routes = set(routes)
+        with self._lock:
+            for route in routes:
+                self._generations[route] = self._generations.get(route, 0) + 1
+
+            for key in [k for k in self._entries if k[0] in routes]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            for route in set(k[0] for k in self._entries):
+                self._generations[route] = self._generations.get(route, 0) + 1
+            self._entries = {}
+
+    def _lookup(self, route, key, inflight, make_future):
+        """Find a fresh entry or an in-flight request, or register this caller as the one fetching."""
+        k = (route, key)
+        entry = self._entries.get(k)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1], None, False, None
+
+        future = inflight.get(k)
+        if future is not None:
+            self.coalesced += 1
+            return None, future, False, None
+
+        self.misses += 1
+        future = inflight[k] = make_future()
+        return None, future, True, self._generations.get(route, 0)
+
+    def _finish(self, inflight, route, key, generation, value=None, store=None):
+        k = (route, key)
+        with self._lock:
+            inflight.pop(k, None)
+
+            # Skip storing responses which may predate a write made while they were in flight.
+            if store is None or not store(value) or self._generations.get(route, 0) != generation:
+                return
+
+            self._entries[k] = (time.monotonic() + self.ttls[route], value)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+    candles.py
+
+    Build OHLCV candles from the tick stream.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import time
+import logging
+import datetime
+import threading
+from collections import deque
+
+import kiteconnect.exceptions as ex
+from .dateparse import _tzoffset
+
+log = logging.getLogger(__name__)
+
+
+class CandleAggregator(object):
+    """
+    Build candles of several intervals at once from `KiteTicker` ticks.
+
+    Candles have the same structure and boundaries as `historical_data()` candles (aligned
+    to the 09:15 IST session start), so a backfill and live candles can be used together:
+
+        #!python
+        from kiteconnect import KiteTicker, CandleAggregator
+
+        candles = CandleAggregator(intervals=["minute", "5minute"])
+
+        def on_candle(aggregator, instrument_token, interval, candle):
+            # Called with every closed candle.
+            logging.info("{} {}: {}".format(instrument_token, interval, candle))
+
+        candles.on_candle = on_candle
+
+        # Backfill, the last (unfinished) candle is continued by ticks.
+        candles.seed(256265, "5minute", kite.historical_data(256265, from_date, to_date, "5minute"))
+
+        kws = KiteTicker("your_api_key", "your_access_token")
+        kws.on_ticks = candles.on_ticks
+
+    A candle closes when the first tick of a later candle arrives, or when `flush()` is called
+    after its end, which should be done on a timer for instruments which trade rarely.
+    Intervals without ticks have no candle, the same as `historical_data()`.
+
+    Candle volume is the change of the cumulative `volume_traded` of `quote` and `full` mode
+    ticks, so the first tick of an instrument only sets the starting volume. Ticks are timed
+    by their `exchange_timestamp`, and by the local clock in `ltp` mode.
+    """
+
+    # Interval names of `historical_data()` and their length in seconds.
+    INTERVALS = {
+        "minute": 60,
+        "3minute": 180,
+        "5minute": 300,
+        "10minute": 600,
+        "15minute": 900,
+        "30minute": 1800,
+        "60minute": 3600,
+    }
+
+    # Candles start at the 09:15 session start in IST, which is 03:45 UTC.
+    _utc_offset = 19800
+    _session_start = 9 * 3600 + 15 * 60
+
+    def __init__(self, intervals=("minute",), history=500):
+        """
+        Initialise the aggregator.
+
+        - `intervals` is a list of interval names such as `minute`, `5minute` or `15minute`.
+        - `history` is the number of closed candles kept per instrument and interval.
+        """
+        for interval in intervals:
+            if interval not in self.INTERVALS:
+                raise ex.InputException("Invalid candle interval: {}".format(interval))
+
+        self.intervals = list(intervals)
+        self.history = history
+        self.on_candle = None
+
+        self._tz = _tzoffset("+0530")
+        self._anchor = self._session_start - self._utc_offset
+        # Closed candles and the current candle with its start (epoch seconds), by (token, interval).
+        self._closed = {}
+        self._current = {}
+        # Last cumulative volume of every token.
+        self._volumes = {}
+        self._lock = threading.Lock()
+
+    def on_ticks(self, ws, ticks):
+        """`KiteTicker.on_ticks` callback which updates the candles."""
+        self.update(ticks)
+
+    def update(self, ticks):
+        """Add a list of ticks to the candles."""
+        closed = []
+        now = time.time()
+
+        with self._lock:
+            for tick in ticks:
+                token = tick["instrument_token"]
+                price = tick["last_price"]
+
+                timestamp = tick.get("exchange_timestamp")
+                timestamp = timestamp.timestamp() if timestamp else now
+
+                volume = 0
+                total = tick.get("volume_traded")
+                if total is not None:
+                    previous = self._volumes.get(token)
+                    if previous is not None:
+                        # Cumulative volume restarts every day.
+                        volume = total - previous if total >= previous else total
+                    self._volumes[token] = total
+
+                for interval in self.intervals:
+                    self._add(token, interval, timestamp, price, volume, tick.get("oi"), closed)
+
+        self._emit(closed)
+
+    def seed(self, instrument_token, interval, candles):
+        """
+        Start the candles of an instrument from a `historical_data()` backfill of `interval`.
+
+        The last candle becomes the current candle, which is continued by ticks.
+        """
+        if interval not in self.intervals:
+            raise ex.InputException("Interval {} is not aggregated.".format(interval))
+
+        candles = [dict(c) for c in candles]
+        key = (instrument_token, interval)
+        with self._lock:
+            self._closed[key] = deque(candles[:-1], maxlen=self.history)
+            if candles:
+                self._current[key] = (self._start(candles[-1]["date"].timestamp(), interval), candles[-1])
+            else:
+                self._current.pop(key, None)
+
+    def flush(self, now=None):
+        """Close the candles which ended before `now` (epoch seconds). Defaults to the current time."""
+        now = time.time() if now is None else now
+        closed = []
+
+        with self._lock:
+            for key, (start, candle) in list(self._current.items()):
+                if start + self.INTERVALS[key[1]] <= now:
+                    del self._current[key]
+                    self._close(key, candle, closed)
+
+        self._emit(closed)
+
+    def candles(self, instrument_token, interval):
+        """Get the closed candles of an instrument, oldest first."""
+        with self._lock:
+            return [dict(c) for c in self._closed.get((instrument_token, interval), ())]
+
+    def current(self, instrument_token, interval):
+        """Get the unfinished candle of an instrument, or None."""
+        with self._lock:
+            current = self._current.get((instrument_token, interval))
+            return dict(current[1]) if current else None
+
+    def _start(self, timestamp, interval):
+        """Get the start (epoch seconds) of the candle which contains `timestamp`."""
+        seconds = self.INTERVALS[interval]
+        return timestamp - (timestamp - self._anchor) % seconds
+
+    def _add(self, token, interval, timestamp, price, volume, oi, closed):
+        key = (token, interval)
+        start = self._start(timestamp, interval)
+        current = self._current.get(key)
+
+        # Late ticks are added to the current candle.
+        if current is not None and start > current[0]:
+            self._close(key, current[1], closed)
+            current = None
+
+        if current is None:
+            candle = {
+                "date": datetime.datetime.fromtimestamp(start, self._tz),
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "volume": volume,
+            }
+            self._current[key] = (start, candle)
+        else:
+            candle = current[1]
+            candle["high"] = max(candle["high"], price)
+            candle["low"] = min(candle["low"], price)
+            candle["close"] = price
+            candle["volume"] += volume
+
+        if oi is not None:
+            candle["oi"] = oi
+
+    def _close(self, key, candle, closed):
+        history = self._closed.get(key)
+        if history is None:
+            history = self._closed[key] = deque(maxlen=self.history)
+
+        history.append(candle)
+        closed.append((key, dict(candle)))
+
+    def _emit(self, closed):
+        if not self.on_candle:
+            return
+
+        for (token, interval), candle in closed:
+            self.on_candle(self, token, interval, candle)
@@ -11,18 +11,29 @@ from six import StringIO, PY2
 from six.moves.urllib.parse import urljoin
 import csv
 import json
-import dateutil.parser
 import hashlib
 import logging
 import datetime
 import requests
 import warnings
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from .__version__ import __version__, __title__
 import kiteconnect.exceptions as ex
+from .dateparse import parse_date, parse_datetime
+from .ratelimit import RateLimiter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
 
 log = logging.getLogger(__name__)
 
+# `Instrument` named tuple types per instruments CSV header.
+_instrument_types = {}
+
 
 class KiteConnect(object):
     """
@@ -104,6 +115,27 @@ class KiteConnect(object):
     GTT_STATUS_REJECTED = "rejected"
     GTT_STATUS_DELETED = "deleted"
 
+    # Maximum number of days that can be fetched in a single historical data request per interval
+    _historical_max_days = {
+        "minute": 60,
+        "3minute": 100,
+        "5minute": 100,
+        "10minute": 100,
+        "15minute": 200,
+        "30minute": 200,
+        "60minute": 400,
+        "day": 2000,
+    }
+
+    # Maximum number of instruments per quote request
+    _quote_limits = {
+        "market.quote": 500,
+        "market.quote.ohlc": 1000,
+        "market.quote.ltp": 1000,
+    }
+    # Maximum number of quote requests in flight when a list is split into chunks
+    _quote_max_workers = 4
+
     # URIs to various calls
     _routes = {
         "api.token": "/session/token",
@@ -173,7 +205,9 @@ class KiteConnect(object):
                  timeout=None,
                  proxies=None,
                  pool=None,
-                 disable_ssl=False):
+                 disable_ssl=False,
+                 rate_limiter=None,
+                 response_cache=None):
         """
         Initialise a new Kite Connect client instance.
 
@@ -195,6 +229,10 @@ class KiteConnect(object):
         - `pool` is manages request pools. It takes a dict of params accepted by HTTPAdapter as described here in [python requests documentation](http://docs.python-requests.org/en/master/api/#requests.adapters.HTTPAdapter)
         - `disable_ssl` disables the SSL verification while making a request.
         If set requests won't throw SSLError if its set to custom `root` url without SSL.
+        - `rate_limiter` is a `RateLimiter` instance used to pace requests per route group
+        instead of sending them as fast as they are made.
+        - `response_cache` is a `ResponseCache` instance used to reuse recent responses of read
+        routes and share in-flight requests between threads.
         """
         self.debug = debug
         self.api_key = api_key
@@ -202,6 +240,11 @@ class KiteConnect(object):
         self.disable_ssl = disable_ssl
         self.access_token = access_token
         self.proxies = proxies if proxies else {}
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+
+        # Paces requests sent concurrently by one call when `rate_limiter` isn't set.
+        self._pacer = RateLimiter()
 
         self.root = root or self._default_root_uri
         self.timeout = timeout or self._default_timeout
@@ -270,7 +313,7 @@ class KiteConnect(object):
             self.set_access_token(resp["access_token"])
 
         if resp["login_time"] and len(resp["login_time"]) == 19:
-            resp["login_time"] = dateutil.parser.parse(resp["login_time"])
+            resp["login_time"] = parse_datetime(resp["login_time"])
 
         return resp
 
@@ -394,6 +437,117 @@ class KiteConnect(object):
         """Exit a CO order."""
         return self.cancel_order(variety, order_id, parent_order_id=parent_order_id)
 
+    def place_orders(self, orders, max_workers=10):
+        """
+        Place several orders concurrently.
+
+        Every order is validated before any is sent. Orders which fail don't stop the others,
+        a result is returned for every order in the same order as `orders`.
+
+        - `orders` is a list of dicts of `place_order()` arguments.
+        - `max_workers` is the maximum number of requests in flight. Orders are also paced to
+        the order API rate limit, by `rate_limiter` if it's set.
+
+        Returns a list of dicts with the `order`, and its `order_id` or the `error` raised placing it.
+        """
+        self._validate_bulk(orders, self._bulk_place_args)
+        return self._dispatch_bulk("order.place", lambda order: self.place_order(**order), orders, max_workers)
+
+    def cancel_orders(self, orders, max_workers=10):
+        """
+        Cancel several orders concurrently.
+
+        - `orders` is a list of dicts of `cancel_order()` arguments, `variety`, `order_id`
+        and optionally `parent_order_id`.
+        - `max_workers` is the same as in `place_orders()`.
+
+        Returns a list of results in the same structure as `place_orders()`.
+        """
+        self._validate_bulk(orders, self._bulk_cancel_args)
+        return self._dispatch_bulk("order.cancel", lambda order: self.cancel_order(**order), orders, max_workers)
+
+    def exit_all_positions(self, product=None, variety=VARIETY_REGULAR, tag=None, max_workers=10):
+        """
+        Square off every open net position with market orders placed concurrently.
+
+        - `product` only exits positions of this product (eg: MIS), all positions by default.
+        - `variety` and `tag` are set on every exit order.
+        - `max_workers` is the same as in `place_orders()`.
+
+        Returns a list of results in the same structure as `place_orders()`.
+        """
+        orders = self._exit_orders(self.positions()["net"], product, variety, tag)
+        return self.place_orders(orders, max_workers=max_workers) if orders else []
+
+    # Required and optional arguments of the orders of `place_orders()` and `cancel_orders()`.
+    _bulk_place_args = (
+        ("variety", "exchange", "tradingsymbol", "transaction_type", "quantity", "product", "order_type"),
+        ("price", "validity", "validity_ttl", "disclosed_quantity", "trigger_price", "iceberg_legs",
+         "iceberg_quantity", "auction_number", "tag")
+    )
+    _bulk_cancel_args = (("variety", "order_id"), ("parent_order_id",))
+
+    def _validate_bulk(self, orders, args):
+        """Raise `InputException` for the first order with missing or unknown arguments."""
+        required, optional = args
+        if not isinstance(orders, (list, tuple)):
+            raise ex.InputException("Orders should be a list of dicts.")
+
+        for i, order in enumerate(orders):
+            if not isinstance(order, dict):
+                raise ex.InputException("Order {} should be a dict.".format(i))
+
+            missing = [k for k in required if order.get(k) is None]
+            if missing:
+                raise ex.InputException("Order {} is missing {}.".format(i, ", ".join(missing)))
+
+            unknown = [k for k in order if k not in required and k not in optional]
+            if unknown:
+                raise ex.InputException("Order {} has unknown arguments {}.".format(i, ", ".join(sorted(unknown))))
+
+            if "quantity" in required and not (isinstance(order["quantity"], int) and order["quantity"] > 0):
+                raise ex.InputException("Order {} quantity should be a positive integer.".format(i))
+
+    def _dispatch_bulk(self, route, send, orders, max_workers):
+        """Send every order on a thread pool paced to the `route` rate limit, collecting the order ID or the error of each."""
+        def run(order):
+            try:
+                self._pace(route)
+                return {"order": order, "order_id": send(order), "error": None}
+            except Exception as e:
+                log.warning("Bulk order request failed: {}".format(e))
+                return {"order": order, "order_id": None, "error": e}
+
+        if not orders:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(orders))) as executor:
+            return list(executor.map(run, orders))
+
+    def _exit_orders(self, positions, product, variety, tag):
+        """Market orders which close the open `positions`."""
+        orders = []
+        for position in positions:
+            quantity = position["quantity"]
+            if not quantity or (product and position["product"] != product):
+                continue
+
+            order = {
+                "variety": variety,
+                "exchange": position["exchange"],
+                "tradingsymbol": position["tradingsymbol"],
+                "transaction_type": self.TRANSACTION_TYPE_SELL if quantity > 0 else self.TRANSACTION_TYPE_BUY,
+                "quantity": abs(quantity),
+                "product": position["product"],
+                "order_type": self.ORDER_TYPE_MARKET
+            }
+            if tag:
+                order["tag"] = tag
+
+            orders.append(order)
+
+        return orders
+
     def _format_response(self, data):
         """Parse and format responses."""
 
@@ -406,7 +560,7 @@ class KiteConnect(object):
             # Convert date time string to datetime object
             for field in ["order_timestamp", "exchange_timestamp", "created", "last_instalment", "fill_timestamp", "timestamp", "last_trade_time"]:
                 if item.get(field) and len(item[field]) == 19:
-                    item[field] = dateutil.parser.parse(item[field])
+                    item[field] = parse_datetime(item[field])
 
         return _list[0] if type(data) == dict else _list
 
@@ -567,11 +721,43 @@ class KiteConnect(object):
         else:
             return self._parse_instruments(self._get("market.instruments.all"))
 
+    def iter_instruments(self, exchange=None, segment=None, compact=False):
+        """
+        Stream the list of market instruments available to trade.
+
+        Rows are parsed one at a time while the dump is being downloaded, so memory stays
+        low and processing can start before the download finishes. Values are parsed the
+        same way as in `instruments()`.
+
+        - `exchange` is specific exchange to fetch (Optional)
+        - `segment` is a segment (or list of segments) to filter by, for example `NFO-OPT`.
+        Other rows are skipped before their values are parsed.
+        - `compact` yields `Instrument` named tuples instead of dicts.
+        """
+        if exchange:
+            lines = self._request("market.instruments", "GET", url_args={"exchange": exchange}, stream=True)
+        else:
+            lines = self._request("market.instruments.all", "GET", stream=True)
+
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if not header:
+            return
+
+        convert = self._instrument_row_converter(header, segment=segment, compact=compact)
+        for row in reader:
+            record = convert(row)
+            if record is not None:
+                yield record
+
     def quote(self, *instruments):
         """
         Retrieve quote for list of instruments.
 
         - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+
+        Lists longer than the API's per request limit are fetched in concurrent batches and merged,
+        use a `RateLimiter` to keep the batches within the quote rate limit.
         """
         ins = list(instruments)
 
@@ -579,7 +765,7 @@ class KiteConnect(object):
         if len(instruments) > 0 and type(instruments[0]) == list:
             ins = instruments[0]
 
-        data = self._get("market.quote", params={"i": ins})
+        data = self._get_quotes("market.quote", ins)
         return {key: self._format_response(data[key]) for key in data}
 
     def ohlc(self, *instruments):
@@ -587,6 +773,9 @@ class KiteConnect(object):
         Retrieve OHLC and market depth for list of instruments.
 
         - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+
+        Lists longer than the API's per request limit are fetched in concurrent batches and merged,
+        use a `RateLimiter` to keep the batches within the quote rate limit.
         """
         ins = list(instruments)
 
@@ -594,13 +783,16 @@ class KiteConnect(object):
         if len(instruments) > 0 and type(instruments[0]) == list:
             ins = instruments[0]
 
-        return self._get("market.quote.ohlc", params={"i": ins})
+        return self._get_quotes("market.quote.ohlc", ins)
 
     def ltp(self, *instruments):
         """
         Retrieve last price for list of instruments.
 
         - `instruments` is a list of instruments, Instrument are in the format of `exchange:tradingsymbol`. For example NSE:INFY
+
+        Lists longer than the API's per request limit are fetched in concurrent batches and merged,
+        use a `RateLimiter` to keep the batches within the quote rate limit.
         """
         ins = list(instruments)
 
@@ -608,9 +800,35 @@ class KiteConnect(object):
         if len(instruments) > 0 and type(instruments[0]) == list:
             ins = instruments[0]
 
-        return self._get("market.quote.ltp", params={"i": ins})
+        return self._get_quotes("market.quote.ltp", ins)
+
+    def _get_quotes(self, route, ins):
+        """
+        Fetch quotes for a list of instruments.
+
+        Lists longer than the API's per request limit for `route` are split into chunks
+        which are fetched concurrently over the pooled session and merged. The chunks are
+        paced to the quote API rate limit, by `rate_limiter` if it's set.
+        """
+        limit = self._quote_limits[route]
+        if len(ins) <= limit:
+            return self._get(route, params={"i": ins})
+
+        chunks = [ins[i:i + limit] for i in range(0, len(ins), limit)]
+
+        def fetch(chunk):
+            self._pace(route)
+            return self._get(route, params={"i": chunk})
+
+        data = {}
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self._quote_max_workers)) as executor:
+            for chunk in executor.map(fetch, chunks):
+                data.update(chunk)
+
+        return data
 
-    def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False):
+    def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False,
+                        as_columns=False):
         """
         Retrieve historical data (candles) for an instrument.
 
@@ -624,28 +842,135 @@ class KiteConnect(object):
         - `interval` is the candle interval (minute, day, 5 minute etc.).
         - `continuous` is a boolean flag to get continuous data for futures and options instruments.
         - `oi` is a boolean flag to get open interest.
+        - `as_columns` returns a dict of NumPy arrays instead of a list of dicts (requires `numpy`).
+        `date` holds epoch nanoseconds (UTC) as int64, `open`, `high`, `low` and `close` are float64
+        and `volume` (and `oi` when requested) are int64. Use `pandas.DataFrame(data)` and
+        `pandas.to_datetime(data["date"], utc=True)` to get a frame without per row parsing.
+        """
+        data = self._get("market.historical",
+                         url_args={"instrument_token": instrument_token, "interval": interval},
+                         params=self._historical_params(from_date, to_date, interval, continuous, oi))
+
+        return self._format_historical_columns(data, oi=oi) if as_columns else self._format_historical(data)
+
+    def historical_data_range(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False,
+                              as_columns=False, max_workers=3):
+        """
+        Retrieve historical data (candles) for a date range longer than a single request allows.
+
+        The range is split into windows of the maximum number of days the API returns for
+        `interval`, the windows are fetched concurrently and the candles are returned in order
+        without duplicates, in the same structure as `historical_data()`.
+
+        - `instrument_token`, `from_date`, `to_date`, `interval`, `continuous`, `oi` and `as_columns`
+        are the same as in `historical_data()`.
+        - `max_workers` is the maximum number of requests in flight. Requests are also paced to
+        the historical API rate limit, by `rate_limiter` if it's set.
+        """
+        windows = self._historical_windows(from_date, to_date, interval)
+
+        def fetch(window):
+            self._pace("market.historical")
+            return self.historical_data(instrument_token, window[0], window[1], interval,
+                                        continuous=continuous, oi=oi, as_columns=as_columns)
+
+        if len(windows) == 1:
+            return fetch(windows[0])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(fetch, windows))
+
+        return self._merge_historical_columns(chunks) if as_columns else self._merge_historical(chunks)
+
+    def _pace(self, route):
         """
+        Wait for a slot of `route` before one of several requests sent concurrently.
+
+        Without a `rate_limiter`, which paces every request, these requests are paced by a
+        private limiter at the default `RateLimiter` limits, so they stay within the API limits.
+        """
+        if self.rate_limiter is None:
+            self._pacer.acquire(route)
+
+    def _historical_windows(self, from_date, to_date, interval):
+        """
+        Split a date range into (from, to) windows which can each be fetched in one request.
+
+        A `to_date` without a time includes that whole day, as it does in `historical_data()`.
+        """
+        date_only = type(to_date) == datetime.date or (isinstance(to_date, str) and len(to_date.strip()) == 10)
+        from_date = self._to_datetime(from_date)
+        to_date = self._to_datetime(to_date)
+        if date_only:
+            to_date += datetime.timedelta(days=1, seconds=-1)
+
+        if interval not in self._historical_max_days:
+            return [(from_date, to_date)]
+
+        span = datetime.timedelta(days=self._historical_max_days[interval])
+        windows = []
+        start = from_date
+        while True:
+            end = min(to_date, start + span - datetime.timedelta(seconds=1))
+            windows.append((start, end))
+            if end >= to_date:
+                break
+            start = end + datetime.timedelta(seconds=1)
+
+        return windows
+
+    def _merge_historical(self, chunks):
+        """Stitch ordered chunks of candles into one list dropping duplicate timestamps."""
+        records = []
+        for chunk in chunks:
+            for record in chunk:
+                if not records or record["date"] > records[-1]["date"]:
+                    records.append(record)
+
+        return records
+
+    def _merge_historical_columns(self, chunks):
+        """Concatenate ordered chunks of candle columns dropping duplicate timestamps."""
+        columns = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+
+        dates = columns["date"]
+        if len(dates) > 1:
+            keep = np.empty(len(dates), dtype=bool)
+            keep[0] = True
+            keep[1:] = dates[1:] > np.maximum.accumulate(dates)[:-1]
+            if not keep.all():
+                columns = {key: column[keep] for key, column in columns.items()}
+
+        return columns
+
+    def _to_datetime(self, value):
+        """Convert a date, datetime or date string to a datetime object."""
+        if type(value) == datetime.datetime:
+            return value
+        elif type(value) == datetime.date:
+            return datetime.datetime.combine(value, datetime.time())
+        else:
+            return parse_datetime(value)
+
+    def _historical_params(self, from_date, to_date, interval, continuous=False, oi=False):
+        """Build the query params for a historical data request."""
         date_string_format = "%Y-%m-%d %H:%M:%S"
         from_date_string = from_date.strftime(date_string_format) if type(from_date) == datetime.datetime else from_date
         to_date_string = to_date.strftime(date_string_format) if type(to_date) == datetime.datetime else to_date
 
-        data = self._get("market.historical",
-                         url_args={"instrument_token": instrument_token, "interval": interval},
-                         params={
-                             "from": from_date_string,
-                             "to": to_date_string,
-                             "interval": interval,
-                             "continuous": 1 if continuous else 0,
-                             "oi": 1 if oi else 0
-                         })
-
-        return self._format_historical(data)
+        return {
+            "from": from_date_string,
+            "to": to_date_string,
+            "interval": interval,
+            "continuous": 1 if continuous else 0,
+            "oi": 1 if oi else 0
+        }
 
     def _format_historical(self, data):
         records = []
         for d in data["candles"]:
             record = {
-                "date": dateutil.parser.parse(d[0]),
+                "date": parse_datetime(d[0]),
                 "open": d[1],
                 "high": d[2],
                 "low": d[3],
@@ -658,6 +983,56 @@ class KiteConnect(object):
 
         return records
 
+    def _format_historical_columns(self, data, oi=False):
+        """
+        Format candles as contiguous NumPy arrays without building a dict per candle.
+
+        The `oi` column is always there when `oi` was requested, empty if there are no candles,
+        so the columns of every window of a range can be merged.
+        """
+        if np is None:
+            raise ImportError("`as_columns` requires numpy. Install it with `pip install kiteconnect[numpy]`.")
+
+        candles = data["candles"]
+        width = len(candles[0]) - 1 if candles else 5
+
+        # Timestamps look like `2017-12-15T09:15:00+0530`. Parse the wall clock part in one
+        # vectorised call and shift it to UTC by the offset suffix.
+        timestamps = [c[0] for c in candles]
+        dates = np.array([t[:19] for t in timestamps], dtype="datetime64[ns]").view(np.int64)
+        suffixes = set(t[19:] for t in timestamps)
+        if len(suffixes) == 1:
+            dates = dates - self._utc_offset_ns(suffixes.pop())
+        elif suffixes:
+            dates = dates - np.array([self._utc_offset_ns(t[19:]) for t in timestamps], dtype=np.int64)
+
+        values = np.array([c[1:] for c in candles], dtype=np.float64).reshape(len(candles), width)
+        values = np.ascontiguousarray(values.T)
+
+        columns = {
+            "date": np.ascontiguousarray(dates),
+            "open": values[0],
+            "high": values[1],
+            "low": values[2],
+            "close": values[3],
+            "volume": values[4].astype(np.int64),
+        }
+        if width == 6:
+            columns["oi"] = values[5].astype(np.int64)
+        elif oi:
+            columns["oi"] = np.zeros(len(candles), dtype=np.int64)
+
+        return columns
+
+    def _utc_offset_ns(self, suffix):
+        """Convert a `+0530` style UTC offset to nanoseconds."""
+        if not suffix or suffix == "Z":
+            return 0
+
+        sign = -1 if suffix[0] == "-" else 1
+        digits = suffix.lstrip("+-").replace(":", "")
+        return sign * (int(digits[:2]) * 3600 + int(digits[2:4]) * 60) * 1000000000
+
     def trigger_range(self, transaction_type, *instruments):
         """Retrieve the buy/sell trigger range for Cover Orders."""
         ins = list(instruments)
@@ -808,23 +1183,61 @@ class KiteConnect(object):
         if not PY2 and type(d) == bytes:
             d = data.decode("utf-8").strip()
 
-        records = []
-        reader = csv.DictReader(StringIO(d))
+        reader = csv.reader(StringIO(d))
+        header = next(reader, None)
+        if not header:
+            return []
 
-        for row in reader:
-            row["instrument_token"] = int(row["instrument_token"])
-            row["last_price"] = float(row["last_price"])
-            row["strike"] = float(row["strike"])
-            row["tick_size"] = float(row["tick_size"])
-            row["lot_size"] = int(row["lot_size"])
+        convert = self._instrument_row_converter(header)
+        return [record for record in map(convert, reader) if record is not None]
+
+    def _instrument_row_converter(self, header, segment=None, compact=False):
+        """
+        Get a function which parses a raw instruments CSV row.
+
+        The function returns a dict (or an `Instrument` if `compact` is set), or None for
+        empty rows and rows whose segment is filtered out by `segment`.
+        """
+        header = tuple(header)
+        columns = {name: i for i, name in enumerate(header)}
+
+        if compact:
+            if header not in _instrument_types:
+                _instrument_types[header] = namedtuple("Instrument", header)
+            make = _instrument_types[header]._make
+        else:
+            def make(row):
+                return dict(zip(header, row))
+
+        if segment is None:
+            segments = None
+        else:
+            segments = set([segment] if isinstance(segment, str) else segment)
+
+        segment_i = columns.get("segment")
+        int_columns = [columns[c] for c in ("instrument_token", "lot_size")]
+        float_columns = [columns[c] for c in ("last_price", "strike", "tick_size")]
+        expiry_i = columns["expiry"]
+
+        def convert(row):
+            if not row:
+                return None
+
+            if segments is not None and row[segment_i] not in segments:
+                return None
+
+            for i in int_columns:
+                row[i] = int(row[i])
+            for i in float_columns:
+                row[i] = float(row[i])
 
             # Parse date
-            if len(row["expiry"]) == 10:
-                row["expiry"] = dateutil.parser.parse(row["expiry"]).date()
+            if len(row[expiry_i]) == 10:
+                row[expiry_i] = parse_date(row[expiry_i])
 
-            records.append(row)
+            return make(row)
 
-        return records
+        return convert
 
     def _parse_mf_instruments(self, data):
         # decode to string for Python 3
@@ -847,7 +1260,7 @@ class KiteConnect(object):
 
             # Parse date
             if len(row["last_price_date"]) == 10:
-                row["last_price_date"] = dateutil.parser.parse(row["last_price_date"]).date()
+                row["last_price_date"] = parse_date(row["last_price_date"])
 
             records.append(row)
 
@@ -872,8 +1285,80 @@ class KiteConnect(object):
         """Alias for sending a DELETE request."""
         return self._request(route, "DELETE", url_args=url_args, params=params, is_json=is_json)
 
-    def _request(self, route, method, url_args=None, params=None, is_json=False, query_params=None):
-        """Make an HTTP request."""
+    def _request(self, route, method, url_args=None, params=None, is_json=False, query_params=None, stream=False):
+        """
+        Make an HTTP request.
+
+        If `stream` is set, CSV responses are returned as an iterator of decoded lines
+        which reads the body as it arrives.
+        """
+        url, headers, query_params = self._prepare_request(route, method, url_args=url_args, params=params,
+                                                           query_params=query_params)
+
+        if method == "GET" and not stream and self.response_cache and self.response_cache.is_cached(route):
+            def fetch():
+                r = self._send(route, method, url, headers, params, is_json, query_params)
+                return r.status_code, r.headers["content-type"], r.content
+
+            status_code, content_type, content = self.response_cache.fetch(
+                route, self._cache_key(url, query_params), fetch, store=lambda raw: raw[0] == 200)
+            return self._parse_response(status_code, content_type, content)
+
+        try:
+            r = self._send(route, method, url, headers, params, is_json, query_params, stream=stream)
+        finally:
+            # Writes drop cached reads they affect, even if they failed midway.
+            if method != "GET" and self.response_cache:
+                self.response_cache.invalidate(route)
+
+        if stream and "csv" in r.headers["content-type"]:
+            return self._iter_lines(r)
+
+        return self._parse_response(r.status_code, r.headers["content-type"], r.content)
+
+    def _send(self, route, method, url, headers, params, is_json, query_params, stream=False):
+        """Send a prepared request, paced by the rate limiter if one is set."""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(route)
+
+        try:
+            r = self.reqsession.request(method,
+                                        url,
+                                        json=params if (method in ["POST", "PUT"] and is_json) else None,
+                                        data=params if (method in ["POST", "PUT"] and not is_json) else None,
+                                        params=query_params,
+                                        headers=headers,
+                                        verify=not self.disable_ssl,
+                                        allow_redirects=True,
+                                        timeout=self.timeout,
+                                        proxies=self.proxies,
+                                        stream=stream)
+        # Any requests lib related exceptions are raised here - https://requests.readthedocs.io/en/latest/api/#exceptions
+        except Exception as e:
+            raise e
+
+        if self.debug and not stream:
+            log.debug("Response: {code} {content}".format(code=r.status_code, content=r.content))
+
+        return r
+
+    def _cache_key(self, url, query_params):
+        """Build a hashable key identifying a GET request of the current login for the response cache."""
+        params = tuple(sorted((k, tuple(v) if isinstance(v, (list, tuple)) else v)
+                              for k, v in (query_params or {}).items()))
+        return self.api_key, self.access_token, url, params
+
+    def _iter_lines(self, r):
+        """Iterate over the decoded, non empty lines of a streamed response."""
+        try:
+            for line in r.iter_lines(chunk_size=64 * 1024):
+                if line:
+                    yield line.decode("utf-8")
+        finally:
+            r.close()
+
+    def _prepare_request(self, route, method, url_args=None, params=None, query_params=None):
+        """Build the url, headers and query params for a request to `route`."""
         # Form a restful URL
         if url_args:
             uri = self._routes[route].format(**url_args)
@@ -900,46 +1385,32 @@ class KiteConnect(object):
         if method in ["GET", "DELETE"]:
             query_params = params
 
-        try:
-            r = self.reqsession.request(method,
-                                        url,
-                                        json=params if (method in ["POST", "PUT"] and is_json) else None,
-                                        data=params if (method in ["POST", "PUT"] and not is_json) else None,
-                                        params=query_params,
-                                        headers=headers,
-                                        verify=not self.disable_ssl,
-                                        allow_redirects=True,
-                                        timeout=self.timeout,
-                                        proxies=self.proxies)
-        # Any requests lib related exceptions are raised here - https://requests.readthedocs.io/en/latest/api/#exceptions
-        except Exception as e:
-            raise e
-
-        if self.debug:
-            log.debug("Response: {code} {content}".format(code=r.status_code, content=r.content))
+        return url, headers, query_params
 
+    def _parse_response(self, status_code, content_type, content):
+        """Validate a raw HTTP response and return its data or raise the matching Kite exception."""
         # Validate the content type.
-        if "json" in r.headers["content-type"]:
+        if "json" in content_type:
             try:
-                data = r.json()
+                data = json.loads(content.decode("utf-8") if type(content) == bytes else content)
             except ValueError:
                 raise ex.DataException("Couldn't parse the JSON response received from the server: {content}".format(
-                    content=r.content))
+                    content=content))
 
             # api error
             if data.get("status") == "error" or data.get("error_type"):
                 # Call session hook if its registered and TokenException is raised
-                if self.session_expiry_hook and r.status_code == 403 and data["error_type"] == "TokenException":
+                if self.session_expiry_hook and status_code == 403 and data["error_type"] == "TokenException":
                     self.session_expiry_hook()
 
                 # native Kite errors
                 exp = getattr(ex, data.get("error_type"), ex.GeneralException)
-                raise exp(data["message"], code=r.status_code)
+                raise exp(data["message"], code=status_code)
 
             return data["data"]
-        elif "csv" in r.headers["content-type"]:
-            return r.content
+        elif "csv" in content_type:
+            return content
         else:
             raise ex.DataException("Unknown Content-Type ({content_type}) with response: ({content})".format(
-                content_type=r.headers["content-type"],
-                content=r.content))
+                content_type=content_type,
+                content=content))
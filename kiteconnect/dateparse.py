@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+    dateparse.py
+
+    Fast parsers for the fixed timestamp formats sent by Kite Connect.
+
+    Kite sends timestamps as `YYYY-MM-DD HH:MM:SS`, ISO 8601 with a UTC offset
+    (`YYYY-MM-DDTHH:MM:SS+0530`) or plain `YYYY-MM-DD` dates. These are parsed by
+    slicing the string, and anything else falls back to `dateutil.parser.parse`.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import datetime
+import functools
+import dateutil.parser
+import dateutil.tz
+
+
+@functools.lru_cache(maxsize=16)
+def _tzoffset(suffix):
+    """Get the tzinfo for a `+0530` style UTC offset."""
+    digits = suffix[1:].replace(":", "")
+    if len(digits) != 4 or suffix[0] not in "+-":
+        raise ValueError("Invalid UTC offset: {}".format(suffix))
+
+    seconds = int(digits[:2]) * 3600 + int(digits[2:]) * 60
+    return dateutil.tz.tzoffset(None, -seconds if suffix[0] == "-" else seconds)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_datetime(value):
+    """
+    Parse a Kite timestamp string to a `datetime`.
+
+    Naive timestamps give naive datetimes and timestamps with a UTC offset give
+    aware datetimes, the same as `dateutil.parser.parse`. Results are memoised as
+    the same timestamps repeat across orders, trades and candles.
+    """
+    try:
+        size = len(value)
+        if size == 10 and value[4] == "-" and value[7] == "-":
+            return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+        if size >= 19 and value[4] == "-" and value[7] == "-" and value[10] in " T" and value[13] == ":" \
+                and value[16] == ":":
+            tzinfo = _tzoffset(value[19:]) if size > 19 else None
+            return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                                     int(value[11:13]), int(value[14:16]), int(value[17:19]), tzinfo=tzinfo)
+    except ValueError:
+        pass
+
+    return dateutil.parser.parse(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_date(value):
+    """Parse a `YYYY-MM-DD` string to a `date`. Repeated dates such as expiries are memoised."""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+        except ValueError:
+            pass
+
+    return dateutil.parser.parse(value).date()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+    indicators.py
+
+    Incremental technical indicators over candles.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+
+
+class Indicator(object):
+    """
+    Base class of indicators which are updated one candle at a time.
+
+    Indicators keep only the state needed for the next candle, so `update()` costs the same
+    however long the series is. `seed()` initialises an indicator from a backfill, and
+    `update()` continues it with live candles, for example those of a `CandleAggregator`:
+
+        #!python
+        from kiteconnect import CandleAggregator
+        from kiteconnect.indicators import EMA, RSI, Supertrend
+
+        token = 256265
+        ema, rsi, supertrend = EMA(30), RSI(14), Supertrend(7, 3)
+
+        history = kite.historical_data(token, from_date, to_date, "minute", as_columns=True)
+        for indicator in (ema, rsi, supertrend):
+            indicator.seed(history)
+
+        def on_candle(aggregator, instrument_token, interval, candle):
+            ema.update(candle)
+            rsi.update(candle)
+            if supertrend.update(candle) and candle["close"] > ema.value:
+                buy()
+
+        candles = CandleAggregator(intervals=["minute"])
+        candles.on_candle = on_candle
+
+    Values are None until an indicator has seen enough candles. The results are the same
+    as TA-Lib's for EMA, ATR and RSI.
+    """
+
+    def __init__(self):
+        self.value = None
+
+    def update(self, candle):
+        """Add a candle dict (with `high`, `low` and `close`) and get the new value."""
+        return self._update(candle["high"], candle["low"], candle["close"])
+
+    def seed(self, candles):
+        """
+        Add a series of candles and get the value after each of them.
+
+        - `candles` is a list of candle dicts or a dict of columns, such as the
+        output of `historical_data()` with or without `as_columns`.
+
+        Seeding is deliberately scalar: it runs the same `_update()` as live candles, one
+        candle at a time, so seeded and live values follow the same arithmetic. EMA and
+        Wilder's smoothing depend on the previous value, so they don't vectorise without
+        changing the results. NumPy columns are converted to lists first, as the loop is
+        faster over Python floats than over NumPy scalars.
+        """
+        update = self._update
+        return [update(high, low, close) for high, low, close in _rows(candles)]
+
+    def _update(self, high, low, close):
+        """
+        Add the high, low and close of a candle and get the new value.
+
+        Subclasses must implement it, `update()` and `seed()` call it for every candle.
+        """
+        raise NotImplementedError("{} does not implement `_update()`.".format(type(self).__name__))
+
+
+class EMA(Indicator):
+    """Exponential moving average of closes, started from the simple average of the first `period` closes."""
+
+    def __init__(self, period=30):
+        """
+        Initialise the indicator.
+
+        - `period` is the number of candles.
+        """
+        super(EMA, self).__init__()
+        self.period = period
+        self._factor = 2.0 / (period + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def _update(self, high, low, close):
+        if self.value is not None:
+            self.value += self._factor * (close - self.value)
+            return self.value
+
+        self._count += 1
+        self._sum += close
+        if self._count == self.period:
+            self.value = self._sum / self.period
+
+        return self.value
+
+
+class ATR(Indicator):
+    """Average true range with Wilder's smoothing."""
+
+    def __init__(self, period=14):
+        """
+        Initialise the indicator.
+
+        - `period` is the number of candles.
+        """
+        super(ATR, self).__init__()
+        self.period = period
+        self._count = 0
+        self._sum = 0.0
+        self._close = None
+
+    def _update(self, high, low, close):
+        previous, self._close = self._close, close
+
+        # The first candle has no previous close for its true range.
+        if previous is None:
+            return self.value
+
+        true_range = max(high - low, abs(high - previous), abs(low - previous))
+        if self.value is not None:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+            return self.value
+
+        self._count += 1
+        self._sum += true_range
+        if self._count == self.period:
+            self.value = self._sum / self.period
+
+        return self.value
+
+
+class RSI(Indicator):
+    """Relative strength index of closes with Wilder's smoothing."""
+
+    def __init__(self, period=14):
+        """
+        Initialise the indicator.
+
+        - `period` is the number of candles.
+        """
+        super(RSI, self).__init__()
+        self.period = period
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+        self._close = None
+
+    def _update(self, high, low, close):
+        previous, self._close = self._close, close
+        if previous is None:
+            return self.value
+
+        change = close - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if self._count < self.period:
+            self._count += 1
+            self._gain += gain
+            self._loss += loss
+            if self._count < self.period:
+                return self.value
+
+            self._gain /= self.period
+            self._loss /= self.period
+        else:
+            self._gain = (self._gain * (self.period - 1) + gain) / self.period
+            self._loss = (self._loss * (self.period - 1) + loss) / self.period
+
+        total = self._gain + self._loss
+        self.value = 100 * self._gain / total if total else 0.0
+        return self.value
+
+
+class Supertrend(Indicator):
+    """
+    Supertrend direction: True in an uptrend and False in a downtrend.
+
+    The bands are the candle's mid price plus and minus `multiplier` times the ATR. The trend
+    turns up when a close is above the previous upper band and down when it's below the
+    previous lower band, and the band on the side of the trend only moves with it.
+    `line` is the band which acts as the stop: the lower band in an uptrend.
+    """
+
+    def __init__(self, period=7, multiplier=3):
+        """
+        Initialise the indicator.
+
+        - `period` is the number of candles of the ATR.
+        - `multiplier` is the distance of the bands from the mid price in ATRs.
+        """
+        super(Supertrend, self).__init__()
+        self.period = period
+        self.multiplier = multiplier
+        self.upper = None
+        self.lower = None
+
+        self._atr = ATR(period)
+        self._trend = True
+
+    @property
+    def line(self):
+        """The current supertrend line, or None."""
+        if self.value is None:
+            return None
+
+        return self.lower if self.value else self.upper
+
+    def _update(self, high, low, close):
+        atr = self._atr._update(high, low, close)
+
+        upper = lower = None
+        if atr is not None:
+            mid = (high + low) / 2
+            upper = mid + self.multiplier * atr
+            lower = mid - self.multiplier * atr
+
+        if self.upper is not None and close > self.upper:
+            self._trend = True
+        elif self.lower is not None and close < self.lower:
+            self._trend = False
+
+        if self._trend:
+            if lower is not None and self.lower is not None:
+                lower = max(lower, self.lower)
+        elif upper is not None and self.upper is not None:
+            upper = min(upper, self.upper)
+
+        self.upper, self.lower = upper, lower
+        self.value = self._trend if atr is not None else None
+        return self.value
+
+
+def _rows(candles):
+    """Iterate over the (high, low, close) of a list of candles or a dict of columns."""
+    if isinstance(candles, dict):
+        return zip(*[_column(candles[name]) for name in ("high", "low", "close")])
+
+    return ((c["high"], c["low"], c["close"]) for c in candles)
+
+
+def _column(values):
+    # Plain floats are much faster to work with than NumPy scalars.
+    return values.tolist() if hasattr(values, "tolist") else values
@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+"""
+    instruments.py
+
+    Cached access to the Kite Connect instrument master.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import os
+import array
+import json
+import bisect
+import hashlib
+import logging
+import datetime
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+# Indian Standard Time, the timezone instrument dumps are generated in.
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+class InstrumentCache(object):
+    """
+    Cache the parsed instrument master in memory and as an on-disk snapshot.
+
+    The instrument dump is generated once a day, so a snapshot is reused until the next
+    trading day starts (`refresh_time` IST). When a new dump is downloaded and its content
+    is unchanged, the existing snapshot is kept and only re-dated.
+
+        #!python
+        from kiteconnect import KiteConnect, InstrumentCache
+
+        kite = KiteConnect(api_key="your_api_key", access_token="your_access_token")
+        cache = InstrumentCache(kite)
+
+        # Downloads once a day, later calls and processes load the snapshot.
+        nfo = cache.instruments("NFO")
+
+        # Column lists, without building a dict per instrument.
+        columns = cache.columns("NFO")
+
+    Snapshots are stored column wise (numeric columns as packed arrays and text columns as
+    a single string after a JSON header), so loading one does not depend on the number of
+    rows as much as parsing the CSV does. Snapshots are plain data, and one which can't be
+    read is downloaded again.
+    """
+
+    # Time (IST) after which the previous day's dump is considered stale.
+    REFRESH_TIME = datetime.time(8, 30)
+
+    # Array typecodes of the numeric columns in a snapshot.
+    _int_columns = ("instrument_token", "lot_size")
+    _float_columns = ("last_price", "strike", "tick_size")
+    _date_columns = ("expiry",)
+
+    _snapshot_version = 2
+
+    def __init__(self, kite, path=None, refresh_time=REFRESH_TIME):
+        """
+        Initialise the instrument cache.
+
+        - `kite` is the `KiteConnect` instance used to download instruments.
+        - `path` is the directory snapshots are stored in. Defaults to `kiteconnect/instruments`
+        inside the user's cache directory (`$XDG_CACHE_HOME` or `~/.cache`).
+        - `refresh_time` is the IST time from which a new trading day's dump is fetched.
+        """
+        self.kite = kite
+        self.path = path or _default_path()
+        self.refresh_time = refresh_time
+
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def instruments(self, exchange=None):
+        """
+        Get the list of instruments, the same as `KiteConnect.instruments()`.
+
+        - `exchange` is specific exchange to fetch (Optional)
+        """
+        with self._lock:
+            return self._records(self._snapshot(exchange))
+
+    def columns(self, exchange=None):
+        """
+        Get the instruments as a dict of column name to a list of values.
+
+        Values are parsed the same way as in `instruments()`.
+
+        - `exchange` is specific exchange to fetch (Optional)
+        """
+        with self._lock:
+            return self._snapshot(exchange)["columns"]
+
+    def refresh(self, exchange=None):
+        """Download the instruments for `exchange` now, regardless of the snapshot age."""
+        key = exchange or "all"
+        with self._lock:
+            snapshot = self._refresh(key, exchange, self._trading_day(), self._memory.get(key) or self._load(key))
+            return self._records(snapshot)
+
+    def clear(self):
+        """Drop the in memory and on-disk snapshots."""
+        with self._lock:
+            self._memory = {}
+            if os.path.isdir(self.path):
+                for name in os.listdir(self.path):
+                    if name.endswith(".snapshot"):
+                        os.remove(os.path.join(self.path, name))
+
+    def _records(self, snapshot):
+        """Build the list of instrument dicts of a snapshot loaded from disk on first use."""
+        if snapshot["records"] is None:
+            columns = snapshot["columns"]
+            snapshot["records"] = [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+        return snapshot["records"]
+
+    def _snapshot(self, exchange):
+        """Get a snapshot for the current trading day from memory, disk or the API, in that order."""
+        key = exchange or "all"
+        trading_day = self._trading_day()
+
+        snapshot = self._memory.get(key)
+        if not snapshot:
+            snapshot = self._load(key)
+            if snapshot:
+                self._memory[key] = snapshot
+
+        if not snapshot or snapshot["trading_day"] != trading_day:
+            snapshot = self._refresh(key, exchange, trading_day, snapshot)
+
+        return snapshot
+
+    def _refresh(self, key, exchange, trading_day, snapshot):
+        if exchange:
+            data = self.kite._get("market.instruments", url_args={"exchange": exchange})
+        else:
+            data = self.kite._get("market.instruments.all")
+
+        digest = hashlib.sha1(data).hexdigest()
+        if snapshot and snapshot["digest"] == digest:
+            log.debug("Instruments ({}) unchanged since {}.".format(key, snapshot["trading_day"]))
+            snapshot["trading_day"] = trading_day
+        else:
+            records = self.kite._parse_instruments(data)
+            snapshot = {
+                "trading_day": trading_day,
+                "digest": digest,
+                "columns": {k: [r[k] for r in records] for k in (records[0] if records else {})},
+                "records": records,
+            }
+
+        self._memory[key] = snapshot
+        try:
+            self._save(key, snapshot)
+        except (IOError, OSError) as e:
+            # The downloaded instruments are still served from memory.
+            log.warning("Unable to save the instruments ({}) snapshot to {}: {}".format(key, self.path, e))
+
+        return snapshot
+
+    def _trading_day(self):
+        """Get the trading day the current instrument dump belongs to."""
+        now = self._now()
+        day = now.date()
+        if now.time() < self.refresh_time:
+            day -= datetime.timedelta(days=1)
+
+        return day
+
+    def _now(self):
+        return datetime.datetime.now(IST).replace(tzinfo=None)
+
+    def _snapshot_path(self, key):
+        return os.path.join(self.path, "instruments_{}.snapshot".format(key.lower()))
+
+    def _load(self, key):
+        """Load a snapshot from disk, a JSON header line followed by the column data."""
+        try:
+            with open(self._snapshot_path(key), "rb") as f:
+                header = json.loads(f.readline().decode("utf-8"))
+                if header.get("version") != self._snapshot_version:
+                    return None
+
+                size = header["size"]
+                columns = {}
+                for name, kind, length in header["columns"]:
+                    data = f.read(length)
+                    if len(data) != length:
+                        return None
+
+                    if kind == "text":
+                        columns[name] = data.decode("utf-8").split("\n") if size else []
+                    elif kind == "date":
+                        # Few distinct expiries, so build each date object once.
+                        values = array.array("q", data)
+                        dates = {o: datetime.date.fromordinal(o) for o in set(values) if o}
+                        dates[0] = ""
+                        columns[name] = [dates[o] for o in values]
+                    elif kind in ("q", "d"):
+                        columns[name] = array.array(kind, data).tolist()
+                    else:
+                        return None
+
+                    if len(columns[name]) != size:
+                        return None
+
+            trading_day = datetime.datetime.strptime(header["trading_day"], "%Y-%m-%d").date()
+        except (IOError, OSError, ValueError, KeyError, TypeError, OverflowError):
+            return None
+
+        return {"trading_day": trading_day, "digest": header["digest"], "columns": columns, "records": None}
+
+    def _save(self, key, snapshot):
+        """Write a snapshot atomically so concurrent readers never see a partial file."""
+        columns = []
+        for name, values in snapshot["columns"].items():
+            if name in self._int_columns:
+                data = array.array("q", values).tobytes()
+                kind = "q"
+            elif name in self._float_columns:
+                data = array.array("d", values).tobytes()
+                kind = "d"
+            elif name in self._date_columns:
+                # Day ordinals, 0 for instruments without an expiry.
+                data = array.array("q", [v.toordinal() if v else 0 for v in values]).tobytes()
+                kind = "date"
+            else:
+                data = "\n".join(values).encode("utf-8")
+                kind = "text"
+            columns.append((name, kind, data))
+
+        header = json.dumps({
+            "version": self._snapshot_version,
+            "trading_day": snapshot["trading_day"].isoformat(),
+            "digest": snapshot["digest"],
+            "size": len(next(iter(snapshot["columns"].values()), [])),
+            "columns": [[name, kind, len(data)] for name, kind, data in columns],
+        })
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, 0o700)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write((header + "\n").encode("utf-8"))
+                for _, _, data in columns:
+                    f.write(data)
+            os.replace(tmp_path, self._snapshot_path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _default_path():
+    """Per user cache directory of the instrument snapshots."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "kiteconnect", "instruments")
+
+
+class InstrumentIndex(object):
+    """
+    In-memory index over the instrument master for constant time lookups.
+
+    Built from the output of `KiteConnect.instruments()` (or `InstrumentCache.instruments()`),
+    it resolves instruments by `instrument_token` and by `exchange:tradingsymbol`, and keeps
+    option chains sorted by strike per exchange, underlying `name` and `expiry`.
+
+        #!python
+        from kiteconnect import InstrumentIndex
+
+        index = InstrumentIndex(kite.instruments())
+
+        index.get(9604354)["tradingsymbol"]
+        index.lookup("NFO:BANKNIFTY24OCT51000CE")["instrument_token"]
+
+        # Nearest at-the-money CE and PE of the current BANKNIFTY expiry.
+        expiry = index.nearest_expiry("BANKNIFTY")
+        ce = index.atm("BANKNIFTY", expiry, 51240.5, "CE")
+        pe = index.atm("BANKNIFTY", expiry, 51240.5, "PE")
+
+        # Underlyings with derivatives on several exchanges need the exchange.
+        index.option("USDINR", expiry, 84.0, "CE", exchange="CDS")
+
+    The `exchange` of the derivative methods can be left out for underlyings whose options
+    and futures are listed on one exchange, otherwise they raise `ValueError`.
+    """
+
+    OPTION_TYPES = ("CE", "PE")
+
+    def __init__(self, instruments):
+        """
+        Build the index.
+
+        - `instruments` is the list of instrument dicts returned by `instruments()`.
+        """
+        self._by_token = {}
+        self._by_symbol = {}
+        self._chains = {}
+        self._expiries = {}
+        self._futures = {}
+        # Exchanges listing derivatives of every underlying.
+        self._exchanges = {}
+
+        for instrument in instruments:
+            self._by_token[instrument["instrument_token"]] = instrument
+            self._by_symbol[instrument["exchange"] + ":" + instrument["tradingsymbol"]] = instrument
+
+            instrument_type = instrument["instrument_type"]
+            if instrument_type in self.OPTION_TYPES:
+                key = (instrument["exchange"], instrument["name"], instrument["expiry"])
+                chain = self._chains.setdefault(key, {"CE": {}, "PE": {}})
+                chain[instrument_type][instrument["strike"]] = instrument
+            elif instrument_type == "FUT":
+                self._futures.setdefault((instrument["exchange"], instrument["name"]), []).append(instrument)
+            else:
+                continue
+
+            self._exchanges.setdefault(instrument["name"], set()).add(instrument["exchange"])
+
+        # Sorted strikes per chain and sorted expiries per underlying.
+        for (exchange, name, expiry), chain in self._chains.items():
+            chain["strikes"] = sorted(set(chain["CE"]) | set(chain["PE"]))
+            self._expiries.setdefault((exchange, name), []).append(expiry)
+
+        for key in self._expiries:
+            self._expiries[key].sort()
+
+        for key in self._futures:
+            self._futures[key].sort(key=lambda i: i["expiry"])
+
+    def __len__(self):
+        return len(self._by_token)
+
+    def __contains__(self, key):
+        return key in self._by_token or key in self._by_symbol
+
+    def get(self, instrument_token, default=None):
+        """Get an instrument by `instrument_token`."""
+        return self._by_token.get(instrument_token, default)
+
+    def lookup(self, symbol, default=None):
+        """Get an instrument by `exchange:tradingsymbol`, for example `NSE:INFY`."""
+        return self._by_symbol.get(symbol, default)
+
+    def tokens(self, symbols):
+        """Resolve a list of `exchange:tradingsymbol` to a dict of symbol to `instrument_token`."""
+        return {s: self._by_symbol[s]["instrument_token"] for s in symbols if s in self._by_symbol}
+
+    def exchanges(self, name):
+        """Get the sorted exchanges listing options or futures of an underlying."""
+        return sorted(self._exchanges.get(name, ()))
+
+    def expiries(self, name, exchange=None):
+        """Get the sorted option expiries of an underlying."""
+        return list(self._expiries.get((self._exchange(name, exchange), name), []))
+
+    def nearest_expiry(self, name, on=None, exchange=None):
+        """
+        Get the first option expiry of an underlying on or after a date.
+
+        - `on` is the date to start from. Defaults to today.
+        """
+        expiries = self._expiries.get((self._exchange(name, exchange), name), [])
+        i = bisect.bisect_left(expiries, on or datetime.date.today())
+        return expiries[i] if i < len(expiries) else None
+
+    def futures(self, name, exchange=None):
+        """Get the futures contracts of an underlying sorted by expiry."""
+        return list(self._futures.get((self._exchange(name, exchange), name), []))
+
+    def strikes(self, name, expiry, exchange=None):
+        """Get the sorted strikes of an option chain."""
+        chain = self._chain(name, expiry, exchange)
+        return list(chain["strikes"]) if chain else []
+
+    def chain(self, name, expiry, exchange=None):
+        """
+        Get an option chain as a list of `(strike, ce, pe)` tuples sorted by strike.
+
+        `ce` or `pe` is None if the strike is only listed for the other option type.
+        """
+        chain = self._chain(name, expiry, exchange)
+        if not chain:
+            return []
+
+        return [(strike, chain["CE"].get(strike), chain["PE"].get(strike)) for strike in chain["strikes"]]
+
+    def option(self, name, expiry, strike, instrument_type, exchange=None):
+        """Get a single option contract."""
+        chain = self._chain(name, expiry, exchange)
+        return chain[instrument_type].get(strike) if chain else None
+
+    def atm(self, name, expiry, price, instrument_type, offset=0, exchange=None):
+        """
+        Get the option with the strike nearest to `price`.
+
+        - `instrument_type` is `CE` or `PE`.
+        - `offset` moves the result by this many strikes, for example `1` is one strike above ATM.
+        """
+        chain = self._chain(name, expiry, exchange)
+        if not chain:
+            return None
+
+        strikes = chain["strikes"]
+        i = bisect.bisect_left(strikes, price)
+        if i == len(strikes) or (i > 0 and price - strikes[i - 1] <= strikes[i] - price):
+            i -= 1
+
+        i += offset
+        if i < 0 or i >= len(strikes):
+            return None
+
+        return chain[instrument_type].get(strikes[i])
+
+    def _chain(self, name, expiry, exchange):
+        return self._chains.get((self._exchange(name, exchange), name, expiry))
+
+    def _exchange(self, name, exchange):
+        """Get the exchange of an underlying's derivatives when it isn't given."""
+        if exchange:
+            return exchange
+
+        exchanges = self._exchanges.get(name)
+        if not exchanges:
+            return None
+
+        if len(exchanges) > 1:
+            raise ValueError("{} is listed on {}, pass `exchange`.".format(name, ", ".join(sorted(exchanges))))
+
+        return next(iter(exchanges))
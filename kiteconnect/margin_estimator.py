@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+    margin_estimator.py
+
+    Pre-trade margin checks answered from cached basket margins.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import kiteconnect.exceptions as ex
+
+log = logging.getLogger(__name__)
+
+
+class MarginEstimator(object):
+    """
+    Answer "can I place this order?" without a margin request on the order path.
+
+    Margins are fetched with `basket_order_margins(mode="compact")`, ahead of time with
+    `prefetch()`, and cached as the margin per unit of quantity for every exchange, tradingsymbol,
+    transaction type, product and quantity bucket. `can_place()` compares the estimate with the
+    available funds from `margins()`, less the margins reserved for the orders it approved:
+
+        #!python
+        from kiteconnect import KiteConnect, MarginEstimator
+
+        kite = KiteConnect(api_key="your_api_key", access_token="your_access_token")
+        estimator = MarginEstimator(kite)
+
+        order = {"variety": kite.VARIETY_REGULAR, "exchange": kite.EXCHANGE_NFO,
+                 "tradingsymbol": "NIFTY21JUN15000CE", "transaction_type": kite.TRANSACTION_TYPE_SELL,
+                 "quantity": 50, "product": kite.PRODUCT_NRML, "order_type": kite.ORDER_TYPE_MARKET}
+        estimator.prefetch([order])
+
+        # On the order path, without a request.
+        if estimator.can_place(order):
+            try:
+                kite.place_order(**order)
+            except Exception:
+                estimator.release(order)
+                raise
+
+            estimator.placed(order)
+
+        # Keep the cache current.
+        estimator.update_price("NFO", "NIFTY21JUN15000CE", 120.5)
+        estimator.update_positions(kite.positions())
+
+    Cached margins are dropped once the price of their instrument moves beyond `price_threshold`,
+    and all of them when the net positions change, as positions change the margin benefits.
+    When an estimate is within `headroom` of the available funds, the exact margin is checked
+    with `order_margins()` in the background, and the cache and funds are updated with it.
+
+    The margin of an approved order stays reserved until `release()` is called for it, or
+    `placed()` is called and the funds are fetched again, as fetched funds include the orders
+    placed before. Reservations are identified by the order dict passed to `can_place()`.
+    """
+
+    # Quantities up to these are cached apart, as margins aren't linear in quantity.
+    BUCKETS = (1, 10, 100, 1000, 10000)
+
+    # Arguments of an order used for margin requests.
+    _margin_args = ("exchange", "tradingsymbol", "transaction_type", "variety", "product", "order_type",
+                    "quantity", "price", "trigger_price")
+
+    def __init__(self, kite, price_threshold=0.01, headroom=0.1, consider_positions=True, funds_ttl=30):
+        """
+        Initialise the estimator.
+
+        - `kite` is the `KiteConnect` instance used for margin requests.
+        - `price_threshold` is the relative price move (0.01 is 1%) after which a cached margin is dropped.
+        - `headroom` is the fraction of the available funds within which an estimate is
+        checked exactly in the background.
+        - `consider_positions` is passed to `basket_order_margins()`, to include margin benefits of positions.
+        - `funds_ttl` is the number of seconds after which the available funds are fetched again.
+        """
+        self.kite = kite
+        self.price_threshold = price_threshold
+        self.headroom = headroom
+        self.consider_positions = consider_positions
+        self.funds_ttl = funds_ttl
+
+        # Callback `on_check(estimator, order, required, available)` after a background exact check.
+        self.on_check = None
+
+        # Margins per unit of quantity with the price they were fetched at, by key.
+        self._margins = {}
+        self._funds = None
+        self._funds_at = 0
+        # Reservations of approved orders by id: segment, margin, time placed and the order.
+        self._reserved = {}
+        self._positions = None
+        self._checks = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def prefetch(self, orders):
+        """Fetch and cache the margins of a list of orders, in one basket margin request."""
+        params = [self._margin_params(order) for order in orders]
+        data = self.kite.basket_order_margins(params, consider_positions=self.consider_positions, mode="compact")
+
+        with self._lock:
+            for order, margin in zip(orders, data["orders"]):
+                self._store(order, margin["total"])
+
+    def estimate(self, order):
+        """Get the cached margin of an order, or `None` if it isn't cached."""
+        entry = self._margins.get(self._key(order))
+        if entry is None:
+            return None
+
+        return entry[0] * order["quantity"]
+
+    def available(self, segment="equity"):
+        """
+        Get the available funds of a segment (`equity` or `commodity`) less the approved orders,
+        fetching them if they're older than `funds_ttl`.
+        """
+        funds = self._funds
+        if funds is None or time.monotonic() - self._funds_at > self.funds_ttl:
+            funds = self.refresh_funds()
+
+        with self._lock:
+            return funds.get(segment, 0) - self._reserved_margin(segment)
+
+    def refresh_funds(self):
+        """
+        Fetch the available funds from `margins()`.
+
+        Reservations of orders marked `placed()` before the request are dropped, as the funds include them.
+        """
+        started = time.monotonic()
+        margins = self.kite.margins()
+        funds = {segment: margins[segment]["net"] for segment in ("equity", "commodity") if segment in margins}
+        with self._lock:
+            self._funds = funds
+            self._funds_at = time.monotonic()
+            for key, reservation in list(self._reserved.items()):
+                if reservation[2] is not None and reservation[2] <= started:
+                    del self._reserved[key]
+
+        return funds
+
+    def placed(self, order):
+        """Mark an approved order as placed, its reservation is dropped once the funds are fetched again."""
+        with self._lock:
+            reservation = self._reserved.get(id(order))
+            if reservation is not None and reservation[2] is None:
+                reservation[2] = time.monotonic()
+
+    def release(self, order):
+        """Drop the reservation of an approved order which wasn't placed or was rejected."""
+        with self._lock:
+            self._reserved.pop(id(order), None)
+
+    def can_place(self, order, reserve=True):
+        """
+        Check if the available funds cover the margin of an order.
+
+        Answered from the cache, orders which aren't cached are fetched first with `prefetch()`.
+
+        - `reserve` subtracts the margin of an approved order from the available funds until
+        it's released, or placed and the funds are fetched again, so the next orders are
+        checked against what's left.
+        """
+        if order["quantity"] <= 0:
+            raise ex.InputException("Order quantity should be greater than zero.")
+
+        required = self.estimate(order)
+        if required is None:
+            self.prefetch([order])
+            required = self.estimate(order)
+
+        segment = self._segment(order)
+        available = self.available(segment)
+        if required > available:
+            return False
+
+        if required >= available * (1 - self.headroom):
+            self.check(order)
+
+        if reserve:
+            with self._lock:
+                # The order is kept so its id isn't reused while it's reserved.
+                self._reserved[id(order)] = [segment, required, None, order]
+
+        return True
+
+    def check(self, order):
+        """
+        Check the exact margin of an order in the background.
+
+        Returns a `concurrent.futures.Future` of whether the available funds cover it. Checks of
+        the same order which are in flight are shared.
+        """
+        key = self._key(order)
+        with self._lock:
+            future = self._checks.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1)
+
+                future = self._checks[key] = self._executor.submit(self._check, key, order)
+
+        return future
+
+    def update_price(self, exchange, tradingsymbol, price):
+        """Drop the cached margins of an instrument whose price moved beyond `price_threshold`."""
+        with self._lock:
+            for key, entry in list(self._margins.items()):
+                if key[0] != exchange or key[1] != tradingsymbol:
+                    continue
+
+                if entry[1] is None:
+                    entry[1] = price
+                elif abs(price - entry[1]) > entry[1] * self.price_threshold:
+                    del self._margins[key]
+
+    def update_positions(self, positions):
+        """
+        Drop the cached margins and funds if the net positions changed.
+
+        - `positions` is the response of `positions()`.
+        """
+        net = {(p["exchange"], p["tradingsymbol"], p["product"]): p["quantity"]
+               for p in positions["net"] if p["quantity"]}
+
+        with self._lock:
+            # The first positions are those the cached margins were fetched with.
+            changed = self._positions is not None and net != self._positions
+            self._positions = net
+            if changed:
+                self._margins.clear()
+                self._funds = None
+
+    def clear(self):
+        """Drop the cached margins and funds."""
+        with self._lock:
+            self._margins.clear()
+            self._funds = None
+
+    def close(self):
+        """Stop the background checks."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _check(self, key, order):
+        try:
+            required = self.kite.order_margins([self._margin_params(order)])[0]["total"]
+            segment = self._segment(order)
+            funds = self.refresh_funds().get(segment, 0)
+
+            with self._lock:
+                self._store(order, required)
+                # Less the other approved orders, the order's own reservation is what's checked.
+                available = funds - self._reserved_margin(segment, exclude=id(order))
+        except Exception as e:
+            log.warning("Error checking the margin of {}: {}".format(order.get("tradingsymbol"), e))
+            raise
+        finally:
+            with self._lock:
+                self._checks.pop(key, None)
+
+        if self.on_check:
+            self.on_check(self, order, required, available)
+
+        return required <= available
+
+    def _reserved_margin(self, segment, exclude=None):
+        """Total reserved margin of a segment. Caller holds the lock."""
+        return sum(r[1] for key, r in self._reserved.items() if r[0] == segment and key != exclude)
+
+    def _store(self, order, total):
+        # No margin per unit without a quantity.
+        if order["quantity"] <= 0:
+            return
+
+        # Market orders have no price, it's taken from the first `update_price()`.
+        self._margins[self._key(order)] = [float(total) / order["quantity"], order.get("price") or None]
+
+    def _key(self, order):
+        quantity = order["quantity"]
+        bucket = next((b for b in self.BUCKETS if quantity <= b), None)
+        return (order["exchange"], order["tradingsymbol"], order["transaction_type"], order["product"], bucket)
+
+    def _margin_params(self, order):
+        params = {k: order[k] for k in self._margin_args if order.get(k) is not None}
+        params.setdefault("variety", "regular")
+        return params
+
+    def _segment(self, order):
+        return "commodity" if order["exchange"] == "MCX" else "equity"
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+    market_state.py
+
+    Latest market state of every instrument, kept up to date from the tick stream.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import math
+import time
+import logging
+import threading
+from array import array
+
+from .shared_ticks import _pack, _unpack, _fields
+
+log = logging.getLogger(__name__)
+
+# Positions in a token's row: token, mode, tradable, the tick fields and then the depth entries.
+_last_price = 3
+_row_size = 3 + len(_fields) + 30
+
+
+class MarketStateBook(object):
+    """
+    In-process book of the latest price, OHLC, volume, OI and market depth of every instrument.
+
+    Feed it from a `KiteTicker` to read current prices with a lookup instead of a `ltp()`
+    or `quote()` request:
+
+        #!python
+        from kiteconnect import KiteTicker, MarketStateBook
+
+        book = MarketStateBook()
+        kws = KiteTicker("your_api_key", "your_access_token")
+        kws.on_ticks = book.on_ticks
+
+        # From any thread
+        book.ltp(256265)
+        book.get(408065)["depth"]["buy"][0]["price"]
+
+        # Consistent view of several instruments
+        state = book.snapshot([256265, 13368834])
+
+    Every tick updates the fields it has, so switching an instrument to `ltp` mode
+    keeps its last known OHLC and depth. State is stored in one flat `array` of doubles,
+    a row per instrument, and read back in the same structure as the ticks passed to
+    `on_ticks`.
+
+    `on_change(book, tokens)` is called after each update with the tokens whose last price changed.
+    """
+
+    def __init__(self):
+        """Initialise an empty book."""
+        self.on_change = None
+
+        self._rows = {}
+        self._data = array("d")
+        # Time (epoch seconds) at which each row was last updated.
+        self._updated = array("d")
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, instrument_token):
+        return instrument_token in self._rows
+
+    def on_ticks(self, ws, ticks):
+        """`KiteTicker.on_ticks` callback which updates the book."""
+        self.update(ticks)
+
+    def update(self, ticks):
+        """Update the book with a list of ticks."""
+        changed = []
+        now = time.time()
+
+        with self._lock:
+            data = self._data
+            for tick in ticks:
+                token = tick["instrument_token"]
+                row = self._rows.get(token)
+                if row is None:
+                    # Add the row before publishing it to lock free readers.
+                    row = len(self._updated)
+                    data.extend([float("nan")] * _row_size)
+                    self._updated.append(0)
+                    self._rows[token] = row
+
+                offset = row * _row_size
+                last_price = data[offset + _last_price]
+
+                for i, value in enumerate(_pack(tick), offset):
+                    # Fields missing in the tick keep their last known value.
+                    if value == value:
+                        data[i] = value
+
+                self._updated[row] = now
+                if data[offset + _last_price] != last_price:
+                    changed.append(token)
+
+        if changed and self.on_change:
+            self.on_change(self, changed)
+
+    def ltp(self, instrument_token):
+        """Get the last price of an instrument, or None if it hasn't ticked."""
+        row = self._rows.get(instrument_token)
+        if row is None:
+            return None
+
+        try:
+            last_price = self._data[row * _row_size + _last_price]
+        except IndexError:
+            # Cleared meanwhile.
+            return None
+
+        return None if math.isnan(last_price) else last_price
+
+    def get(self, instrument_token):
+        """Get the latest state of an instrument as a tick dict, or None if it hasn't ticked."""
+        with self._lock:
+            values = self._row(instrument_token)
+
+        return _unpack(values) if values else None
+
+    def snapshot(self, instrument_tokens=None):
+        """
+        Get the state of several instruments as of the same moment.
+
+        - `instrument_tokens` is a list of tokens, defaulting to every instrument in the book.
+        Returns a dict of token to tick dict, without the tokens which haven't ticked.
+        """
+        with self._lock:
+            if instrument_tokens is None:
+                instrument_tokens = list(self._rows)
+
+            rows = [(token, self._row(token)) for token in instrument_tokens]
+
+        return dict((token, _unpack(values)) for token, values in rows if values)
+
+    def updated_at(self, instrument_token):
+        """Get the time (epoch seconds) of the last tick of an instrument, or None if it hasn't ticked."""
+        row = self._rows.get(instrument_token)
+        if row is None:
+            return None
+
+        try:
+            return self._updated[row]
+        except IndexError:
+            return None
+
+    def tokens(self):
+        """Get the instrument tokens in the book."""
+        return list(self._rows)
+
+    def clear(self):
+        """Remove every instrument from the book."""
+        with self._lock:
+            self._rows = {}
+            self._data = array("d")
+            self._updated = array("d")
+
+    def _row(self, token):
+        """Copy the values of a token's row for `_unpack()`. Caller holds the lock."""
+        row = self._rows.get(token)
+        if row is None:
+            return None
+
+        values = self._data[row * _row_size:(row + 1) * _row_size].tolist()
+        values[0] = int(values[0])
+        values[1] = int(values[1])
+        values[2] = bool(values[2])
+        return values
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+    order_tracker.py
+
+    Wait for orders to complete using WebSocket order updates.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+log = logging.getLogger(__name__)
+
+
+class OrderTracker(object):
+    """
+    Futures which resolve when orders reach a final status, from `KiteTicker` order updates.
+
+    Instead of polling `order_history()` after placing an order, wait for the order update
+    pushed on the WebSocket. `order_history()` is only polled, with exponential backoff,
+    while the WebSocket is disconnected.
+
+        #!python
+        from kiteconnect import KiteConnect, KiteTicker, OrderTracker
+
+        kite = KiteConnect(api_key="your_api_key", access_token="your_access_token")
+        kws = KiteTicker("your_api_key", "your_access_token")
+        tracker = OrderTracker(kite, ticker=kws)
+        kws.connect(threaded=True)
+
+        order_id = kite.place_order(...)
+        order = tracker.track(order_id).result(timeout=30)
+        if order["status"] == kite.STATUS_COMPLETE:
+            print(order["average_price"], order["filled_quantity"])
+
+        # In a coroutine
+        order = await tracker.wait(order_id, timeout=30)
+
+    Futures resolve with the order (the order update, or the latest `order_history()` entry)
+    once its status is `COMPLETE`, `REJECTED` or `CANCELLED`. Recent final updates are kept,
+    so orders which complete before `track()` is called resolve right away.
+    """
+
+    FINAL_STATUSES = ("COMPLETE", "REJECTED", "CANCELLED")
+
+    def __init__(self, kite, ticker=None, poll_initial_delay=0.5, poll_max_delay=8, history=1000):
+        """
+        Initialise the tracker.
+
+        - `kite` is the `KiteConnect` instance used to poll `order_history()`.
+        - `ticker` is the `KiteTicker` whose order updates are tracked. Its `on_order_update`
+        callback is set to the tracker's, use `on_update` to get the updates as well.
+        Without a ticker, orders are always polled.
+        - `poll_initial_delay` and `poll_max_delay` are the first and the longest delays (seconds)
+        between polls of an order.
+        - `history` is the number of recent final order updates kept.
+        """
+        self.kite = kite
+        self.ticker = ticker
+        self.poll_initial_delay = poll_initial_delay
+        self.poll_max_delay = poll_max_delay
+        self.history = history
+
+        # Callback `on_update(tracker, order)` for every order update.
+        self.on_update = None
+
+        # Futures of the tracked orders with the time and delay of their next poll.
+        self._pending = {}
+        self._final = OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+        if ticker is not None:
+            ticker.on_order_update = self.on_order_update
+
+    def on_order_update(self, ws, data):
+        """`KiteTicker.on_order_update` callback."""
+        self.update(data)
+
+    def update(self, order):
+        """Add an order update."""
+        if self.on_update:
+            self.on_update(self, order)
+
+        if order.get("status") not in self.FINAL_STATUSES:
+            return
+
+        order_id = order["order_id"]
+        with self._cond:
+            self._final[order_id] = order
+            self._final.move_to_end(order_id)
+            while len(self._final) > self.history:
+                self._final.popitem(last=False)
+
+            pending = self._pending.pop(order_id, None)
+
+        if pending is not None:
+            _resolve(pending[0], order)
+
+    def track(self, order_id):
+        """Get a `concurrent.futures.Future` which resolves with the order once it reaches a final status."""
+        with self._cond:
+            order = self._final.get(order_id)
+            if order is None:
+                pending = self._pending.get(order_id)
+                # A future cancelled by one caller is replaced for the next.
+                if pending is None or pending[0].cancelled():
+                    pending = self._pending[order_id] = [Future(), time.monotonic() + self.poll_initial_delay,
+                                                         self.poll_initial_delay]
+                    self._start()
+                    self._cond.notify_all()
+
+                return pending[0]
+
+        future = Future()
+        _resolve(future, order)
+        return future
+
+    async def wait(self, order_id, timeout=None):
+        """Wait in a coroutine for an order to reach a final status, and get the order."""
+        # Shielded, so a timeout doesn't cancel the future of other callers.
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self.track(order_id))), timeout)
+
+    def close(self):
+        """Stop polling. Pending futures are cancelled."""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+            self._cond.notify_all()
+
+        for future, _, _ in pending.values():
+            future.cancel()
+
+    def _start(self):
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._poll, name="kiteconnect-orders")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _socket_up(self):
+        return self.ticker is not None and self.ticker.is_connected()
+
+    def _poll(self):
+        """Poll the pending orders which are due while the WebSocket is down."""
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                if self._socket_up():
+                    # Updates arrive on the WebSocket, start polling afresh if it drops.
+                    for pending in self._pending.values():
+                        pending[1] = now + self.poll_initial_delay
+                        pending[2] = self.poll_initial_delay
+
+                    self._cond.wait(self.poll_initial_delay)
+                    continue
+
+                due = [order_id for order_id, pending in self._pending.items() if pending[1] <= now]
+                if not due:
+                    self._cond.wait(min(pending[1] for pending in self._pending.values()) - now)
+                    continue
+
+            for order_id in due:
+                self._poll_order(order_id)
+
+    def _poll_order(self, order_id):
+        order = None
+        try:
+            history = self.kite.order_history(order_id)
+            order = history[-1] if history else None
+        except Exception as e:
+            log.warning("Error polling order {}: {}".format(order_id, e))
+
+        if order is not None and order.get("status") in self.FINAL_STATUSES:
+            self.update(order)
+            return
+
+        with self._cond:
+            pending = self._pending.get(order_id)
+            if pending is not None:
+                pending[2] = min(pending[2] * 2, self.poll_max_delay)
+                pending[1] = time.monotonic() + pending[2]
+
+
+def _resolve(future, order):
+    # Futures cancelled by the caller are skipped.
+    if future.set_running_or_notify_cancel():
+        future.set_result(order)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+    ratelimit.py
+
+    Client side request pacing for the Kite Connect REST APIs.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import time
+import asyncio
+import threading
+
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket which hands out time slots instead of failing.
+
+    Every call to `reserve()` takes one token and returns the number of seconds the
+    caller has to wait for it. Tokens are allowed to go negative, so concurrent callers
+    are paced one after another in the order in which they reserved.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialise the bucket.
+
+        - `rate` is the number of requests allowed per second.
+        - `capacity` is the burst size. Defaults to one second worth of requests.
+        """
+        if rate <= 0:
+            raise ValueError("`rate` should be greater than zero.")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return the number of seconds to wait before it can be used."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Pace API requests per route group so that bursts are queued instead of throttled by the server.
+
+    Routes (keys of `KiteConnect._routes`) are grouped as `quote`, `historical`, `orders`
+    and `default`, each with its own token bucket. The default rates follow the documented
+    Kite Connect limits.
+
+        #!python
+        from kiteconnect import KiteConnect, RateLimiter
+
+        limiter = RateLimiter(limits={"historical": 2})
+        kite = KiteConnect(api_key="your_api_key", rate_limiter=limiter)
+
+        # Queue depth and wait times per group
+        limiter.metrics()
+    """
+
+    GROUP_QUOTE = "quote"
+    GROUP_HISTORICAL = "historical"
+    GROUP_ORDERS = "orders"
+    GROUP_DEFAULT = "default"
+
+    # Requests per second for every group.
+    DEFAULT_LIMITS = {
+        GROUP_QUOTE: 1,
+        GROUP_HISTORICAL: 3,
+        GROUP_ORDERS: 10,
+        GROUP_DEFAULT: 10,
+    }
+
+    # Routes which don't belong to the `default` group.
+    ROUTE_GROUPS = {
+        "market.quote": GROUP_QUOTE,
+        "market.quote.ohlc": GROUP_QUOTE,
+        "market.quote.ltp": GROUP_QUOTE,
+
+        "market.historical": GROUP_HISTORICAL,
+
+        "order.place": GROUP_ORDERS,
+        "order.modify": GROUP_ORDERS,
+        "order.cancel": GROUP_ORDERS,
+    }
+
+    def __init__(self, limits=None, burst=None):
+        """
+        Initialise the rate limiter.
+
+        - `limits` is a dict of group name to requests per second which overrides `DEFAULT_LIMITS`.
+        - `burst` is a dict of group name to burst size. Defaults to one second worth of requests.
+        """
+        rates = dict(self.DEFAULT_LIMITS)
+        rates.update(limits or {})
+        burst = burst or {}
+
+        self._buckets = {group: TokenBucket(rate, burst.get(group)) for group, rate in rates.items()}
+        self._metrics = {group: {"requests": 0, "queued": 0, "wait_time": 0.0, "max_wait": 0.0}
+                         for group in self._buckets}
+        self._lock = threading.Lock()
+
+    def group(self, route):
+        """Get the group name of a route."""
+        group = self.ROUTE_GROUPS.get(route, self.GROUP_DEFAULT)
+        return group if group in self._buckets else self.GROUP_DEFAULT
+
+    def acquire(self, route):
+        """Block the calling thread until a request to `route` is allowed."""
+        group, wait = self._reserve(route)
+
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release(group)
+
+    async def acquire_async(self, route):
+        """Wait without blocking the event loop until a request to `route` is allowed."""
+        group, wait = self._reserve(route)
+
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release(group)
+
+    def metrics(self):
+        """
+        Get the request metrics per group.
+
+        - `requests` is the number of requests paced so far.
+        - `queued` is the number of requests currently waiting for a slot.
+        - `wait_time` is the total time (seconds) spent waiting.
+        - `max_wait` is the longest time (seconds) a single request waited.
+        """
+        with self._lock:
+            return {group: dict(m) for group, m in self._metrics.items()}
+
+    def _reserve(self, route):
+        group = self.group(route)
+        wait = self._buckets[group].reserve()
+
+        with self._lock:
+            m = self._metrics[group]
+            m["requests"] += 1
+            if wait > 0:
+                m["queued"] += 1
+                m["wait_time"] += wait
+                m["max_wait"] = max(m["max_wait"], wait)
+
+        return group, wait
+
+    def _release(self, group):
+        with self._lock:
+            self._metrics[group]["queued"] -= 1
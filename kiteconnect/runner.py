@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+    runner.py
+
+    Long running scheduler for strategies sharing one Kite Connect session.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import time
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .instruments import InstrumentIndex
+
+log = logging.getLogger(__name__)
+
+
+class Strategy(object):
+    """
+    Base class of the strategies run by `StrategyRunner`.
+
+    Every `interval` seconds the runner calls `signal()` and then `orders()` with its result.
+    Override the hooks which are needed, state between cycles can be kept on the instance.
+    """
+
+    # Seconds between the starts of two cycles.
+    interval = 30
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def setup(self, runner):
+        """Called once before the first cycle."""
+
+    def signal(self, runner):
+        """Compute the signal of a cycle, for example from `historical_data()` and indicators."""
+
+    def orders(self, runner, signal):
+        """Act on the signal of a cycle, for example by placing or exiting orders."""
+
+    def teardown(self, runner):
+        """Called once when the runner stops."""
+
+    def on_error(self, runner, exception):
+        """Called when a hook raises an exception. The next cycle runs as scheduled."""
+        log.error("Error in strategy {}: {}".format(self.name, exception), exc_info=exception)
+
+
+class StrategyRunner(object):
+    """
+    Run strategies on a schedule in one process, with a shared `KiteConnect` session and instruments.
+
+    Strategies run in a thread pool, each on its own interval, and reuse the runner's
+    `KiteConnect` connections and instrument cache, so a cycle doesn't pay for starting
+    an interpreter, logging in or downloading instruments.
+
+        #!python
+        from kiteconnect import KiteConnect, InstrumentCache, StrategyRunner, Strategy
+
+        class NiftyCE(Strategy):
+            interval = 30
+
+            def signal(self, runner):
+                candles = runner.kite.historical_data(256265, from_date, to_date, "minute")
+                return compute_signal(candles)
+
+            def orders(self, runner, signal):
+                if signal == "Buy":
+                    option = runner.index("NFO").atm("NIFTY", expiry, runner.kite.ltp(...), "CE")
+                    runner.kite.place_order(...)
+
+        kite = KiteConnect(api_key="your_api_key", access_token="your_access_token")
+        runner = StrategyRunner(kite, instruments=InstrumentCache(kite))
+        runner.add(NiftyCE())
+        runner.add(NiftyPE())
+
+        # Blocks until `runner.stop()`, use `runner.start()` to run in a background thread.
+        runner.run()
+
+    A strategy's cycles never overlap. If a cycle takes longer than the interval, the missed
+    cycles are skipped and counted in `overruns`, and the next one starts on schedule.
+    `on_cycle(runner, strategy, seconds)` is called after every cycle with its duration.
+    """
+
+    def __init__(self, kite, instruments=None, max_workers=4):
+        """
+        Initialise the runner.
+
+        - `kite` is the `KiteConnect` instance shared by the strategies.
+        - `instruments` is an optional `InstrumentCache` for `index()`.
+        - `max_workers` is the maximum number of strategies running at the same time.
+        """
+        self.kite = kite
+        self.instruments = instruments
+        self.max_workers = max_workers
+
+        self.on_cycle = None
+        self.overruns = 0
+
+        self._strategies = []
+        self._schedule = []
+        self._indexes = {}
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+        # Marks the pool threads while they run a cycle.
+        self._local = threading.local()
+
+    def add(self, strategy, interval=None):
+        """
+        Add a strategy. Strategies added while running start right away.
+
+        - `interval` overrides the strategy's `interval` (seconds).
+        """
+        if interval is not None:
+            strategy.interval = interval
+
+        with self._cond:
+            self._strategies.append(strategy)
+            running = self._running
+
+        if running:
+            self._setup(strategy)
+            with self._cond:
+                self._push(time.monotonic(), strategy)
+
+    def index(self, exchange=None):
+        """Get an `InstrumentIndex` of the cached instruments, rebuilt only when the instruments are refreshed."""
+        if self.instruments is None:
+            raise ValueError("`index()` requires an `InstrumentCache`.")
+
+        columns = self.instruments.columns(exchange)
+        cached = self._indexes.get(exchange)
+        if cached is None or cached[0] is not columns:
+            cached = self._indexes[exchange] = (columns, InstrumentIndex(self.instruments.instruments(exchange)))
+
+        return cached[1]
+
+    def run(self):
+        """Run the strategies until `stop()` is called."""
+        with self._cond:
+            self._running = True
+
+        self._run()
+
+    def _run(self):
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        with self._cond:
+            strategies = list(self._strategies)
+
+        for strategy in strategies:
+            self._setup(strategy)
+
+        try:
+            with self._cond:
+                now = time.monotonic()
+                for strategy in strategies:
+                    self._push(now, strategy)
+
+                while self._running:
+                    now = time.monotonic()
+                    while self._schedule and self._schedule[0][0] <= now:
+                        at, _, strategy = heapq.heappop(self._schedule)
+                        executor.submit(self._cycle, strategy, at)
+
+                    # Woken early by `add()`, `stop()` and finished cycles.
+                    self._cond.wait(self._schedule[0][0] - now if self._schedule else None)
+        finally:
+            executor.shutdown(wait=True)
+            with self._cond:
+                self._running = False
+                self._schedule = []
+                strategies = list(self._strategies)
+
+            for strategy in strategies:
+                self._call(strategy, strategy.teardown, self)
+
+    def start(self):
+        """Run the strategies in a daemon thread."""
+        # Running from here on, so a `stop()` right after this isn't missed.
+        with self._cond:
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name="kiteconnect-runner")
+        self._thread.daemon = True
+        self._thread.start()
+        return self._thread
+
+    def stop(self, wait=True):
+        """
+        Stop scheduling cycles, and wait for the running ones to finish if `wait` is set.
+
+        Called from a strategy hook, it returns without waiting, as the runner waits for that hook.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        in_runner = self._thread is threading.current_thread() or getattr(self._local, "cycle", False)
+        if wait and self._thread is not None and not in_runner:
+            self._thread.join()
+
+    def _setup(self, strategy):
+        self._call(strategy, strategy.setup, self)
+
+    def _push(self, at, strategy):
+        """Schedule a cycle of a strategy. Caller holds the lock."""
+        # The id keeps strategies due at the same time from being compared.
+        heapq.heappush(self._schedule, (at, id(strategy), strategy))
+        self._cond.notify_all()
+
+    def _cycle(self, strategy, at):
+        """Run one cycle of a strategy and schedule its next one."""
+        self._local.cycle = True
+        try:
+            started = time.monotonic()
+            signal = self._call(strategy, strategy.signal, self)
+            if signal is not _failed:
+                self._call(strategy, strategy.orders, self, signal)
+
+            finished = time.monotonic()
+            if self.on_cycle:
+                self._call(strategy, self.on_cycle, self, strategy, finished - started)
+        finally:
+            self._local.cycle = False
+
+        with self._cond:
+            # Skip the cycles missed while this one ran.
+            at += strategy.interval
+            if at <= finished:
+                missed = int((finished - at) // strategy.interval) + 1
+                self.overruns += missed
+                at += missed * strategy.interval
+
+            if self._running:
+                self._push(at, strategy)
+
+    def _call(self, strategy, hook, *args):
+        try:
+            return hook(*args)
+        except Exception as e:
+            try:
+                strategy.on_error(self, e)
+            except Exception:
+                log.exception("Error in on_error of strategy {}".format(strategy.name))
+
+            return _failed
+
+
+# Result of a hook which raised.
+_failed = object()
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+    shared_ticks.py
+
+    Latest tick of every instrument in shared memory, for fanning ticks out to other processes.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import math
+import time
+import struct
+import logging
+
+import kiteconnect.exceptions as ex
+from .ticker import _fromtimestamp
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:  # pragma: no cover
+    shared_memory = None
+
+log = logging.getLogger(__name__)
+
+# Header: magic, capacity, number of tokens with a slot.
+_header = struct.Struct("<4sII4x")
+_magic = b"KTT1"
+_count = struct.Struct("<I")
+_seq = struct.Struct("<Q")
+
+# Tick fields stored as doubles, NaN where the tick doesn't have them.
+_fields = ("last_price", "last_traded_quantity", "average_traded_price", "volume_traded",
+           "total_buy_quantity", "total_sell_quantity", "open", "high", "low", "close", "change",
+           "last_trade_time", "oi", "oi_day_high", "oi_day_low", "exchange_timestamp")
+_ohlc_fields = ("open", "high", "low", "close")
+_int_fields = frozenset(("last_traded_quantity", "volume_traded", "total_buy_quantity", "total_sell_quantity",
+                         "oi", "oi_day_high", "oi_day_low"))
+_time_fields = frozenset(("last_trade_time", "exchange_timestamp"))
+_modes = ("ltp", "quote", "full")
+
+# Slot: sequence number, then token, mode, tradable, the fields and 10 depth entries of (quantity, price, orders).
+_record = struct.Struct("<IB?2x{}d30d".format(len(_fields)))
+_slot_size = _seq.size + _record.size
+_field_offsets = dict((name, _seq.size + 8 + 8 * i) for i, name in enumerate(_fields))
+_double = struct.Struct("<d")
+_nan = float("nan")
+_invalid_time = float("-inf")
+
+# Blocks created by this process (or the process it was forked from), which its resource tracker removes on exit.
+_created = set()
+
+
+class SharedTickTable(object):
+    """
+    Table of the latest tick of every instrument in shared memory.
+
+    One process owns the `KiteTicker` connection and writes its ticks to the table, and any
+    number of processes on the same machine read them, without a connection or tick decoding
+    of their own. Each instrument has a fixed slot which is overwritten by its next tick, and
+    reads are checked against concurrent writes with a sequence lock, so a reader never sees
+    a half written tick.
+
+        #!python
+        # Publisher process
+        from kiteconnect import KiteTicker, SharedTickTable
+
+        table = SharedTickTable("nifty_ticks", capacity=1000, create=True)
+        kws = KiteTicker("your_api_key", "your_access_token")
+        kws.on_ticks = lambda ws, ticks: table.write(ticks)
+
+        # Strategy processes
+        table = SharedTickTable("nifty_ticks")
+        ltp = table.value(256265, "last_price")
+        tick = table.get(256265)
+
+    Ticks read with `get()` have the same structure as the ticks passed to `on_ticks`.
+    The table must have a single writer. Requires Python 3.8 or later.
+    """
+
+    # Reads retried while a slot is being written before giving up.
+    _max_read_attempts = 100000
+
+    def __init__(self, name, capacity=4096, create=False):
+        """
+        Create or attach to a table.
+
+        - `name` is the name of the shared memory block.
+        - `capacity` is the maximum number of instruments, used when creating the table.
+        - `create` creates the table. The creating process should `unlink()` it when done.
+        """
+        if shared_memory is None:
+            raise ImportError("SharedTickTable requires Python 3.8 or later.")
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name, create=True,
+                                                   size=_header.size + 4 * capacity + _slot_size * capacity)
+            _header.pack_into(self._shm.buf, 0, _magic, capacity, 0)
+            _created.add(name)
+        else:
+            self._shm = _attach(name)
+            magic, capacity, _ = _header.unpack_from(self._shm.buf, 0)
+            if magic != _magic:
+                self._shm.close()
+                raise ex.DataException("Shared memory block `{}` is not a tick table.".format(name))
+
+        self.name = name
+        self.capacity = capacity
+        self.dropped = 0
+
+        self._buf = self._shm.buf
+        self._slots_offset = _header.size + 4 * capacity
+        # Slot of every token, read from the table's token list as it grows.
+        self._slots = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, ticks):
+        """Write ticks to the slots of their instruments. Ticks of new instruments are dropped when the table is full."""
+        buf = self._buf
+        for tick in ticks:
+            token = tick["instrument_token"]
+            slot = self._slots.get(token)
+            if slot is None:
+                slot = self._add(token)
+                if slot is None:
+                    if not self.dropped:
+                        log.warning("Tick table `{}` is full, dropping ticks of new instruments.".format(self.name))
+
+                    self.dropped += 1
+                    continue
+
+            offset = self._slots_offset + slot * _slot_size
+            seq = _seq.unpack_from(buf, offset)[0]
+
+            # An odd sequence number marks the slot as being written.
+            _seq.pack_into(buf, offset, seq + 1)
+            _record.pack_into(buf, offset + _seq.size, *_pack(tick))
+            _seq.pack_into(buf, offset, seq + 2)
+
+    def get(self, instrument_token):
+        """Get the latest tick of an instrument, or None if it hasn't ticked."""
+        record = self._read(instrument_token, _record, _seq.size)
+        return _unpack(record[1]) if record else None
+
+    def value(self, instrument_token, field):
+        """Read one field of the latest tick of an instrument, such as `last_price`, without decoding the rest."""
+        if field not in _field_offsets:
+            raise ex.InputException("Invalid tick field: {}".format(field))
+
+        record = self._read(instrument_token, _double, _field_offsets[field])
+        if not record or math.isnan(record[1][0]):
+            return None
+
+        value = record[1][0]
+        if field in _int_fields:
+            return int(value)
+        elif field in _time_fields:
+            return _fromtimestamp(value)
+
+        return value
+
+    def sequence(self, instrument_token):
+        """Get a number which changes on every tick of the instrument, to poll for new ticks. 0 if it hasn't ticked."""
+        slot = self._slot(instrument_token)
+        if slot is None:
+            return 0
+
+        return _seq.unpack_from(self._buf, self._slots_offset + slot * _slot_size)[0] // 2
+
+    def tokens(self):
+        """Get the instrument tokens in the table."""
+        self._refresh()
+        return list(self._slots)
+
+    def close(self):
+        """Detach from the shared memory block."""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the shared memory block once every process has closed it."""
+        self._shm.unlink()
+        _created.discard(self.name)
+
+    def _add(self, token):
+        count = _count.unpack_from(self._buf, 8)[0]
+        if count >= self.capacity:
+            return None
+
+        # Readers only look up the token once the count includes it.
+        _count.pack_into(self._buf, _header.size + 4 * count, token)
+        _count.pack_into(self._buf, 8, count + 1)
+        self._slots[token] = count
+        return count
+
+    def _refresh(self):
+        count = _count.unpack_from(self._buf, 8)[0]
+        for slot in range(len(self._slots), count):
+            self._slots[_count.unpack_from(self._buf, _header.size + 4 * slot)[0]] = slot
+
+    def _slot(self, token):
+        slot = self._slots.get(token)
+        if slot is None:
+            self._refresh()
+            slot = self._slots.get(token)
+
+        return slot
+
+    def _read(self, token, layout, start):
+        """Read a consistent copy of part of a slot, returning the sequence number and values."""
+        slot = self._slot(token)
+        if slot is None:
+            return None
+
+        buf = self._buf
+        offset = self._slots_offset + slot * _slot_size
+        for attempt in range(self._max_read_attempts):
+            seq = _seq.unpack_from(buf, offset)[0]
+            if seq & 1 == 0:
+                values = layout.unpack_from(buf, offset + start)
+                if _seq.unpack_from(buf, offset)[0] == seq:
+                    return (seq, values) if seq else None
+
+            # Let the writer finish.
+            time.sleep(0)
+
+        raise ex.DataException("Tick of {} is being written for too long.".format(token))
+
+
+def _attach(name):
+    """Attach to a shared memory block without letting this process' resource tracker remove it on exit."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name)
+        if name in _created:
+            return shm
+
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:  # pragma: no cover
+            pass
+
+        return shm
+
+
+def _pack(tick):
+    """Get the record values of a tick dict or `LazyTick`."""
+    ohlc = tick.get("ohlc") or {}
+    values = [tick["instrument_token"], _modes.index(tick["mode"]), tick["tradable"]]
+    for name in _fields:
+        value = ohlc.get(name) if name in _ohlc_fields else tick.get(name)
+        if name in _time_fields and name in tick:
+            # Invalid timestamps are kept as None.
+            values.append(value.timestamp() if value is not None else _invalid_time)
+        elif value is None:
+            values.append(_nan)
+        else:
+            values.append(value)
+
+    depth = tick.get("depth")
+    if depth:
+        for entry in depth["buy"] + depth["sell"]:
+            values.extend((entry["quantity"], entry["price"], entry["orders"]))
+    else:
+        values.extend([_nan] * 30)
+
+    return values
+
+
+def _unpack(values):
+    """Build a tick dict from record values."""
+    tick = {
+        "tradable": values[2],
+        "mode": _modes[values[1]],
+        "instrument_token": values[0],
+    }
+
+    ohlc = {}
+    for name, value in zip(_fields, values[3:]):
+        if math.isnan(value):
+            continue
+
+        if name in _ohlc_fields:
+            ohlc[name] = value
+        elif name in _int_fields:
+            tick[name] = int(value)
+        elif name in _time_fields:
+            tick[name] = _fromtimestamp(value)
+        else:
+            tick[name] = value
+
+    if ohlc:
+        tick["ohlc"] = ohlc
+
+    depth = values[3 + len(_fields):]
+    if not math.isnan(depth[0]):
+        entries = [{
+            "quantity": int(depth[p]),
+            "price": depth[p + 1],
+            "orders": int(depth[p + 2])
+        } for p in range(0, 30, 3)]
+
+        tick["depth"] = {
+            "buy": entries[:5],
+            "sell": entries[5:]
+        }
+
+    return tick
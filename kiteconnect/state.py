@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+    state.py
+
+    Strategy state kept in memory and persisted to an append-only journal.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import os
+import json
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+
+import kiteconnect.exceptions as ex
+
+log = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+class StateStore(object):
+    """
+    Key value store for strategy state, such as signals, open orders and average prices.
+
+    Reads are served from memory. Every change is appended to a JSON lines journal, which is
+    replayed when the store is opened, so the state survives restarts and crashes:
+
+        #!python
+        from kiteconnect import StateStore
+
+        state = StateStore("nifty_state.jsonl")
+
+        state.set("signal", {"EMA_Signal": "Buy", "close": 22150.5})
+        state.get("signal")
+
+        # One write and fsync for several changes.
+        with state.batch():
+            state.set("order", {"order_id": "210531000000001", "tradingsymbol": "NIFTY21JUN15000CE"})
+            state.set("avg_price", 121.5)
+
+    Writes are appended and synced to disk before `set()` returns (or when a `batch()` ends),
+    so a crash loses at most the change being written, and a partially written last line is
+    skipped when the journal is replayed. The journal is compacted to one line per key by
+    writing a new file and renaming it over the old one.
+
+    Values must be JSON serialisable. Dates and datetimes are stored as ISO 8601 strings, and
+    values read back after a restart are the parsed JSON. Values are returned without copying,
+    so set a new value instead of modifying a returned one. A journal should be written by
+    one process, the store is thread safe within it.
+    """
+
+    def __init__(self, path, sync=True, compact_after=1000):
+        """
+        Open a store, replaying its journal if it exists.
+
+        - `path` is the journal file.
+        - `sync` calls fsync after every write. Without it, writes survive a crash of
+        the process but not of the machine.
+        - `compact_after` is the number of journal entries after which the journal is
+        compacted, once it has more than twice as many entries as keys.
+        """
+        self.path = path
+        self.sync = sync
+        self.compact_after = compact_after
+
+        self._data = {}
+        self._pending = []
+        self._batches = 0
+        self._lines = 0
+        self._lock = threading.RLock()
+
+        self._load()
+        self._file = open(self.path, "ab")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Get the value of a key."""
+        return self._data.get(key, default)
+
+    def items(self):
+        """Get a copy of every key and value."""
+        with self._lock:
+            return dict(self._data)
+
+    def set(self, key, value):
+        """Set the value of a key."""
+        line = json.dumps({"k": key, "v": value}, default=_json_default, separators=(",", ":"))
+        with self._lock:
+            self._data[key] = value
+            self._write(line)
+
+    def update(self, values):
+        """Set the values of several keys with one write."""
+        with self.batch():
+            for key, value in values.items():
+                self.set(key, value)
+
+    def delete(self, key):
+        """Remove a key, if it exists."""
+        with self._lock:
+            if self._data.pop(key, _missing) is not _missing:
+                self._write(json.dumps({"k": key, "d": 1}, separators=(",", ":")))
+
+    @contextmanager
+    def batch(self):
+        """Group the changes made in a `with` block into one write, made when the block ends."""
+        with self._lock:
+            self._batches += 1
+            try:
+                yield self
+            finally:
+                self._batches -= 1
+                if not self._batches:
+                    self.flush()
+
+    def flush(self):
+        """Write the pending changes of a batch."""
+        with self._lock:
+            if not self._pending:
+                return
+
+            # A batch is one line, so it's replayed entirely or not at all.
+            if len(self._pending) == 1:
+                line = self._pending[0]
+            else:
+                line = '{"b":[' + ",".join(self._pending) + "]}"
+
+            self._file.write((line + "\n").encode("utf-8"))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+            self._lines += len(self._pending)
+            self._pending = []
+
+            if self._lines > self.compact_after and self._lines > 2 * len(self._data):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the journal with one line per key."""
+        with self._lock:
+            self.flush()
+
+            temp = self.path + ".tmp"
+            with open(temp, "wb") as f:
+                for key, value in self._data.items():
+                    line = json.dumps({"k": key, "v": value}, default=_json_default, separators=(",", ":"))
+                    f.write((line + "\n").encode("utf-8"))
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(temp, self.path)
+            self._sync_dir()
+
+            self._file = open(self.path, "ab")
+            self._lines = len(self._data)
+
+    def close(self):
+        """Write the pending changes and close the journal."""
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self.flush()
+            self._file.close()
+
+    def _write(self, line):
+        self._pending.append(line)
+        if not self._batches:
+            self.flush()
+
+    def _load(self):
+        """Replay the journal, dropping a partially written last line."""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        lines = data.split(b"\n")
+        for number, raw in enumerate(lines[:-1], 1):
+            if not raw:
+                continue
+
+            try:
+                entry = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                raise ex.DataException("Corrupt entry on line {} of {}.".format(number, self.path))
+
+            for change in entry.get("b", (entry,)):
+                if "d" in change:
+                    self._data.pop(change["k"], None)
+                else:
+                    self._data[change["k"]] = change["v"]
+
+                self._lines += 1
+
+        # A last line without a newline was cut short by a crash. Drop it so
+        # later entries aren't appended to it.
+        if lines[-1]:
+            log.warning("Skipping a partially written entry at the end of {}.".format(self.path))
+            with open(self.path, "r+b") as f:
+                f.truncate(len(data) - len(lines[-1]))
+
+    def _sync_dir(self):
+        """Sync the directory so the rename of a compacted journal survives a crash."""
+        if not self.sync or not hasattr(os, "O_DIRECTORY"):
+            return
+
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+# Marks a missing key.
+_missing = object()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+    tick_queue.py
+
+    Bounded hand-off of ticks from the WebSocket to a consumer thread.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import logging
+import threading
+from collections import deque, OrderedDict
+
+import kiteconnect.exceptions as ex
+
+log = logging.getLogger(__name__)
+
+
+class TickQueue(object):
+    """
+    Bounded queue which hands ticks from the WebSocket over to a consumer thread.
+
+    Without a queue `on_ticks` runs on the reactor thread, so a slow callback delays pings
+    and pong checks and the connection is dropped as dead. With a queue the reactor only
+    parses and enqueues ticks, and `on_ticks` is called on a separate thread with all the
+    ticks queued since the previous call.
+
+        #!python
+        from kiteconnect import KiteTicker, TickQueue
+
+        # Keep only the latest tick of every instrument while the callback is busy.
+        kws = KiteTicker("your_api_key", "your_access_token",
+                         tick_queue=TickQueue(maxsize=5000, policy=TickQueue.CONFLATE))
+
+    When the queue is full, the `policy` decides what happens to new ticks:
+
+    - `TickQueue.BLOCK` waits for the consumer to make room. No tick is lost, but a slow
+    consumer stalls the reactor just like without a queue, only `maxsize` ticks later.
+    - `TickQueue.DROP_OLDEST` drops the oldest queued tick.
+    - `TickQueue.CONFLATE` replaces a queued tick of the same `instrument_token` with the new
+    one, so at most one tick per instrument is queued. If the queue is full of other
+    instruments, the oldest tick is dropped.
+
+    `dropped` and `conflated` count the ticks lost to the policy. Order updates and the other
+    callbacks are not queued. A queue can be shared by tickers with the same `on_ticks`
+    callback, such as the connections of a `KiteTickerPool`.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+
+    def __init__(self, maxsize=10000, policy=BLOCK, max_batch=None):
+        """
+        Initialise the queue.
+
+        - `maxsize` is the maximum number of queued ticks.
+        - `policy` is `TickQueue.BLOCK`, `TickQueue.DROP_OLDEST` or `TickQueue.CONFLATE`.
+        - `max_batch` is the maximum number of ticks passed to one `on_ticks` call. Defaults to all queued ticks.
+        """
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.CONFLATE):
+            raise ex.InputException("Invalid tick queue policy: {}".format(policy))
+
+        if maxsize < 1:
+            raise ex.InputException("`maxsize` should be at least 1.")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_batch = max_batch
+
+        self.dropped = 0
+        self.conflated = 0
+
+        # Conflated ticks are keyed by token, in the order their token was first queued.
+        self._ticks = OrderedDict() if policy == self.CONFLATE else deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def put(self, ticks):
+        """Queue a list of ticks, applying the policy when the queue is full."""
+        with self._cond:
+            for tick in ticks:
+                if self._closed:
+                    return
+
+                if self.policy == self.CONFLATE:
+                    self._put_conflated(tick)
+                    continue
+
+                if len(self._ticks) >= self.maxsize:
+                    if self.policy == self.BLOCK:
+                        self._cond.notify_all()
+                        while len(self._ticks) >= self.maxsize and not self._closed:
+                            self._cond.wait()
+                        if self._closed:
+                            return
+                    else:
+                        self._ticks.popleft()
+                        self.dropped += 1
+
+                self._ticks.append(tick)
+
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Take the queued ticks, waiting up to `timeout` seconds for some to arrive.
+
+        Returns an empty list on timeout, and None once the queue is closed and empty.
+        """
+        with self._cond:
+            if not self._ticks and not self._closed:
+                self._cond.wait(timeout)
+
+            if not self._ticks:
+                return None if self._closed else []
+
+            count = len(self._ticks) if self.max_batch is None else min(self.max_batch, len(self._ticks))
+            if self.policy == self.CONFLATE:
+                ticks = [self._ticks.popitem(last=False)[1] for _ in range(count)]
+            else:
+                ticks = [self._ticks.popleft() for _ in range(count)]
+
+            # Wake up producers waiting for room.
+            self._cond.notify_all()
+            return ticks
+
+    def start(self, callback):
+        """Start the consumer thread which calls `callback(ticks)`, unless it's already running."""
+        with self._cond:
+            if self._thread is not None or self._closed:
+                return
+
+            self._thread = threading.Thread(target=self._consume, args=(callback,), name="kiteconnect-ticks")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def close(self):
+        """Stop accepting ticks. The consumer thread exits after the queued ticks are delivered."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """Wait for the consumer thread to exit after `close()`."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _put_conflated(self, tick):
+        token = tick["instrument_token"]
+        if token in self._ticks:
+            self.conflated += 1
+        elif len(self._ticks) >= self.maxsize:
+            self._ticks.popitem(last=False)
+            self.dropped += 1
+
+        self._ticks[token] = tick
+
+    def _consume(self, callback):
+        while True:
+            ticks = self.get()
+            if ticks is None:
+                return
+
+            if not ticks:
+                continue
+
+            try:
+                callback(ticks)
+            except Exception:
+                # A failing callback shouldn't stop the delivery of later ticks.
+                log.exception("Error in on_ticks callback")
@@ -15,6 +15,7 @@ import struct
 import logging
 import threading
 from datetime import datetime
+from collections.abc import Mapping
 from twisted.internet import reactor, ssl
 from twisted.python import log as twisted_log
 from twisted.internet.protocol import ReconnectingClientFactory
@@ -23,8 +24,69 @@ from autobahn.twisted.websocket import WebSocketClientProtocol, \
 
 from .__version__ import __version__, __title__
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 log = logging.getLogger(__name__)
 
+# Big endian layouts of the binary tick packets, keyed by packet length.
+_uint16 = struct.Struct(">H")
+_uint32 = struct.Struct(">I")
+_ltp_layout = struct.Struct(">2I")
+_ohlc_layout = struct.Struct(">4I")
+_depth_layout = struct.Struct(">" + "IIH2x" * 10)
+_packet_layouts = {
+    8: struct.Struct(">2I"),  # LTP
+    28: struct.Struct(">7I"),  # Indices quote
+    32: struct.Struct(">8I"),  # Indices full
+    44: struct.Struct(">11I"),  # Quote
+    184: struct.Struct(">16I" + "IIH2x" * 10),  # Full, with 10 depth entries of quantity, price and orders
+}
+
+# Field names of the packet layouts, used to build NumPy dtypes for tick batches. Unused fields start with `_`.
+_index_fields = ["instrument_token", "last_price", "high", "low", "open", "close", "_change"]
+_quote_fields = ["instrument_token", "last_price", "last_traded_quantity", "average_traded_price", "volume_traded",
+                 "total_buy_quantity", "total_sell_quantity", "open", "high", "low", "close"]
+_packet_fields = {
+    8: ["instrument_token", "last_price"],
+    28: _index_fields,
+    32: _index_fields + ["exchange_timestamp"],
+    44: _quote_fields,
+    184: _quote_fields + ["last_trade_time", "oi", "oi_day_high", "oi_day_low", "exchange_timestamp"],
+}
+
+# Columns of a tick batch, which are float64 if they hold prices (NaN when missing) and int64 otherwise (0 when missing).
+_batch_price_columns = ("last_price", "average_traded_price", "open", "high", "low", "close")
+_batch_int_columns = ("last_traded_quantity", "volume_traded", "total_buy_quantity", "total_sell_quantity",
+                      "oi", "oi_day_high", "oi_day_low")
+_batch_time_columns = ("last_trade_time", "exchange_timestamp")
+
+# NumPy dtypes of the packet layouts, built on first use.
+_batch_dtypes = {}
+
+
+def _fromtimestamp(timestamp):
+    """Convert an epoch timestamp to a datetime, or None if it's invalid."""
+    try:
+        return datetime.fromtimestamp(timestamp)
+    except Exception:
+        return None
+
+
+def _batch_dtype(length):
+    """Get the big endian NumPy record dtype of a packet length."""
+    dtype = _batch_dtypes.get(length)
+    if dtype is None:
+        fields = [(name, ">u4") for name in _packet_fields[length]]
+        if length == 184:
+            fields.append(("depth", [("quantity", ">u4"), ("price", ">u4"), ("orders", ">u2"), ("_padding", "V2")], (10,)))
+
+        dtype = _batch_dtypes[length] = np.dtype(fields)
+
+    return dtype
+
 
 class KiteTickerClientProtocol(WebSocketClientProtocol):
     """Kite ticker autobahn WebSocket protocol."""
@@ -248,6 +310,9 @@ class KiteTicker(object):
 
     - `on_ticks(ws, ticks)` -  Triggered when ticks are recevied.
         - `ticks` - List of `tick` object. Check below for sample structure.
+        - With a `tick_queue`, it's called on the queue's thread with the ticks queued since the previous call.
+    - `on_tick_batch(ws, batch)` -  Triggered when ticks are recevied, with all the ticks of a message as NumPy arrays (requires `numpy`).
+        - `batch` - Dict of column name to array. Check below for the columns.
     - `on_close(ws, code, reason)` -  Triggered when connection is closed.
         - `code` - WebSocket standard close event code (https://developer.mozilla.org/en-US/docs/Web/API/CloseEvent)
         - `reason` - DOMString indicating the reason the server closed the connection
@@ -337,6 +402,27 @@ class KiteTicker(object):
         ...,
         ...]
 
+    Tick batch structure (passed to the `on_tick_batch` callback)
+    ---------------------------
+    Every column holds one row per tick, in the order in which ticks were received.
+    Prices are float64 with the segment's price divisor applied and NaN where the
+    tick's mode doesn't have the field. Quantities are int64 and 0 where missing.
+
+        {
+            'instrument_token': array([53490439, 256265]),    # int64
+            'mode': array(['full', 'quote'], dtype='<U5'),
+            'tradable': array([ True, False]),
+            'last_price', 'average_traded_price',              # float64
+            'open', 'high', 'low', 'close', 'change',          # float64
+            'last_traded_quantity', 'volume_traded',           # int64
+            'total_buy_quantity', 'total_sell_quantity',       # int64
+            'oi', 'oi_day_high', 'oi_day_low',                 # int64
+            'last_trade_time', 'exchange_timestamp',           # int64 epoch nanoseconds (UTC), 0 where missing
+            'depth'                                            # float64 of shape (n, 10, 3)
+        }
+
+    `depth[i]` holds 5 buy entries followed by 5 sell entries, each as `(quantity, price, orders)`.
+
     Auto reconnection
     -----------------
 
@@ -402,7 +488,7 @@ class KiteTicker(object):
 
     def __init__(self, api_key, access_token, debug=False, root=None,
                  reconnect=True, reconnect_max_tries=RECONNECT_MAX_TRIES, reconnect_max_delay=RECONNECT_MAX_DELAY,
-                 connect_timeout=CONNECT_TIMEOUT):
+                 connect_timeout=CONNECT_TIMEOUT, lazy_ticks=False, tick_queue=None):
         """
         Initialise websocket client instance.
 
@@ -419,6 +505,8 @@ class KiteTicker(object):
         - `reconnect_max_delay` in seconds is the maximum delay after which subsequent reconnection interval will become constant. Defaults to 60s and minimum acceptable value is 5s.
         - `reconnect_max_tries` is maximum number reconnection attempts. Defaults to 50 attempts and maximum up to 300 attempts.
         - `connect_timeout` in seconds is the maximum interval after which connection is considered as timeout. Defaults to 30s.
+        - `lazy_ticks` passes ticks to `on_ticks` as `LazyTick` objects, which only decode the fields that are read.
+        - `tick_queue` is a `TickQueue` which calls `on_ticks` on a separate thread, so slow callbacks don't hold up the connection.
         """
         self.root = root or self.ROOT_URI
 
@@ -439,6 +527,8 @@ class KiteTicker(object):
             self.reconnect_max_delay = reconnect_max_delay
 
         self.connect_timeout = connect_timeout
+        self.lazy_ticks = lazy_ticks
+        self.tick_queue = tick_queue
 
         self.socket_url = "{root}?api_key={api_key}"\
             "&access_token={access_token}".format(
@@ -455,6 +545,7 @@ class KiteTicker(object):
 
         # Placeholders for callbacks.
         self.on_ticks = None
+        self.on_tick_batch = None
         self.on_open = None
         self.on_close = None
         self.on_error = None
@@ -501,6 +592,17 @@ class KiteTicker(object):
         - `disable_ssl_verification` disables building ssl context
         - `proxy` is a dictionary with keys `host` and `port` which denotes the proxy settings
         """
+        self._connect_ws(disable_ssl_verification=disable_ssl_verification, proxy=proxy)
+
+        if self.debug:
+            twisted_log.startLogging(sys.stdout)
+
+        websocket_thread = self._run_reactor(threaded)
+        if websocket_thread:
+            self.websocket_thread = websocket_thread
+
+    def _connect_ws(self, disable_ssl_verification=False, proxy=None):
+        """Start connecting the WebSocket on the reactor, without running it."""
         # Custom headers
         headers = {
             "X-Kite-Version": "3",  # For version 3
@@ -519,9 +621,9 @@ class KiteTicker(object):
         # Establish WebSocket connection to a server
         connectWS(self.factory, contextFactory=context_factory, timeout=self.connect_timeout)
 
-        if self.debug:
-            twisted_log.startLogging(sys.stdout)
-
+    @staticmethod
+    def _run_reactor(threaded):
+        """Run the reactor if it isn't running, in a daemon thread if `threaded` is set. Returns the thread."""
         # Run in seperate thread of blocking
         opts = {}
 
@@ -530,9 +632,10 @@ class KiteTicker(object):
             if threaded:
                 # Signals are not allowed in non main thread by twisted so suppress it.
                 opts["installSignalHandlers"] = False
-                self.websocket_thread = threading.Thread(target=reactor.run, kwargs=opts)
-                self.websocket_thread.daemon = True
-                self.websocket_thread.start()
+                websocket_thread = threading.Thread(target=reactor.run, kwargs=opts)
+                websocket_thread.daemon = True
+                websocket_thread.start()
+                return websocket_thread
             else:
                 reactor.run(**opts)
 
@@ -672,12 +775,25 @@ class KiteTicker(object):
 
         # If the message is binary, parse it and send it to the callback.
         if self.on_ticks and is_binary and len(payload) > 4:
-            self.on_ticks(self, self._parse_binary(payload))
+            ticks = self._parse_binary_lazy(payload) if self.lazy_ticks else self._parse_binary(payload)
+            if self.tick_queue is not None:
+                self.tick_queue.start(self._on_queued_ticks)
+                self.tick_queue.put(ticks)
+            else:
+                self.on_ticks(self, ticks)
+
+        if self.on_tick_batch and is_binary and len(payload) > 4:
+            self.on_tick_batch(self, self._parse_binary_batch(payload))
 
         # Parse text messages
         if not is_binary:
             self._parse_text_message(payload)
 
+    def _on_queued_ticks(self, ticks):
+        """Call `on_ticks` callback from the consumer thread of `tick_queue`."""
+        if self.on_ticks:
+            self.on_ticks(self, ticks)
+
     def _on_open(self, ws):
         # Resubscribe if its reconnect
         if not self._is_first_connect:
@@ -718,129 +834,215 @@ class KiteTicker(object):
 
     def _parse_binary(self, bin):
         """Parse binary data to a (list of) ticks structure."""
-        packets = self._split_packets(bin)  # split data to individual ticks packet
         data = []
 
-        for packet in packets:
-            instrument_token = self._unpack_int(packet, 0, 4)
+        for offset, length in self._packet_offsets(bin):
+            layout = _packet_layouts.get(length)
+            if layout is None:
+                continue
+
+            # Decode all the fields of a packet with a single call, without copying it out of the frame.
+            values = layout.unpack_from(bin, offset)
+            instrument_token = values[0]
             segment = instrument_token & 0xff  # Retrive segment constant from instrument_token
 
-            # Add price divisor based on segment
-            if segment == self.EXCHANGE_MAP["cds"]:
-                divisor = 10000000.0
-            elif segment == self.EXCHANGE_MAP["bcd"]:
-                divisor = 10000.0
-            else:
-                divisor = 100.0
+            divisor = self._price_divisor(segment)
 
             # All indices are not tradable
             tradable = False if segment == self.EXCHANGE_MAP["indices"] else True
 
             # LTP packets
-            if len(packet) == 8:
+            if length == 8:
                 data.append({
                     "tradable": tradable,
                     "mode": self.MODE_LTP,
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor
+                    "last_price": values[1] / divisor
                 })
             # Indices quote and full mode
-            elif len(packet) == 28 or len(packet) == 32:
-                mode = self.MODE_QUOTE if len(packet) == 28 else self.MODE_FULL
-
+            elif length == 28 or length == 32:
                 d = {
                     "tradable": tradable,
-                    "mode": mode,
+                    "mode": self.MODE_QUOTE if length == 28 else self.MODE_FULL,
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor,
+                    "last_price": values[1] / divisor,
                     "ohlc": {
-                        "high": self._unpack_int(packet, 8, 12) / divisor,
-                        "low": self._unpack_int(packet, 12, 16) / divisor,
-                        "open": self._unpack_int(packet, 16, 20) / divisor,
-                        "close": self._unpack_int(packet, 20, 24) / divisor
+                        "high": values[2] / divisor,
+                        "low": values[3] / divisor,
+                        "open": values[4] / divisor,
+                        "close": values[5] / divisor
                     }
                 }
 
                 # Compute the change price using close price and last price
-                d["change"] = 0
-                if (d["ohlc"]["close"] != 0):
-                    d["change"] = (d["last_price"] - d["ohlc"]["close"]) * 100 / d["ohlc"]["close"]
+                close = d["ohlc"]["close"]
+                d["change"] = (d["last_price"] - close) * 100 / close if close != 0 else 0
 
                 # Full mode with timestamp
-                if len(packet) == 32:
-                    try:
-                        timestamp = datetime.fromtimestamp(self._unpack_int(packet, 28, 32))
-                    except Exception:
-                        timestamp = None
-
-                    d["exchange_timestamp"] = timestamp
+                if length == 32:
+                    d["exchange_timestamp"] = _fromtimestamp(values[7])
 
                 data.append(d)
             # Quote and full mode
-            elif len(packet) == 44 or len(packet) == 184:
-                mode = self.MODE_QUOTE if len(packet) == 44 else self.MODE_FULL
-
+            else:
                 d = {
                     "tradable": tradable,
-                    "mode": mode,
+                    "mode": self.MODE_QUOTE if length == 44 else self.MODE_FULL,
                     "instrument_token": instrument_token,
-                    "last_price": self._unpack_int(packet, 4, 8) / divisor,
-                    "last_traded_quantity": self._unpack_int(packet, 8, 12),
-                    "average_traded_price": self._unpack_int(packet, 12, 16) / divisor,
-                    "volume_traded": self._unpack_int(packet, 16, 20),
-                    "total_buy_quantity": self._unpack_int(packet, 20, 24),
-                    "total_sell_quantity": self._unpack_int(packet, 24, 28),
+                    "last_price": values[1] / divisor,
+                    "last_traded_quantity": values[2],
+                    "average_traded_price": values[3] / divisor,
+                    "volume_traded": values[4],
+                    "total_buy_quantity": values[5],
+                    "total_sell_quantity": values[6],
                     "ohlc": {
-                        "open": self._unpack_int(packet, 28, 32) / divisor,
-                        "high": self._unpack_int(packet, 32, 36) / divisor,
-                        "low": self._unpack_int(packet, 36, 40) / divisor,
-                        "close": self._unpack_int(packet, 40, 44) / divisor
+                        "open": values[7] / divisor,
+                        "high": values[8] / divisor,
+                        "low": values[9] / divisor,
+                        "close": values[10] / divisor
                     }
                 }
 
                 # Compute the change price using close price and last price
-                d["change"] = 0
-                if (d["ohlc"]["close"] != 0):
-                    d["change"] = (d["last_price"] - d["ohlc"]["close"]) * 100 / d["ohlc"]["close"]
+                close = d["ohlc"]["close"]
+                d["change"] = (d["last_price"] - close) * 100 / close if close != 0 else 0
 
                 # Parse full mode
-                if len(packet) == 184:
-                    try:
-                        last_trade_time = datetime.fromtimestamp(self._unpack_int(packet, 44, 48))
-                    except Exception:
-                        last_trade_time = None
-
-                    try:
-                        timestamp = datetime.fromtimestamp(self._unpack_int(packet, 60, 64))
-                    except Exception:
-                        timestamp = None
-
-                    d["last_trade_time"] = last_trade_time
-                    d["oi"] = self._unpack_int(packet, 48, 52)
-                    d["oi_day_high"] = self._unpack_int(packet, 52, 56)
-                    d["oi_day_low"] = self._unpack_int(packet, 56, 60)
-                    d["exchange_timestamp"] = timestamp
-
-                    # Market depth entries.
-                    depth = {
-                        "buy": [],
-                        "sell": []
+                if length == 184:
+                    d["last_trade_time"] = _fromtimestamp(values[11])
+                    d["oi"] = values[12]
+                    d["oi_day_high"] = values[13]
+                    d["oi_day_low"] = values[14]
+                    d["exchange_timestamp"] = _fromtimestamp(values[15])
+
+                    # Market depth entries, 5 buy followed by 5 sell entries of (quantity, price, orders).
+                    entries = [{
+                        "quantity": values[p],
+                        "price": values[p + 1] / divisor,
+                        "orders": values[p + 2]
+                    } for p in range(16, 46, 3)]
+
+                    d["depth"] = {
+                        "buy": entries[:5],
+                        "sell": entries[5:]
                     }
 
-                    # Compile the market depth lists.
-                    for i, p in enumerate(range(64, len(packet), 12)):
-                        depth["sell" if i >= 5 else "buy"].append({
-                            "quantity": self._unpack_int(packet, p, p + 4),
-                            "price": self._unpack_int(packet, p + 4, p + 8) / divisor,
-                            "orders": self._unpack_int(packet, p + 8, p + 10, byte_format="H")
-                        })
-
-                    d["depth"] = depth
-
                 data.append(d)
 
         return data
 
+    def _parse_binary_batch(self, bin):
+        """Parse binary data to a dict of NumPy arrays with one row per tick."""
+        if np is None:
+            raise ImportError("`on_tick_batch` requires numpy. Install it with `pip install kiteconnect[numpy]`.")
+
+        # Group packets by length, as every length has its own layout.
+        groups = {}
+        n = 0
+        for offset, length in self._packet_offsets(bin):
+            if length in _packet_layouts:
+                rows, offsets = groups.setdefault(length, ([], []))
+                rows.append(n)
+                offsets.append(offset)
+                n += 1
+
+        batch = {
+            "instrument_token": np.zeros(n, dtype=np.int64),
+            "mode": np.empty(n, dtype="<U5"),
+            "tradable": np.empty(n, dtype=bool),
+            "change": np.full(n, np.nan),
+            "depth": np.full((n, 10, 3), np.nan),
+        }
+        for name in _batch_price_columns:
+            batch[name] = np.full(n, np.nan)
+        for name in _batch_int_columns + _batch_time_columns:
+            batch[name] = np.zeros(n, dtype=np.int64)
+
+        frame = np.frombuffer(bin, dtype=np.uint8)
+        for length, (rows, offsets) in groups.items():
+            # Gather the packets of one length into a (k, length) block and view it as big endian records.
+            packets = frame[np.array(offsets)[:, None] + np.arange(length)].view(_batch_dtype(length))[:, 0]
+            rows = np.array(rows)
+
+            tokens = packets["instrument_token"].astype(np.int64)
+            segments = tokens & 0xff
+            divisor = np.where(segments == self.EXCHANGE_MAP["cds"], 10000000.0,
+                               np.where(segments == self.EXCHANGE_MAP["bcd"], 10000.0, 100.0))
+
+            batch["instrument_token"][rows] = tokens
+            batch["tradable"][rows] = segments != self.EXCHANGE_MAP["indices"]
+            batch["mode"][rows] = self.MODE_LTP if length == 8 else self.MODE_QUOTE if length in (28, 44) else self.MODE_FULL
+
+            for name in _packet_fields[length]:
+                if name in _batch_price_columns:
+                    batch[name][rows] = packets[name] / divisor
+                elif name in _batch_time_columns:
+                    batch[name][rows] = packets[name].astype(np.int64) * 1000000000
+                elif name in _batch_int_columns:
+                    batch[name][rows] = packets[name]
+
+            if length != 8:
+                # Percentage change from the close price, 0 if there isn't one.
+                close = batch["close"][rows]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    change = (batch["last_price"][rows] - close) * 100 / close
+                batch["change"][rows] = np.where(close != 0, change, 0)
+
+            if length == 184:
+                depth = packets["depth"]
+                batch["depth"][rows, :, 0] = depth["quantity"]
+                batch["depth"][rows, :, 1] = depth["price"] / divisor[:, None]
+                batch["depth"][rows, :, 2] = depth["orders"]
+
+        return batch
+
+    def _parse_binary_lazy(self, bin):
+        """Parse binary data to a list of `LazyTick` views over the frame."""
+        frame = memoryview(bin)
+        ticks = []
+
+        for offset, length in self._packet_offsets(frame):
+            if length not in _packet_layouts:
+                continue
+
+            instrument_token, last_price = _ltp_layout.unpack_from(frame, offset)
+            segment = instrument_token & 0xff
+            divisor = self._price_divisor(segment)
+            ticks.append(LazyTick(frame, offset, length, instrument_token, last_price / divisor, divisor,
+                                  segment != self.EXCHANGE_MAP["indices"]))
+
+        return ticks
+
+    def _price_divisor(self, segment):
+        """Get the number prices of a segment are multiplied by in binary packets."""
+        if segment == self.EXCHANGE_MAP["cds"]:
+            return 10000000.0
+        elif segment == self.EXCHANGE_MAP["bcd"]:
+            return 10000.0
+        else:
+            return 100.0
+
+    def _packet_offsets(self, bin):
+        """Yield the offset and length of every complete packet in a frame."""
+        # Ignore heartbeat data.
+        if len(bin) < 2:
+            return
+
+        size = len(bin)
+        number_of_packets = _uint16.unpack_from(bin, 0)[0]
+
+        j = 2
+        for i in range(number_of_packets):
+            if j + 2 > size:
+                return
+
+            packet_length = _uint16.unpack_from(bin, j)[0]
+            if j + 2 + packet_length > size:
+                return
+
+            yield j + 2, packet_length
+            j = j + 2 + packet_length
+
     def _unpack_int(self, bin, start, end, byte_format="I"):
         """Unpack binary data as unsgined interger."""
         return struct.unpack(">" + byte_format, bin[start:end])[0]
@@ -861,3 +1063,142 @@ class KiteTicker(object):
             j = j + 2 + packet_length
 
         return packets
+
+
+class LazyTick(Mapping):
+    """
+    A tick which decodes its fields from the binary packet when they are read.
+
+    `instrument_token`, `last_price`, `mode` and `tradable` are decoded up front, everything
+    else (`ohlc`, `depth`, `last_trade_time` etc.) on every access. A `LazyTick` has the same
+    keys as the dict tick of its mode and can be used like one, or through attributes:
+
+        #!python
+        kws = KiteTicker("your_api_key", "your_access_token", lazy_ticks=True)
+
+        def on_ticks(ws, ticks):
+            for tick in ticks:
+                # Depth and timestamps of full mode ticks are never decoded here.
+                prices[tick.instrument_token] = tick["last_price"]
+
+    A tick holds a reference to the message it came from. Use `dict(tick)` to keep a
+    fully decoded copy or to serialise it.
+    """
+
+    __slots__ = ("_frame", "_offset", "_length", "_divisor", "instrument_token", "last_price", "tradable")
+
+    def __init__(self, frame, offset, length, instrument_token, last_price, divisor, tradable):
+        self._frame = frame
+        self._offset = offset
+        self._length = length
+        self._divisor = divisor
+        self.instrument_token = instrument_token
+        self.last_price = last_price
+        self.tradable = tradable
+
+    @property
+    def mode(self):
+        return _lazy_modes[self._length]
+
+    def __getitem__(self, key):
+        decode = _lazy_fields[self._length].get(key)
+        if decode is None:
+            raise KeyError(key)
+
+        return decode(self)
+
+    def __getattr__(self, name):
+        # Only called for fields which aren't slots.
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __iter__(self):
+        return iter(_lazy_fields[self._length])
+
+    def __len__(self):
+        return len(_lazy_fields[self._length])
+
+    def __repr__(self):
+        return "LazyTick({!r})".format(dict(self))
+
+    def __reduce__(self):
+        # Memory views can't be pickled, so a tick is sent to other processes as a dict.
+        return dict, (dict(self),)
+
+
+def _lazy_int(position):
+    return lambda tick: _uint32.unpack_from(tick._frame, tick._offset + position)[0]
+
+
+def _lazy_price(position):
+    return lambda tick: _uint32.unpack_from(tick._frame, tick._offset + position)[0] / tick._divisor
+
+
+def _lazy_time(position):
+    return lambda tick: _fromtimestamp(_uint32.unpack_from(tick._frame, tick._offset + position)[0])
+
+
+def _lazy_index_ohlc(tick):
+    high, low, open, close = _ohlc_layout.unpack_from(tick._frame, tick._offset + 8)
+    d = tick._divisor
+    return {"high": high / d, "low": low / d, "open": open / d, "close": close / d}
+
+
+def _lazy_quote_ohlc(tick):
+    open, high, low, close = _ohlc_layout.unpack_from(tick._frame, tick._offset + 28)
+    d = tick._divisor
+    return {"open": open / d, "high": high / d, "low": low / d, "close": close / d}
+
+
+def _lazy_change(tick):
+    close = _uint32.unpack_from(tick._frame, tick._offset + (20 if tick._length < 44 else 40))[0] / tick._divisor
+    return (tick.last_price - close) * 100 / close if close != 0 else 0
+
+
+def _lazy_depth(tick):
+    values = _depth_layout.unpack_from(tick._frame, tick._offset + 64)
+    entries = [{
+        "quantity": values[p],
+        "price": values[p + 1] / tick._divisor,
+        "orders": values[p + 2]
+    } for p in range(0, 30, 3)]
+
+    return {"buy": entries[:5], "sell": entries[5:]}
+
+
+# Modes and field decoders of lazy ticks per packet length, in the key order of dict ticks.
+_lazy_modes = {8: KiteTicker.MODE_LTP, 28: KiteTicker.MODE_QUOTE, 32: KiteTicker.MODE_FULL,
+               44: KiteTicker.MODE_QUOTE, 184: KiteTicker.MODE_FULL}
+_lazy_common = {
+    "tradable": lambda tick: tick.tradable,
+    "mode": lambda tick: tick.mode,
+    "instrument_token": lambda tick: tick.instrument_token,
+    "last_price": lambda tick: tick.last_price,
+}
+_lazy_index = dict(_lazy_common, ohlc=_lazy_index_ohlc, change=_lazy_change)
+_lazy_quote = dict(_lazy_common,
+                   last_traded_quantity=_lazy_int(8),
+                   average_traded_price=_lazy_price(12),
+                   volume_traded=_lazy_int(16),
+                   total_buy_quantity=_lazy_int(20),
+                   total_sell_quantity=_lazy_int(24),
+                   ohlc=_lazy_quote_ohlc,
+                   change=_lazy_change)
+_lazy_fields = {
+    8: _lazy_common,
+    28: _lazy_index,
+    32: dict(_lazy_index, exchange_timestamp=_lazy_time(28)),
+    44: _lazy_quote,
+    184: dict(_lazy_quote,
+              last_trade_time=_lazy_time(44),
+              oi=_lazy_int(48),
+              oi_day_high=_lazy_int(52),
+              oi_day_low=_lazy_int(56),
+              exchange_timestamp=_lazy_time(60),
+              depth=_lazy_depth),
+}
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+    ticker_pool.py
+
+    Spread ticker subscriptions over several WebSocket connections.
+
+    :copyright: (c) 2021 by Zerodha Technology Pvt. Ltd.
+    :license: see LICENSE for details.
+"""
+import sys
+import json
+import logging
+import threading
+from collections import OrderedDict
+from twisted.internet import reactor
+from twisted.python import log as twisted_log
+
+import kiteconnect.exceptions as ex
+from .ticker import KiteTicker
+
+log = logging.getLogger(__name__)
+
+
+class KiteTickerPool(object):
+    """
+    Shard subscriptions across several `KiteTicker` connections and merge their ticks.
+
+    Every connection can stream a limited number of instruments, so the pool assigns each
+    subscribed token to one of its connections. Tokens are balanced by the bandwidth of their
+    mode (the size of a tick packet: 8 bytes for `ltp`, 44 for `quote` and 184 for `full`)
+    rather than by count. Ticks and callbacks of all connections are delivered to the pool's
+    callbacks, which take the same arguments as `KiteTicker` callbacks with the pool as `ws`.
+
+        #!python
+        from kiteconnect import KiteTickerPool
+
+        pool = KiteTickerPool("your_api_key", "your_access_token", connections=3)
+
+        def on_ticks(ws, ticks):
+            # Ticks from every connection.
+            process(ticks)
+
+        pool.on_ticks = on_ticks
+
+        # Tokens can be subscribed before connecting, they are sent once each connection opens.
+        pool.subscribe(nfo_tokens)
+        pool.set_mode(pool.MODE_FULL, nfo_tokens[:500])
+
+        pool.connect()
+
+    When a connection closes, its tokens move to the open connections (up to `max_tokens`
+    each) so they keep streaming while it reconnects, and they are balanced again once it's
+    back. A connection which gives up reconnecting (`on_noreconnect`) is no longer used.
+    Connection callbacks (`on_connect`, `on_close`, `on_reconnect` etc.) are called once
+    per connection, while order updates received on several connections are delivered once.
+    """
+
+    MODE_FULL = KiteTicker.MODE_FULL
+    MODE_QUOTE = KiteTicker.MODE_QUOTE
+    MODE_LTP = KiteTicker.MODE_LTP
+
+    # Weight of a token in each mode, the size (bytes) of its tick packets.
+    MODE_WEIGHTS = {
+        MODE_LTP: 8,
+        MODE_QUOTE: 44,
+        MODE_FULL: 184,
+    }
+
+    # Kite Connect allows 3 connections per API key with up to 3000 instruments each.
+    DEFAULT_CONNECTIONS = 3
+    DEFAULT_MAX_TOKENS = 3000
+
+    # Number of recent order updates remembered to drop the copies received on other connections.
+    _order_update_history = 1000
+
+    def __init__(self, api_key, access_token, connections=DEFAULT_CONNECTIONS, max_tokens=DEFAULT_MAX_TOKENS,
+                 **kwargs):
+        """
+        Initialise the pool.
+
+        - `api_key` and `access_token` are the same as in `KiteTicker`.
+        - `connections` is the number of WebSocket connections.
+        - `max_tokens` is the maximum number of tokens subscribed on one connection.
+        - Other keyword arguments (`debug`, `root`, `reconnect_max_tries` etc.) are passed to every `KiteTicker`.
+        """
+        if connections < 1:
+            raise ValueError("`connections` should be at least 1.")
+
+        self.debug = kwargs.get("debug", False)
+        self.max_tokens = max_tokens
+        self.tickers = [KiteTicker(api_key, access_token, **kwargs) for _ in range(connections)]
+
+        # Placeholders for callbacks.
+        self._on_ticks = None
+        self._on_tick_batch = None
+        self.on_open = None
+        self.on_close = None
+        self.on_error = None
+        self.on_connect = None
+        self.on_message = None
+        self.on_reconnect = None
+        self.on_noreconnect = None
+        self.on_order_update = None
+
+        # Connection of every subscribed token.
+        self._owners = {}
+        # Connections which are closed and connections which stopped reconnecting.
+        self._down = set()
+        self._dead = set()
+        self._opened = set()
+
+        self._order_updates = OrderedDict()
+        self._lock = threading.RLock()
+
+        for ticker in self.tickers:
+            ticker.on_open = self._handle_open
+            ticker.on_close = self._handle_close
+            ticker.on_error = self._handle_error
+            ticker.on_connect = self._handle_connect
+            ticker.on_message = self._handle_message
+            ticker.on_reconnect = self._handle_reconnect
+            ticker.on_noreconnect = self._handle_noreconnect
+            ticker.on_order_update = self._handle_order_update
+
+    @property
+    def on_ticks(self):
+        """Callback `on_ticks(ws, ticks)` for the ticks of every connection."""
+        return self._on_ticks
+
+    @on_ticks.setter
+    def on_ticks(self, callback):
+        # Connections only parse messages into ticks if there's a callback for them.
+        self._on_ticks = callback
+        for ticker in self.tickers:
+            ticker.on_ticks = self._handle_ticks if callback else None
+
+    @property
+    def on_tick_batch(self):
+        """Callback `on_tick_batch(ws, batch)` for the ticks of every connection as NumPy columns."""
+        return self._on_tick_batch
+
+    @on_tick_batch.setter
+    def on_tick_batch(self, callback):
+        self._on_tick_batch = callback
+        for ticker in self.tickers:
+            ticker.on_tick_batch = self._handle_tick_batch if callback else None
+
+    @property
+    def subscribed_tokens(self):
+        """Dict of every subscribed token to its mode."""
+        with self._lock:
+            tokens = {}
+            for ticker in self.tickers:
+                tokens.update(ticker.subscribed_tokens)
+
+            return tokens
+
+    def connect(self, threaded=False, disable_ssl_verification=False, proxy=None):
+        """
+        Establish all the WebSocket connections.
+
+        Takes the same arguments as `KiteTicker.connect()`.
+        """
+        for ticker in self.tickers:
+            ticker._connect_ws(disable_ssl_verification=disable_ssl_verification, proxy=proxy)
+
+        if self.debug:
+            twisted_log.startLogging(sys.stdout)
+
+        websocket_thread = KiteTicker._run_reactor(threaded)
+        if websocket_thread:
+            self.websocket_thread = websocket_thread
+
+    def is_connected(self):
+        """Check if any of the WebSocket connections is established."""
+        return any(ticker.is_connected() for ticker in self.tickers)
+
+    def close(self, code=None, reason=None):
+        """Close all the WebSocket connections."""
+        for ticker in self.tickers:
+            ticker.close(code, reason)
+
+    def stop(self):
+        """Stop the event loop. Should be used if main thread has to be closed in `on_close` method."""
+        reactor.stop()
+
+    def stop_retry(self):
+        """Stop auto retry of all the connections."""
+        for ticker in self.tickers:
+            ticker.stop_retry()
+
+    def subscribe(self, instrument_tokens):
+        """
+        Subscribe to a list of instrument_tokens.
+
+        New tokens are added to the least loaded connections.
+
+        - `instrument_tokens` is list of instrument instrument_tokens to subscribe
+        """
+        with self._lock:
+            new = self._new_tokens(instrument_tokens)
+            self._assign(new, self.MODE_QUOTE)
+
+            new = set(new)
+            for ticker, tokens in self._group([t for t in instrument_tokens if t not in new]).items():
+                if ticker.is_connected():
+                    ticker.subscribe(tokens)
+                else:
+                    for token in tokens:
+                        ticker.subscribed_tokens[token] = self.MODE_QUOTE
+
+            return True
+
+    def unsubscribe(self, instrument_tokens):
+        """
+        Unsubscribe the given list of instrument_tokens.
+
+        - `instrument_tokens` is list of instrument_tokens to unsubscribe.
+        """
+        with self._lock:
+            for ticker, tokens in self._group(instrument_tokens).items():
+                self._remove(ticker, tokens)
+
+            return True
+
+    def set_mode(self, mode, instrument_tokens):
+        """
+        Set streaming mode for the given list of tokens, subscribing to the ones which aren't subscribed yet.
+
+        - `mode` is the mode to set. It can be one of the following class constants:
+            MODE_LTP, MODE_QUOTE, or MODE_FULL.
+        - `instrument_tokens` is list of instrument tokens on which the mode should be applied
+        """
+        with self._lock:
+            new = self._new_tokens(instrument_tokens)
+            self._assign(new, mode)
+
+            new = set(new)
+            for ticker, tokens in self._group([t for t in instrument_tokens if t not in new]).items():
+                if ticker.is_connected():
+                    ticker.set_mode(mode, tokens)
+                else:
+                    for token in tokens:
+                        ticker.subscribed_tokens[token] = mode
+
+            return True
+
+    def resubscribe(self):
+        """Resubscribe to all current subscribed tokens on every open connection."""
+        for ticker in self.tickers:
+            if ticker.is_connected():
+                ticker.resubscribe()
+
+    def rebalance(self):
+        """
+        Move tokens off closed connections and even out the load of the open ones.
+
+        This is done automatically when connections close and open.
+        """
+        with self._lock:
+            targets = self._targets()
+            if not targets:
+                return
+
+            loads = {ticker: self._load(ticker) for ticker in targets}
+            counts = {ticker: len(ticker.subscribed_tokens) for ticker in targets}
+            pending = {ticker: self._by_mode(ticker) for ticker in targets}
+            # Original connection and destination of every token which moves.
+            origins = {}
+            destinations = {}
+
+            def move(token, mode, source, target):
+                origins.setdefault(token, (source, mode))
+                destinations[token] = target
+                pending[target].setdefault(mode, []).append(token)
+
+                weight = self.MODE_WEIGHTS.get(mode, 0)
+                loads[target] += weight
+                counts[target] += 1
+                if source in loads:
+                    loads[source] -= weight
+                    counts[source] -= 1
+
+            # Tokens of closed connections go to the least loaded open ones with room for them.
+            for ticker in self.tickers:
+                if ticker in loads:
+                    continue
+
+                for token, mode in list(ticker.subscribed_tokens.items()):
+                    target = self._lightest(targets, loads, counts)
+                    if target is None:
+                        break
+
+                    move(token, mode, ticker, target)
+
+            # Then move single tokens from the heaviest to the lightest connection while that narrows the gap.
+            # Every move lowers the sum of squared loads, so this ends.
+            while len(targets) > 1:
+                heavy = max(targets, key=loads.get)
+                light = min(targets, key=loads.get)
+                if counts[light] >= self.max_tokens:
+                    break
+
+                gap = loads[heavy] - loads[light]
+                modes = [m for m, tokens in pending[heavy].items() if tokens and 0 < self.MODE_WEIGHTS.get(m, 0) < gap]
+                if not modes:
+                    break
+
+                mode = max(modes, key=self.MODE_WEIGHTS.get)
+                move(pending[heavy][mode].pop(), mode, heavy, light)
+
+            moves = {}
+            for token, (source, mode) in origins.items():
+                if destinations[token] is not source:
+                    moves.setdefault((source, destinations[token], mode), []).append(token)
+
+            self._apply(moves)
+
+    def loads(self):
+        """Get the number of tokens and their total weight on every connection."""
+        with self._lock:
+            return [{"tokens": len(ticker.subscribed_tokens), "weight": self._load(ticker),
+                     "connected": ticker.is_connected()} for ticker in self.tickers]
+
+    def _new_tokens(self, instrument_tokens):
+        """Get the tokens which aren't subscribed yet, after checking that they fit in the pool."""
+        new = list(OrderedDict.fromkeys(t for t in instrument_tokens if t not in self._owners))
+        room = sum(max(0, self.max_tokens - len(t.subscribed_tokens)) for t in self.tickers if t not in self._dead)
+        if len(new) > room:
+            raise ex.InputException("Can't subscribe to {} more tokens, the pool has room for {}.".format(
+                len(new), room))
+
+        return new
+
+    def _assign(self, tokens, mode):
+        """Subscribe new tokens on the least loaded connections."""
+        if not tokens:
+            return
+
+        targets = self._targets() or [t for t in self.tickers if t not in self._dead]
+        loads = {ticker: self._load(ticker) for ticker in targets}
+        counts = {ticker: len(ticker.subscribed_tokens) for ticker in targets}
+        weight = self.MODE_WEIGHTS.get(mode, 0)
+
+        groups = {}
+        for token in tokens:
+            target = self._lightest(targets, loads, counts)
+            if target is None:
+                # Open connections are full, use the ones which are reconnecting.
+                targets = [t for t in self.tickers if t not in self._dead]
+                for ticker in targets:
+                    loads.setdefault(ticker, self._load(ticker))
+                    counts.setdefault(ticker, len(ticker.subscribed_tokens))
+                target = self._lightest(targets, loads, counts)
+
+            groups.setdefault(target, []).append(token)
+            loads[target] += weight
+            counts[target] += 1
+
+        for ticker, group in groups.items():
+            self._add(ticker, mode, group)
+
+    def _apply(self, moves):
+        for (source, target, mode), tokens in moves.items():
+            if self.debug:
+                log.debug("Moving {} {} tokens to another connection.".format(len(tokens), mode))
+
+            self._remove(source, tokens)
+            self._add(target, mode, tokens)
+
+    def _add(self, ticker, mode, tokens):
+        for token in tokens:
+            self._owners[token] = ticker
+
+        if ticker.is_connected():
+            ticker.subscribe(tokens)
+            ticker.set_mode(mode, tokens)
+        else:
+            # Sent by `resubscribe()` once the connection opens.
+            for token in tokens:
+                ticker.subscribed_tokens[token] = mode
+
+    def _remove(self, ticker, tokens):
+        for token in tokens:
+            if self._owners.get(token) is ticker:
+                del self._owners[token]
+
+        if ticker.is_connected():
+            ticker.unsubscribe(tokens)
+        else:
+            for token in tokens:
+                ticker.subscribed_tokens.pop(token, None)
+
+    def _group(self, instrument_tokens):
+        """Group subscribed tokens by their connection."""
+        groups = {}
+        for token in instrument_tokens:
+            ticker = self._owners.get(token)
+            if ticker is not None:
+                groups.setdefault(ticker, []).append(token)
+
+        return groups
+
+    def _targets(self):
+        """Get the connections which can take tokens."""
+        return [t for t in self.tickers if t not in self._down and t not in self._dead]
+
+    def _lightest(self, targets, loads, counts):
+        """Get the least loaded connection with room for another token."""
+        available = [t for t in targets if counts[t] < self.max_tokens]
+        return min(available, key=loads.get) if available else None
+
+    def _load(self, ticker):
+        return sum(self.MODE_WEIGHTS.get(mode, 0) for mode in ticker.subscribed_tokens.values())
+
+    def _by_mode(self, ticker):
+        modes = {}
+        for token, mode in ticker.subscribed_tokens.items():
+            modes.setdefault(mode, []).append(token)
+
+        return modes
+
+    def _handle_ticks(self, ticker, ticks):
+        if self._on_ticks:
+            self._on_ticks(self, ticks)
+
+    def _handle_tick_batch(self, ticker, batch):
+        if self._on_tick_batch:
+            self._on_tick_batch(self, batch)
+
+    def _handle_message(self, ticker, payload, is_binary):
+        if self.on_message:
+            self.on_message(self, payload, is_binary)
+
+    def _handle_connect(self, ticker, response):
+        if self.on_connect:
+            self.on_connect(self, response)
+
+    def _handle_open(self, ticker):
+        with self._lock:
+            self._down.discard(ticker)
+
+            # Tokens assigned before the first connect. Reconnects are resubscribed by the ticker itself.
+            if ticker not in self._opened:
+                self._opened.add(ticker)
+                if ticker.subscribed_tokens:
+                    ticker.resubscribe()
+
+            self.rebalance()
+
+        if self.on_open:
+            self.on_open(self)
+
+    def _handle_close(self, ticker, code, reason):
+        with self._lock:
+            self._down.add(ticker)
+            self.rebalance()
+
+        if self.on_close:
+            self.on_close(self, code, reason)
+
+    def _handle_error(self, ticker, code, reason):
+        if self.on_error:
+            self.on_error(self, code, reason)
+
+    def _handle_reconnect(self, ticker, attempts_count):
+        if self.on_reconnect:
+            self.on_reconnect(self, attempts_count)
+
+    def _handle_noreconnect(self, ticker):
+        with self._lock:
+            self._dead.add(ticker)
+            self.rebalance()
+
+        if self.on_noreconnect:
+            self.on_noreconnect(self)
+
+    def _handle_order_update(self, ticker, data):
+        # Every connection of the user receives the same order updates.
+        key = json.dumps(data, sort_keys=True, default=str)
+        with self._lock:
+            if key in self._order_updates:
+                return
+
+            self._order_updates[key] = True
+            if len(self._order_updates) > self._order_update_history:
+                self._order_updates.popitem(last=False)
+
+        if self.on_order_update:
+            self.on_order_update(self, data)
@@ -53,6 +53,8 @@ setup(
     setup_requires=["pytest-runner"],
     extras_require={
         "doc": ["pdoc"],
+        "async": ["aiohttp>=3.6.0"],
+        "numpy": ["numpy"],
         ':sys_platform=="win32"': ["pywin32"]
     }
 )
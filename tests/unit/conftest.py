@@ -36,7 +36,7 @@ def kiteconnect_with_pooling():
 @pytest.fixture()
 def kiteticker():
     """Init Kite ticker object."""
-    kws = KiteTicker("<API-KEY>", "<PUB-TOKEN>", "<USER-ID>", debug=True, reconnect=False)
+    kws = KiteTicker("<API-KEY>", "<ACCESS-TOKEN>", debug=True, reconnect=False)
     kws.socket_url = "ws://127.0.0.1:9000?api_key=<API-KEY>?&user_id=<USER-ID>&public_token=<PUBLIC-TOKEN>"
     return kws
 
@@ -57,3 +57,13 @@ def protocol():
     p.state = p.STATE_OPEN
     p.websocket_version = 18
     return p
+
+
+@pytest.fixture()
+def async_kiteconnect():
+    """Init asyncio Kite connect object."""
+    from kiteconnect import AsyncKiteConnect
+
+    kiteconnect = AsyncKiteConnect(api_key='<API-KEY>', access_token='<ACCESS-TOKEN>')
+    kiteconnect.root = 'http://kite_trade_test'
+    return kiteconnect
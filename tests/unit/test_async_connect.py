@@ -0,0 +1,216 @@
+# coding: utf-8
+"""AsyncKiteConnect tests"""
+import json
+import asyncio
+import datetime
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import RateLimiter
+
+
+class FakeResponse(object):
+    """Minimal stand-in for an aiohttp response."""
+
+    def __init__(self, body, status=200, content_type="application/json"):
+        self.body = body.encode("utf-8")
+        self.status = status
+        self.headers = {"content-type": content_type}
+        self.content = FakeStream(self.body)
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeStream(object):
+    """Body reader which returns a few bytes at a time."""
+
+    def __init__(self, body):
+        self.body = body
+
+    async def read(self, n=-1):
+        chunk, self.body = self.body[:7], self.body[7:]
+        return chunk
+
+
+class FakeSession(object):
+    """Record requests and reply with canned responses keyed by (method, path)."""
+
+    closed = False
+
+    def __init__(self, root, responses):
+        self.root = root
+        self.responses = responses
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return FakeResponse(*self.responses[(method, url[len(self.root):])])
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def fake_session(kite, responses):
+    session = FakeSession(kite.root, responses)
+    kite._get_session = lambda: session
+    return session
+
+
+def test_positions(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("GET", "/portfolio/positions"): ('{"status": "success", "data": {"net": [], "day": []}}',)
+    })
+    positions = run(async_kiteconnect.positions())
+    assert positions == {"net": [], "day": []}
+
+    method, url, kwargs = session.requests[0]
+    assert kwargs["headers"]["Authorization"] == "token <API-KEY>:<ACCESS-TOKEN>"
+    assert kwargs["headers"]["X-Kite-Version"] == "3"
+
+
+def test_orders_formatted(async_kiteconnect):
+    fake_session(async_kiteconnect, {
+        ("GET", "/orders"): (json.dumps({"status": "success", "data": [
+            {"order_id": "1", "order_timestamp": "2021-05-31 09:18:57"}
+        ]}),)
+    })
+    orders = run(async_kiteconnect.orders())
+    assert orders[0]["order_timestamp"] == datetime.datetime(2021, 5, 31, 9, 18, 57)
+
+
+def test_quote_params(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("GET", "/quote"): ('{"status": "success", "data": {"NSE:INFY": {"last_price": 1}}}',)
+    })
+    quote = run(async_kiteconnect.quote(["NSE:INFY", "NSE:SBIN"]))
+    assert quote["NSE:INFY"]["last_price"] == 1
+    assert session.requests[0][2]["params"] == [("i", "NSE:INFY"), ("i", "NSE:SBIN")]
+
+
+def test_place_order(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("POST", "/orders/regular"): ('{"status": "success", "data": {"order_id": "151220000000000"}}',)
+    })
+    order_id = run(async_kiteconnect.place_order(variety="regular",
+                                                 exchange="NSE",
+                                                 tradingsymbol="INFY",
+                                                 transaction_type="BUY",
+                                                 quantity=1,
+                                                 product="CNC",
+                                                 order_type="MARKET"))
+    assert order_id == "151220000000000"
+    assert ("price", "None") not in session.requests[0][2]["data"]
+    assert ("quantity", "1") in session.requests[0][2]["data"]
+
+
+@pytest.mark.parametrize("error_type", ["OrderException", "InputException", "CustomException"])
+def test_native_exceptions(error_type, async_kiteconnect):
+    fake_session(async_kiteconnect, {
+        ("GET", "/orders"): ('{"error_type": "%s", "message": "oops"}' % error_type, 400)
+    })
+    with pytest.raises(getattr(ex, error_type, ex.GeneralException)) as exc:
+        run(async_kiteconnect.orders())
+    assert exc.value.code == 400
+
+
+def test_session_expiry_hook(async_kiteconnect):
+    calls = []
+    async_kiteconnect.set_session_expiry_hook(lambda: calls.append(True))
+    fake_session(async_kiteconnect, {
+        ("GET", "/portfolio/positions"): ('{"error_type": "TokenException", "message": "Please login again"}', 403)
+    })
+    with pytest.raises(ex.TokenException):
+        run(async_kiteconnect.positions())
+    assert calls == [True]
+
+
+def test_historical_data_range(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("GET", "/instruments/historical/256265/day"): (json.dumps({"status": "success", "data": {"candles": [
+            ["2021-01-01T00:00:00+0530", 1, 2, 0.5, 1.5, 10],
+        ]}}),)
+    })
+    data = run(async_kiteconnect.historical_data_range(256265, "2015-01-01", "2021-01-01", "day"))
+    # Every window returns the same candle, which is only kept once.
+    assert len(session.requests) == 2
+    assert len(data) == 1
+
+
+def test_iter_instruments(async_kiteconnect):
+    fake_session(async_kiteconnect, {
+        ("GET", "/instruments/NFO"): (
+            "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,"
+            "instrument_type,segment,exchange\n"
+            "9604354,37517,BANKNIFTY24OCT51000CE,BANKNIFTY,0,2024-10-30,51000,0.05,15,CE,NFO-OPT,NFO\n"
+            "9604000,37500,BANKNIFTY24OCTFUT,BANKNIFTY,0,2024-10-30,0,0.05,15,FUT,NFO-FUT,NFO",
+            200, "text/csv")
+    })
+
+    async def collect():
+        return [i async for i in async_kiteconnect.iter_instruments("NFO", compact=True)]
+
+    instruments = run(collect())
+    assert [i.instrument_token for i in instruments] == [9604354, 9604000]
+    assert instruments[0].expiry == datetime.date(2024, 10, 30)
+
+
+def test_quote_batching(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("GET", "/quote"): ('{"status": "success", "data": {"NSE:INFY": {"last_price": 1}}}',)
+    })
+    async_kiteconnect._pacer = RateLimiter(limits={"quote": 20}, burst={"quote": 1})
+    run(async_kiteconnect.quote(["NSE:INFY"] * 1200))
+    assert [len(r[2]["params"]) for r in session.requests] == [500, 500, 200]
+    assert async_kiteconnect._pacer.metrics()["quote"]["requests"] == 3
+
+
+def test_exit_all_positions(async_kiteconnect):
+    session = fake_session(async_kiteconnect, {
+        ("GET", "/portfolio/positions"): (json.dumps({"status": "success", "data": {"day": [], "net": [
+            {"exchange": "NSE", "tradingsymbol": "INFY", "product": "MIS", "quantity": 10},
+            {"exchange": "NSE", "tradingsymbol": "SBIN", "product": "MIS", "quantity": -5},
+            {"exchange": "NSE", "tradingsymbol": "TCS", "product": "MIS", "quantity": 0},
+        ]}}),),
+        ("POST", "/orders/regular"): ('{"status": "success", "data": {"order_id": "151220000000000"}}',)
+    })
+    results = run(async_kiteconnect.exit_all_positions())
+    assert async_kiteconnect._pacer.metrics()["orders"]["requests"] == 2
+    assert [r["order_id"] for r in results] == ["151220000000000"] * 2
+    assert [r["order"]["transaction_type"] for r in results] == ["SELL", "BUY"]
+    assert ("quantity", "5") in session.requests[2][2]["data"]
+
+
+def test_place_orders_errors(async_kiteconnect):
+    fake_session(async_kiteconnect, {
+        ("POST", "/orders/regular"): ('{"error_type": "OrderException", "message": "oops"}', 400)
+    })
+    order = {"variety": "regular", "exchange": "NSE", "tradingsymbol": "INFY", "transaction_type": "BUY",
+             "quantity": 1, "product": "CNC", "order_type": "MARKET"}
+    results = run(async_kiteconnect.place_orders([order, order]))
+    assert all(isinstance(r["error"], ex.OrderException) for r in results)
+
+    with pytest.raises(ex.InputException):
+        run(async_kiteconnect.place_orders([dict(order, quantity=-1)]))
+
+
+def test_session_timeout(async_kiteconnect):
+    async def session():
+        s = async_kiteconnect._get_session()
+        await async_kiteconnect.close()
+        return s
+
+    timeout = run(session()).timeout
+    assert timeout.total is None
+    assert timeout.sock_connect == timeout.sock_read == async_kiteconnect.timeout
@@ -0,0 +1,153 @@
+# coding: utf-8
+"""AsyncKiteTicker tests"""
+import json
+import struct
+import asyncio
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+from kiteconnect import AsyncKiteTicker  # noqa: E402
+
+TOKEN = 408065 << 8 | 1
+
+
+def ltp_frame(last_price):
+    packet = struct.pack(">2I", TOKEN, last_price)
+    return struct.pack(">H", 1) + struct.pack(">H", len(packet)) + packet
+
+
+class TickerServer(object):
+    """Local WebSocket server which sends a tick after every `mode` message and then closes the connection."""
+
+    def __init__(self, close=True, accept=None):
+        self.close = close
+        self.accept = accept
+        self.connections = []
+        self.runner = None
+        self.url = None
+
+    async def handler(self, request):
+        if self.accept is not None and len(self.connections) >= self.accept:
+            raise web.HTTPForbidden()
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        messages = []
+        self.connections.append(messages)
+        async for msg in ws:
+            data = json.loads(msg.data)
+            messages.append(data)
+            if data["a"] == "mode":
+                await ws.send_str(json.dumps({"type": "order", "data": {"order_id": "1"}}))
+                await ws.send_bytes(ltp_frame(150000 + len(self.connections)))
+                if self.close:
+                    await ws.close()
+
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = "ws://127.0.0.1:{}/".format(site._server.sockets[0].getsockname()[1])
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coro, 10))
+    finally:
+        loop.close()
+
+
+def ticker(server, **kwargs):
+    kws = AsyncKiteTicker("<API-KEY>", "<ACCESS-TOKEN>", **kwargs)
+    kws.socket_url = server.url
+    kws._reconnect_initial_delay = 0.01
+    return kws
+
+
+def test_stream_resubscribes_on_reconnect():
+    server = TickerServer()
+    events = []
+
+    async def main():
+        await server.start()
+        kws = ticker(server)
+        kws.on_reconnect = lambda ws, attempts: events.append(("reconnect", attempts))
+        kws.on_order_update = lambda ws, data: events.append(("order", data["order_id"]))
+
+        # Subscribed before connecting.
+        kws.subscribe([TOKEN])
+        kws.set_mode(kws.MODE_FULL, [TOKEN])
+
+        prices = []
+        async for ticks in kws.stream():
+            prices.append(ticks[0]["last_price"])
+            if len(prices) == 2:
+                break
+
+        await server.stop()
+        return prices
+
+    assert run(main()) == [1500.01, 1500.02]
+    assert events == [("order", "1"), ("reconnect", 1), ("order", "1")]
+
+    # The second connection restores the subscription and its mode.
+    assert server.connections[1] == [{"a": "subscribe", "v": [TOKEN]}, {"a": "mode", "v": ["full", [TOKEN]]}]
+
+
+def test_noreconnect():
+    # Connections after the first one are rejected, so one retry is made and fails.
+    server = TickerServer(accept=1)
+    events = []
+
+    async def main():
+        await server.start()
+        kws = ticker(server, reconnect_max_tries=1)
+
+        def on_connect(ws, response):
+            ws.subscribe([TOKEN])
+            ws.set_mode(ws.MODE_LTP, [TOKEN])
+
+        kws.on_connect = on_connect
+        kws.on_ticks = lambda ws, ticks: events.append(("ticks", len(ticks)))
+        kws.on_reconnect = lambda ws, attempts: events.append(("reconnect", attempts))
+        kws.on_noreconnect = lambda ws: events.append(("noreconnect",))
+
+        await kws.connect()
+        await server.stop()
+
+    run(main())
+    assert events == [("ticks", 1), ("reconnect", 1), ("noreconnect",)]
+
+
+def test_close_stops_reconnecting():
+    server = TickerServer(close=False)
+
+    async def main():
+        await server.start()
+        kws = ticker(server)
+        kws.subscribe([TOKEN])
+
+        async def close_soon():
+            while not kws.is_connected():
+                await asyncio.sleep(0.01)
+            kws.close()
+
+        await asyncio.gather(kws.connect(), close_soon())
+        await server.stop()
+        return kws
+
+    kws = run(main())
+    assert not kws.is_connected()
+    assert len(server.connections) == 1
@@ -0,0 +1,187 @@
+# coding: utf-8
+"""Response cache tests"""
+import time
+import asyncio
+import threading
+import pytest
+import responses
+
+import kiteconnect.exceptions as ex
+from kiteconnect import KiteConnect, ResponseCache
+
+POSITIONS = '{"status": "success", "data": {"net": [], "day": []}}'
+ORDERS = '{"status": "success", "data": [{"order_id": "1", "order_timestamp": "2021-05-31 09:15:00"}]}'
+
+
+def url(kite, route):
+    return "{0}{1}".format(kite.root, kite._routes[route])
+
+
+def test_fetch_reuses_fresh_entries():
+    cache = ResponseCache(ttls={"orders": 0.05})
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.fetch("orders", "k", fetch, store=bool) == 1
+    assert cache.fetch("orders", "k", fetch, store=bool) == 1
+    assert cache.fetch("orders", "other", fetch, store=bool) == 2
+
+    time.sleep(0.06)
+    assert cache.fetch("orders", "k", fetch, store=bool) == 3
+    assert cache.hits == 1
+    assert cache.misses == 3
+
+
+def test_fetch_coalesces_threads():
+    cache = ResponseCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "positions"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.fetch("portfolio.positions", "k", fetch)))
+    owner.start()
+    started.wait(1)
+
+    waiters = [threading.Thread(target=lambda: results.append(cache.fetch("portfolio.positions", "k", fetch)))
+               for _ in range(5)]
+    for t in waiters:
+        t.start()
+
+    # Let the waiters block on the in-flight request before it completes.
+    while cache.coalesced < 5:
+        time.sleep(0.001)
+    release.set()
+
+    for t in [owner] + waiters:
+        t.join()
+
+    assert results == ["positions"] * 6
+    assert len(calls) == 1
+
+
+def test_fetch_errors_are_not_cached():
+    cache = ResponseCache()
+
+    def fail():
+        raise ex.NetworkException("down")
+
+    with pytest.raises(ex.NetworkException):
+        cache.fetch("orders", "k", fail, store=bool)
+
+    assert cache.fetch("orders", "k", lambda: "orders", store=bool) == "orders"
+
+
+def test_invalidate_skips_responses_in_flight():
+    cache = ResponseCache()
+
+    def fetch():
+        # A write completes while this read is in flight.
+        cache.invalidate("order.place")
+        return "stale"
+
+    assert cache.fetch("orders", "k", fetch, store=bool) == "stale"
+    assert cache.fetch("orders", "k", lambda: "fresh", store=bool) == "fresh"
+    assert cache.fetch("orders", "k", lambda: "newer", store=bool) == "fresh"
+
+
+def test_fetch_async_coalesces():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ltp"
+
+    async def main():
+        return await asyncio.gather(*[cache.fetch_async("market.quote.ltp", "k", fetch) for _ in range(5)])
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(main()) == ["ltp"] * 5
+    finally:
+        loop.close()
+
+    assert len(calls) == 1
+
+
+@responses.activate
+def test_request_uses_response_cache(kiteconnect):
+    kiteconnect.response_cache = ResponseCache()
+    responses.add(responses.GET, url(kiteconnect, "orders"), body=ORDERS, content_type="application/json")
+    responses.add(responses.GET, url(kiteconnect, "portfolio.positions"), body=POSITIONS,
+                  content_type="application/json")
+
+    first = kiteconnect.orders()
+    second = kiteconnect.orders()
+    kiteconnect.positions()
+
+    assert len(responses.calls) == 2
+    # Every hit is parsed again, so results are not shared between callers.
+    assert first == second
+    assert first is not second
+
+
+@responses.activate
+def test_writes_invalidate_reads(kiteconnect):
+    kiteconnect.response_cache = ResponseCache()
+    responses.add(responses.GET, url(kiteconnect, "orders"), body=ORDERS, content_type="application/json")
+    responses.add(responses.GET, url(kiteconnect, "portfolio.holdings"), body='{"status": "success", "data": []}',
+                  content_type="application/json")
+    responses.add(responses.POST, url(kiteconnect, "order.place").format(variety="regular"),
+                  body='{"status": "success", "data": {"order_id": "2"}}', content_type="application/json")
+
+    kiteconnect.orders()
+    kiteconnect.holdings()
+    kiteconnect.place_order(variety="regular", exchange="NSE", tradingsymbol="INFY", transaction_type="BUY",
+                            quantity=1, product="CNC", order_type="MARKET")
+    kiteconnect.orders()
+    kiteconnect.holdings()
+
+    # CNC orders change holdings too.
+    assert [c.request.method for c in responses.calls] == ["GET", "GET", "POST", "GET", "GET"]
+
+
+@responses.activate
+def test_responses_are_cached_per_login(kiteconnect):
+    kiteconnect.response_cache = ResponseCache()
+    for name in ["first", "second", "other"]:
+        responses.add(responses.GET, url(kiteconnect, "user.profile"),
+                      body='{"status": "success", "data": {"user_name": "%s"}}' % name,
+                      content_type="application/json")
+
+    assert kiteconnect.profile()["user_name"] == "first"
+    assert kiteconnect.profile()["user_name"] == "first"
+
+    kiteconnect.set_access_token("<OTHER-ACCESS-TOKEN>")
+    assert kiteconnect.profile()["user_name"] == "second"
+
+    # A client of another api key sharing the cache.
+    other = KiteConnect(api_key="<OTHER-API-KEY>", access_token="<OTHER-ACCESS-TOKEN>",
+                        response_cache=kiteconnect.response_cache)
+    other.root = kiteconnect.root
+    assert other.profile()["user_name"] == "other"
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_error_responses_are_not_cached(kiteconnect):
+    kiteconnect.response_cache = ResponseCache()
+    responses.add(responses.GET, url(kiteconnect, "orders"), status=500, content_type="application/json",
+                  body='{"status": "error", "error_type": "NetworkException", "message": "down"}')
+    responses.add(responses.GET, url(kiteconnect, "orders"), body=ORDERS, content_type="application/json")
+
+    with pytest.raises(ex.NetworkException):
+        kiteconnect.orders()
+
+    assert kiteconnect.orders()[0]["order_id"] == "1"
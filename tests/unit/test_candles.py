@@ -0,0 +1,88 @@
+# coding: utf-8
+"""Candle aggregator tests"""
+import datetime
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import CandleAggregator
+from kiteconnect.dateparse import parse_datetime
+
+# 2021-06-01 09:15:00 IST
+OPEN = datetime.datetime(2021, 6, 1, 3, 45, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def tick(seconds, price, volume=None, token=256265):
+    tick = {
+        "instrument_token": token,
+        "last_price": price,
+        # Ticks have naive local timestamps.
+        "exchange_timestamp": datetime.datetime.fromtimestamp(OPEN + seconds),
+    }
+    if volume is not None:
+        tick["volume_traded"] = volume
+    return tick
+
+
+def test_candles_of_several_intervals():
+    aggregator = CandleAggregator(intervals=["minute", "3minute"])
+    closed = []
+    aggregator.on_candle = lambda a, token, interval, candle: closed.append((interval, candle))
+
+    aggregator.update([tick(0, 100.0, 1000), tick(10, 102.0, 1100), tick(50, 99.0, 1250)])
+    aggregator.update([tick(65, 101.0, 1300)])
+
+    assert closed == [("minute", {
+        "date": parse_datetime("2021-06-01T09:15:00+0530"),
+        "open": 100.0,
+        "high": 102.0,
+        "low": 99.0,
+        "close": 99.0,
+        # The first tick only sets the starting volume.
+        "volume": 250,
+    })]
+
+    # The 3 minute candle is still open.
+    assert aggregator.current(256265, "3minute")["volume"] == 300
+    assert aggregator.current(256265, "3minute")["high"] == 102.0
+
+    aggregator.update([tick(185, 103.0, 1400)])
+    assert [interval for interval, _ in closed] == ["minute", "minute", "3minute"]
+    assert aggregator.candles(256265, "3minute")[0]["close"] == 101.0
+    assert aggregator.current(256265, "3minute")["date"] == parse_datetime("2021-06-01T09:18:00+0530")
+
+
+def test_flush_closes_ended_candles():
+    aggregator = CandleAggregator(intervals=["5minute"])
+    aggregator.update([tick(0, 100.0)])
+
+    aggregator.flush(now=OPEN + 299)
+    assert aggregator.candles(256265, "5minute") == []
+
+    aggregator.flush(now=OPEN + 300)
+    assert len(aggregator.candles(256265, "5minute")) == 1
+    assert aggregator.current(256265, "5minute") is None
+
+
+def test_seed_continues_last_candle():
+    aggregator = CandleAggregator(intervals=["5minute"])
+    history = [
+        {"date": parse_datetime("2021-06-01T09:15:00+0530"), "open": 99.0, "high": 101.0, "low": 98.0,
+         "close": 100.0, "volume": 500},
+        {"date": parse_datetime("2021-06-01T09:20:00+0530"), "open": 100.0, "high": 100.5, "low": 99.5,
+         "close": 100.0, "volume": 200},
+    ]
+    aggregator.seed(256265, "5minute", history)
+
+    aggregator.update([tick(310, 102.0, 5000), tick(320, 97.0, 5100)])
+
+    assert aggregator.candles(256265, "5minute") == history[:1]
+    assert aggregator.current(256265, "5minute") == {
+        "date": history[1]["date"], "open": 100.0, "high": 102.0, "low": 97.0, "close": 97.0, "volume": 300}
+
+    with pytest.raises(ex.InputException):
+        aggregator.seed(256265, "minute", history)
+
+
+def test_invalid_interval():
+    with pytest.raises(ex.InputException):
+        CandleAggregator(intervals=["2minute"])
@@ -1,7 +1,12 @@
 # coding: utf-8
+import json
+import time
+import datetime
 import pytest
 import responses
 import kiteconnect.exceptions as ex
+from kiteconnect import RateLimiter
+from six.moves.urllib.parse import parse_qs, urlparse
 
 import utils
 
@@ -469,3 +474,275 @@ def test_virtual_contract_note(kiteconnect):
     # CTT tax type
     assert order_book_charges[1]['charges']['transaction_tax_type'] == "ctt"
     assert order_book_charges[1]['charges']['total'] != 0
+
+
+def test_historical_windows(kiteconnect):
+    """Test splitting of long historical ranges into request sized windows."""
+    windows = kiteconnect._historical_windows("2021-01-01", "2021-04-01", "minute")
+    assert len(windows) == 2
+    assert windows[0][0] == datetime.datetime(2021, 1, 1)
+    assert windows[0][1] == datetime.datetime(2021, 3, 1, 23, 59, 59)
+    assert windows[1][0] == datetime.datetime(2021, 3, 2)
+    assert windows[1][1] == datetime.datetime(2021, 4, 1, 23, 59, 59)
+
+    assert len(kiteconnect._historical_windows(datetime.date(2021, 1, 1), "2021-05-01", "day")) == 1
+
+    # Date only bounds include the whole last day.
+    end = datetime.datetime(2024, 1, 5, 23, 59, 59)
+    assert kiteconnect._historical_windows(datetime.date(2024, 1, 5), datetime.date(2024, 1, 5), "minute") == [
+        (datetime.datetime(2024, 1, 5), end)]
+    assert kiteconnect._historical_windows("2024-01-01", "2024-01-05", "minute")[-1][1] == end
+    windows = kiteconnect._historical_windows("2024-01-01", "2024-03-01", "minute")
+    assert windows[-1] == (datetime.datetime(2024, 3, 1), datetime.datetime(2024, 3, 1, 23, 59, 59))
+
+
+@responses.activate
+def test_historical_data_range(kiteconnect):
+    """Test chunked historical data fetch."""
+    url = kiteconnect._routes["market.historical"].format(instrument_token=256265, interval="minute")
+
+    def candles(request):
+        # One candle at the start and end of every window, the last window repeats the previous candle.
+        params = parse_qs(urlparse(request.url).query)
+        start, end = params["from"][0], params["to"][0]
+        data = [[start.replace(" ", "T") + "+0530", 1, 2, 0.5, 1.5, 10],
+                [end.replace(" ", "T") + "+0530", 1, 2, 0.5, 1.5, 10]]
+        if start.startswith("2021-03-02"):
+            data.insert(0, ["2021-03-01T23:59:59+0530", 1, 2, 0.5, 1.5, 10])
+        return (200, {}, json.dumps({"status": "success", "data": {"candles": data}}))
+
+    responses.add_callback(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root, url),
+        callback=candles,
+        content_type="application/json"
+    )
+
+    data = kiteconnect.historical_data_range(256265, "2021-01-01 00:00:00", "2021-04-01 00:00:00", "minute")
+    assert len(responses.calls) == 2
+    assert len(data) == 4
+    assert [d["date"] for d in data] == sorted(d["date"] for d in data)
+
+    # Without a rate limiter, the windows are paced by the private one.
+    assert kiteconnect._pacer.metrics()["historical"]["requests"] == 2
+
+
+@responses.activate
+def test_historical_data_range_rate_limiter(kiteconnect):
+    """Test a rate limiter paces historical windows instead of the private one."""
+    responses.add(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root,
+                        kiteconnect._routes["market.historical"].format(instrument_token=256265, interval="day")),
+        body=json.dumps({"status": "success", "data": {"candles": []}}),
+        content_type="application/json"
+    )
+    kiteconnect.rate_limiter = RateLimiter()
+
+    kiteconnect.historical_data_range(256265, "2010-01-01", "2021-01-01", "day")
+    assert kiteconnect.rate_limiter.metrics()["historical"]["requests"] == 3
+    assert kiteconnect._pacer.metrics()["historical"]["requests"] == 0
+
+
+def test_format_historical_columns(kiteconnect):
+    """Test columnar candle output."""
+    np = pytest.importorskip("numpy")
+    data = {"candles": [
+        ["2017-12-15T09:15:00+0530", 1704.5, 1705, 1699.25, 1702.8, 2499, 100],
+        ["2017-12-15T09:16:00+0530", 1702, 1702, 1698.15, 1698.15, 1271, 110],
+    ]}
+    columns = kiteconnect._format_historical_columns(data)
+    records = kiteconnect._format_historical(data)
+
+    assert columns["date"].dtype == np.int64
+    assert columns["volume"].dtype == np.int64
+    assert columns["close"].dtype == np.float64
+    assert columns["close"].flags["C_CONTIGUOUS"]
+    for i, record in enumerate(records):
+        assert columns["date"][i] == int(record["date"].timestamp()) * 1000000000
+        for key in ["open", "high", "low", "close", "volume", "oi"]:
+            assert columns[key][i] == record[key]
+
+    merged = kiteconnect._merge_historical_columns([columns, columns])
+    assert list(merged["date"]) == list(columns["date"])
+
+    empty = kiteconnect._format_historical_columns({"candles": []})
+    assert len(empty["date"]) == 0 and "oi" not in empty
+
+    empty = kiteconnect._format_historical_columns({"candles": []}, oi=True)
+    assert empty["oi"].dtype == np.int64 and len(empty["oi"]) == 0
+
+
+@responses.activate
+def test_historical_data_range_empty_windows(kiteconnect):
+    """Test columns with open interest merge when the first and last windows have no candles."""
+    np = pytest.importorskip("numpy")
+
+    def candles(request):
+        # Only the middle window has candles, as before listing and after the last trading day.
+        params = parse_qs(urlparse(request.url).query)
+        assert params["oi"] == ["1"]
+        data = []
+        if params["from"][0].startswith("2021-03-02"):
+            data = [["2021-03-02T09:15:00+0530", 1, 2, 0.5, 1.5, 10, 100],
+                    ["2021-03-02T09:16:00+0530", 1, 2, 0.5, 1.5, 10, 110]]
+        return (200, {}, json.dumps({"status": "success", "data": {"candles": data}}))
+
+    responses.add_callback(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root,
+                        kiteconnect._routes["market.historical"].format(instrument_token=256265, interval="minute")),
+        callback=candles,
+        content_type="application/json"
+    )
+
+    columns = kiteconnect.historical_data_range(256265, "2021-01-01 00:00:00", "2021-06-01 00:00:00", "minute",
+                                                oi=True, as_columns=True)
+    assert len(responses.calls) == 3
+    assert list(columns["oi"]) == [100, 110]
+    assert columns["oi"].dtype == np.int64
+    assert len(columns["date"]) == 2
+
+
+@responses.activate
+def test_iter_instruments(kiteconnect):
+    """Test streamed instruments parsing."""
+    body = (
+        "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,"
+        "instrument_type,segment,exchange\n"
+        "9604354,37517,BANKNIFTY24OCT51000CE,BANKNIFTY,0,2024-10-30,51000,0.05,15,CE,NFO-OPT,NFO\n"
+        "9604000,37500,BANKNIFTY24OCTFUT,BANKNIFTY,0,2024-10-30,0,0.05,15,FUT,NFO-FUT,NFO\n"
+    )
+    responses.add(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["market.instruments"].format(exchange="NFO")),
+        body=body,
+        content_type="text/csv"
+    )
+
+    instruments = list(kiteconnect.iter_instruments("NFO"))
+    assert instruments == kiteconnect._parse_instruments(body.encode("utf-8"))
+    assert instruments[0]["expiry"] == datetime.date(2024, 10, 30)
+    assert instruments[0]["strike"] == 51000.0
+
+    options = list(kiteconnect.iter_instruments("NFO", segment="NFO-OPT", compact=True))
+    assert len(options) == 1
+    assert options[0].tradingsymbol == "BANKNIFTY24OCT51000CE"
+    assert options[0].lot_size == 15
+
+
+@responses.activate
+def test_ltp_batching(kiteconnect):
+    """Test quote requests over the per request instrument limit are split and merged."""
+    def ltp(request):
+        ins = parse_qs(urlparse(request.url).query)["i"]
+        assert len(ins) <= kiteconnect._quote_limits["market.quote.ltp"]
+        data = {i: {"instrument_token": n, "last_price": 1.0} for n, i in enumerate(ins)}
+        return (200, {}, json.dumps({"status": "success", "data": data}))
+
+    responses.add_callback(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["market.quote.ltp"]),
+        callback=ltp,
+        content_type="application/json"
+    )
+
+    # Chunks wait for the quote rate limit, one request per second by default.
+    kiteconnect._pacer = RateLimiter(limits={"quote": 20}, burst={"quote": 1})
+    instruments = ["NFO:OPT{}".format(i) for i in range(2500)]
+    start = time.monotonic()
+    data = kiteconnect.ltp(instruments)
+    assert time.monotonic() - start >= 0.09
+    assert len(responses.calls) == 3
+    assert kiteconnect._pacer.metrics()["quote"]["requests"] == 3
+    assert set(data) == set(instruments)
+
+    kiteconnect.ltp("NSE:INFY")
+    assert len(responses.calls) == 4
+
+
+def bulk_order(**kwargs):
+    order = {"variety": "regular", "exchange": "NSE", "tradingsymbol": "INFY", "transaction_type": "BUY",
+             "quantity": 1, "product": "MIS", "order_type": "MARKET"}
+    order.update(kwargs)
+    return order
+
+
+@responses.activate
+def test_place_orders(kiteconnect):
+    """Test bulk orders return a result per order without stopping at errors."""
+    def place(request):
+        params = parse_qs(request.body)
+        if params["tradingsymbol"][0] == "SBIN":
+            return (400, {}, json.dumps({"status": "error", "error_type": "InputException", "message": "bad"}))
+        return (200, {}, json.dumps({"status": "success", "data": {"order_id": params["tradingsymbol"][0]}}))
+
+    responses.add_callback(
+        responses.POST,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["order.place"].format(variety="regular")),
+        callback=place,
+        content_type="application/json"
+    )
+
+    # Orders wait for the order rate limit, ten requests per second by default.
+    kiteconnect._pacer = RateLimiter(limits={"orders": 20}, burst={"orders": 1})
+    orders = [bulk_order(tradingsymbol=s) for s in ["INFY", "SBIN", "TCS"]]
+    start = time.monotonic()
+    results = kiteconnect.place_orders(orders)
+    assert time.monotonic() - start >= 0.09
+    assert kiteconnect._pacer.metrics()["orders"]["requests"] == 3
+    assert [r["order"] for r in results] == orders
+    assert [r["order_id"] for r in results] == ["INFY", None, "TCS"]
+    assert isinstance(results[1]["error"], ex.InputException)
+    assert results[0]["error"] is None
+
+
+@pytest.mark.parametrize("orders", [
+    bulk_order(),
+    [bulk_order(), bulk_order(exchange=None)],
+    [bulk_order(qty=1)],
+    [bulk_order(quantity=0)],
+    [bulk_order(), "order"],
+])
+@responses.activate
+def test_place_orders_validation(kiteconnect, orders):
+    """Test invalid bulk orders are rejected before any order is sent."""
+    with pytest.raises(ex.InputException):
+        kiteconnect.place_orders(orders)
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_cancel_orders(kiteconnect):
+    """Test bulk cancellation."""
+    for order_id in ["1", "2"]:
+        responses.add(
+            responses.DELETE,
+            "{0}{1}".format(kiteconnect.root,
+                            kiteconnect._routes["order.cancel"].format(variety="regular", order_id=order_id)),
+            body=json.dumps({"status": "success", "data": {"order_id": order_id}}),
+            content_type="application/json"
+        )
+
+    results = kiteconnect.cancel_orders([{"variety": "regular", "order_id": "1"},
+                                         {"variety": "regular", "order_id": "2"}])
+    assert [r["order_id"] for r in results] == ["1", "2"]
+
+    with pytest.raises(ex.InputException):
+        kiteconnect.cancel_orders([{"order_id": "1"}])
+
+
+def test_exit_orders(kiteconnect):
+    """Test exit orders for open positions."""
+    positions = [
+        {"exchange": "NFO", "tradingsymbol": "NIFTY21JUN15000CE", "product": "MIS", "quantity": 50},
+        {"exchange": "NFO", "tradingsymbol": "NIFTY21JUN15000PE", "product": "MIS", "quantity": -25},
+        {"exchange": "NSE", "tradingsymbol": "INFY", "product": "CNC", "quantity": 10},
+        {"exchange": "NSE", "tradingsymbol": "SBIN", "product": "MIS", "quantity": 0},
+    ]
+    orders = kiteconnect._exit_orders(positions, "MIS", "regular", "exit")
+    assert [(o["tradingsymbol"], o["transaction_type"], o["quantity"]) for o in orders] == [
+        ("NIFTY21JUN15000CE", "SELL", 50), ("NIFTY21JUN15000PE", "BUY", 25)]
+    assert all(o["order_type"] == "MARKET" and o["tag"] == "exit" for o in orders)
+
+    assert len(kiteconnect._exit_orders(positions, None, "regular", None)) == 3
@@ -0,0 +1,35 @@
+# coding: utf-8
+"""Timestamp parser tests"""
+import datetime
+import pytest
+import dateutil.parser
+
+from kiteconnect.dateparse import parse_date, parse_datetime
+
+
+@pytest.mark.parametrize("value", [
+    "2021-05-31 09:18:57",
+    "2017-12-15T09:15:00+0530",
+    "2017-12-15T09:15:00-0400",
+    "2021-05-31",
+    # Fallbacks
+    "2017-12-15T09:15:00Z",
+    "2017-12-15T09:15:00.123+0530",
+    "31 May 2021",
+])
+def test_parse_datetime_matches_dateutil(value):
+    parsed = parse_datetime(value)
+    expected = dateutil.parser.parse(value)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+def test_parse_datetime_invalid():
+    with pytest.raises(ValueError):
+        parse_datetime("2021-13-45 10:00:00")
+
+
+def test_parse_date():
+    assert parse_date("2021-06-24") == datetime.date(2021, 6, 24)
+    assert parse_date("24-Jun-2021") == datetime.date(2021, 6, 24)
+    assert parse_date("2021-06-24") is parse_date("2021-06-24")
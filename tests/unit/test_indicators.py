@@ -0,0 +1,130 @@
+# coding: utf-8
+"""Indicator tests"""
+import math
+import random
+import pytest
+
+from kiteconnect.indicators import Indicator, EMA, ATR, RSI, Supertrend
+
+
+def make_candles(count=200, seed=7):
+    rng = random.Random(seed)
+    candles = []
+    close = 15000.0
+    for _ in range(count):
+        start = close
+        close = start + rng.uniform(-20, 20)
+        candles.append({"open": start, "high": max(start, close) + rng.uniform(0, 10),
+                        "low": min(start, close) - rng.uniform(0, 10), "close": close, "volume": 100})
+    return candles
+
+
+def wilder(values, period):
+    """Simple average of the first `period` values, then Wilder's smoothing."""
+    out = [None] * len(values)
+    average = sum(values[:period]) / period
+    out[period - 1] = average
+    for i in range(period, len(values)):
+        average = (average * (period - 1) + values[i]) / period
+        out[i] = average
+    return out
+
+
+def true_ranges(candles):
+    return [max(c["high"] - c["low"], abs(c["high"] - p["close"]), abs(c["low"] - p["close"]))
+            for p, c in zip(candles, candles[1:])]
+
+
+def reference_supertrend(candles, period, multiplier):
+    """The loop from the strategy scripts, over plain lists."""
+    atr = [None] + wilder(true_ranges(candles), period)
+    upper = [(c["high"] + c["low"]) / 2 + multiplier * a if a is not None else None for c, a in zip(candles, atr)]
+    lower = [(c["high"] + c["low"]) / 2 - multiplier * a if a is not None else None for c, a in zip(candles, atr)]
+    trend = [True] * len(candles)
+    for i in range(1, len(candles)):
+        close = candles[i]["close"]
+        if upper[i - 1] is not None and close > upper[i - 1]:
+            trend[i] = True
+        elif lower[i - 1] is not None and close < lower[i - 1]:
+            trend[i] = False
+        else:
+            trend[i] = trend[i - 1]
+
+        if trend[i] and lower[i] is not None and lower[i - 1] is not None:
+            lower[i] = max(lower[i], lower[i - 1])
+        elif not trend[i] and upper[i] is not None and upper[i - 1] is not None:
+            upper[i] = min(upper[i], upper[i - 1])
+    return [t if a is not None else None for t, a in zip(trend, atr)]
+
+
+def assert_series(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        if e is None:
+            assert a is None
+        else:
+            assert a == pytest.approx(e)
+
+
+def test_ema():
+    candles = make_candles()
+    closes = [c["close"] for c in candles]
+
+    expected = [None] * 29 + [sum(closes[:30]) / 30]
+    for close in closes[30:]:
+        expected.append(expected[-1] + 2.0 / 31 * (close - expected[-1]))
+
+    assert_series(EMA(30).seed(candles), expected)
+
+
+def test_atr():
+    candles = make_candles()
+    assert_series(ATR(14).seed(candles), [None] + wilder(true_ranges(candles), 14))
+
+
+def test_rsi():
+    candles = make_candles()
+    changes = [c["close"] - p["close"] for p, c in zip(candles, candles[1:])]
+    gains = wilder([max(c, 0) for c in changes], 14)
+    losses = wilder([max(-c, 0) for c in changes], 14)
+    expected = [None] + [100 * gain / (gain + loss) if gain is not None else None
+                         for gain, loss in zip(gains, losses)]
+
+    assert_series(RSI(14).seed(candles), expected)
+
+
+def test_supertrend():
+    candles = make_candles(500)
+    values = Supertrend(7, 3).seed(candles)
+
+    assert values == reference_supertrend(candles, 7, 3)
+    assert True in values and False in values
+
+
+def test_update_continues_seed():
+    candles = make_candles()
+    columns = dict((name, [c[name] for c in candles[:150]]) for name in ("high", "low", "close"))
+
+    for make in (lambda: EMA(20), lambda: ATR(14), lambda: RSI(14), lambda: Supertrend(10, 2)):
+        full = make().seed(candles)
+
+        indicator = make()
+        indicator.seed(columns)
+        live = [indicator.update(c) for c in candles[150:]]
+
+        assert live == full[150:]
+        assert indicator.value == full[-1]
+
+
+def test_supertrend_line():
+    supertrend = Supertrend(7, 3)
+    assert supertrend.line is None
+
+    supertrend.seed(make_candles())
+    assert supertrend.line == (supertrend.lower if supertrend.value else supertrend.upper)
+    assert not math.isnan(supertrend.line)
+
+
+def test_base_indicator_requires_update():
+    with pytest.raises(NotImplementedError):
+        Indicator().update({"high": 1, "low": 1, "close": 1})
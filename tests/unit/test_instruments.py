@@ -0,0 +1,199 @@
+# coding: utf-8
+"""Instrument cache tests"""
+import datetime
+import pytest
+from mock import patch
+
+from kiteconnect import InstrumentCache, InstrumentIndex
+
+INSTRUMENTS_CSV = (
+    b"instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,"
+    b"instrument_type,segment,exchange\n"
+    b"9604354,37517,BANKNIFTY24OCT51000CE,BANKNIFTY,0,2024-10-30,51000,0.05,15,CE,NFO-OPT,NFO\n"
+    b"9604610,37518,BANKNIFTY24OCT51000PE,BANKNIFTY,0,2024-10-30,51000,0.05,15,PE,NFO-OPT,NFO\n"
+    b"256265,0,NIFTY 50,NIFTY 50,0,,0,0,0,EQ,INDICES,NSE\n"
+)
+
+
+@pytest.fixture()
+def instrument_cache(kiteconnect, tmpdir):
+    cache = InstrumentCache(kiteconnect, path=str(tmpdir))
+    cache._now = lambda: datetime.datetime(2024, 10, 21, 10, 0)
+    return cache
+
+
+def test_cache_hits(kiteconnect, instrument_cache):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV) as get:
+        records = instrument_cache.instruments("NFO")
+        assert records[0]["instrument_token"] == 9604354
+        assert records[0]["expiry"] == datetime.date(2024, 10, 30)
+
+        assert instrument_cache.instruments("NFO") is records
+        assert get.call_count == 1
+
+
+def test_snapshot_reload(kiteconnect, instrument_cache):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        records = instrument_cache.instruments()
+
+    # A fresh cache (new process) loads the snapshot instead of downloading.
+    cache = InstrumentCache(kiteconnect, path=instrument_cache.path)
+    cache._now = instrument_cache._now
+    with patch.object(kiteconnect, "_get") as get:
+        assert cache.instruments() == records
+        assert get.call_count == 0
+
+
+def test_daily_invalidation(kiteconnect, instrument_cache):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        records = instrument_cache.instruments("NFO")
+
+    # Before the refresh time the previous day's snapshot is still valid.
+    instrument_cache._now = lambda: datetime.datetime(2024, 10, 22, 8, 0)
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV) as get:
+        instrument_cache.instruments("NFO")
+        assert get.call_count == 0
+
+    # Next trading day with unchanged content keeps the parsed records.
+    instrument_cache._now = lambda: datetime.datetime(2024, 10, 22, 9, 0)
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV) as get, \
+            patch.object(kiteconnect, "_parse_instruments") as parse:
+        assert instrument_cache.instruments("NFO") is records
+        assert get.call_count == 1
+        assert parse.call_count == 0
+
+    # Changed content is parsed again.
+    instrument_cache._now = lambda: datetime.datetime(2024, 10, 23, 9, 0)
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV.rsplit(b"\n", 2)[0]):
+        assert len(instrument_cache.instruments("NFO")) == 2
+
+
+def test_clear(kiteconnect, instrument_cache, tmpdir):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        instrument_cache.instruments("NFO")
+    assert len(tmpdir.listdir()) == 1
+
+    instrument_cache.clear()
+    assert len(tmpdir.listdir()) == 0
+
+
+def test_columns(kiteconnect, instrument_cache):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        records = instrument_cache.instruments()
+
+    cache = InstrumentCache(kiteconnect, path=instrument_cache.path)
+    cache._now = instrument_cache._now
+    columns = cache.columns()
+    assert columns["instrument_token"] == [9604354, 9604610, 256265]
+    assert columns["expiry"] == [datetime.date(2024, 10, 30), datetime.date(2024, 10, 30), ""]
+    assert columns["tradingsymbol"][2] == "NIFTY 50"
+    assert cache.instruments() == records
+
+
+def make_option(token, strike, instrument_type, expiry=datetime.date(2024, 10, 30), name="BANKNIFTY"):
+    return {
+        "instrument_token": token,
+        "exchange": "NFO",
+        "tradingsymbol": "{}{}{}{}".format(name, expiry.strftime("%y%b").upper(), int(strike), instrument_type),
+        "name": name,
+        "expiry": expiry,
+        "strike": float(strike),
+        "instrument_type": instrument_type,
+    }
+
+
+@pytest.fixture()
+def instrument_index():
+    instruments = [{"instrument_token": 256265, "exchange": "NSE", "tradingsymbol": "NIFTY 50", "name": "NIFTY 50",
+                    "expiry": "", "strike": 0.0, "instrument_type": "EQ"},
+                   {"instrument_token": 1, "exchange": "NFO", "tradingsymbol": "BANKNIFTY24NOVFUT", "name": "BANKNIFTY",
+                    "expiry": datetime.date(2024, 11, 27), "strike": 0.0, "instrument_type": "FUT"}]
+    token = 100
+    for expiry in [datetime.date(2024, 11, 6), datetime.date(2024, 10, 30)]:
+        for strike in range(50000, 52100, 100):
+            for instrument_type in ["CE", "PE"]:
+                token += 1
+                instruments.append(make_option(token, strike, instrument_type, expiry))
+
+    return InstrumentIndex(instruments)
+
+
+def test_index_lookups(instrument_index):
+    assert instrument_index.get(256265)["tradingsymbol"] == "NIFTY 50"
+    assert instrument_index.lookup("NSE:NIFTY 50")["instrument_token"] == 256265
+    assert instrument_index.lookup("NSE:INFY") is None
+    assert "NSE:NIFTY 50" in instrument_index
+    assert instrument_index.tokens(["NSE:NIFTY 50", "NSE:INFY"]) == {"NSE:NIFTY 50": 256265}
+    assert instrument_index.futures("BANKNIFTY")[0]["instrument_token"] == 1
+
+
+def test_index_chains(instrument_index):
+    assert instrument_index.expiries("BANKNIFTY") == [datetime.date(2024, 10, 30), datetime.date(2024, 11, 6)]
+    assert instrument_index.nearest_expiry("BANKNIFTY", on=datetime.date(2024, 10, 31)) == datetime.date(2024, 11, 6)
+    assert instrument_index.nearest_expiry("BANKNIFTY", on=datetime.date(2024, 12, 1)) is None
+
+    expiry = datetime.date(2024, 10, 30)
+    chain = instrument_index.chain("BANKNIFTY", expiry)
+    assert len(chain) == 21
+    assert chain[0][0] == 50000.0
+    assert chain[0][1]["instrument_type"] == "CE" and chain[0][2]["instrument_type"] == "PE"
+
+    assert instrument_index.atm("BANKNIFTY", expiry, 51240.5, "CE")["strike"] == 51200.0
+    assert instrument_index.atm("BANKNIFTY", expiry, 51260, "PE")["strike"] == 51300.0
+    assert instrument_index.atm("BANKNIFTY", expiry, 51240.5, "CE", offset=2)["strike"] == 51400.0
+    assert instrument_index.atm("BANKNIFTY", expiry, 99999, "CE")["strike"] == 52000.0
+    assert instrument_index.atm("BANKNIFTY", expiry, 99999, "CE", offset=1) is None
+    assert instrument_index.option("BANKNIFTY", expiry, 50500.0, "PE")["instrument_type"] == "PE"
+    assert instrument_index.chain("NIFTY", expiry) == []
+
+
+def test_unreadable_snapshot_is_downloaded(kiteconnect, instrument_cache, tmpdir):
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        records = instrument_cache.instruments("NFO")
+
+    path = instrument_cache._snapshot_path("NFO")
+    with open(path, "rb") as f:
+        data = f.read()
+    assert not data.startswith(b"\x80")
+
+    with open(path, "wb") as f:
+        f.write(data[:-10])
+
+    cache = InstrumentCache(kiteconnect, path=instrument_cache.path)
+    cache._now = instrument_cache._now
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV) as get:
+        assert cache.instruments("NFO") == records
+        assert get.call_count == 1
+
+
+def test_unwritable_snapshot_path(kiteconnect, tmpdir):
+    path = tmpdir.join("file")
+    path.write("")
+    cache = InstrumentCache(kiteconnect, path=str(path.join("instruments")))
+
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        assert len(cache.instruments("NFO")) == 3
+
+
+def test_default_path(kiteconnect, tmpdir, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+    assert InstrumentCache(kiteconnect).path == str(tmpdir.join("kiteconnect", "instruments"))
+
+
+def test_index_exchanges():
+    expiry = datetime.date(2024, 10, 29)
+    cds = dict(make_option(1, 84, "CE", expiry, name="USDINR"), exchange="CDS")
+    bcd = dict(make_option(2, 84, "CE", expiry, name="USDINR"), exchange="BCD")
+    future = dict(make_option(3, 0, "CE", expiry, name="USDINR"), exchange="CDS", instrument_type="FUT")
+    index = InstrumentIndex([cds, bcd, future])
+
+    assert index.exchanges("USDINR") == ["BCD", "CDS"]
+    assert index.option("USDINR", expiry, 84.0, "CE", exchange="CDS")["instrument_token"] == 1
+    assert index.option("USDINR", expiry, 84.0, "CE", exchange="BCD")["instrument_token"] == 2
+    assert index.atm("USDINR", expiry, 84.1, "CE", exchange="BCD")["instrument_token"] == 2
+    assert index.expiries("USDINR", exchange="BCD") == [expiry]
+    assert index.futures("USDINR", exchange="CDS")[0]["instrument_token"] == 3
+    assert index.futures("USDINR", exchange="BCD") == []
+
+    with pytest.raises(ValueError):
+        index.option("USDINR", expiry, 84.0, "CE")
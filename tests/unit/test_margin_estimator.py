@@ -0,0 +1,174 @@
+# coding: utf-8
+"""Margin estimator tests"""
+import time
+import pytest
+from mock import patch
+
+import kiteconnect.exceptions as ex
+from kiteconnect import MarginEstimator
+
+MARGINS = {"equity": {"net": 100000.0}, "commodity": {"net": 5000.0}}
+
+
+def order(tradingsymbol="NIFTY21JUN15000CE", quantity=50, transaction_type="SELL", exchange="NFO"):
+    return {"variety": "regular", "exchange": exchange, "tradingsymbol": tradingsymbol,
+            "transaction_type": transaction_type, "quantity": quantity, "product": "NRML", "order_type": "MARKET"}
+
+
+def basket(params, consider_positions=True, mode=None):
+    assert mode == "compact"
+    return {"initial": {"total": 0}, "final": {"total": 0},
+            "orders": [{"tradingsymbol": p["tradingsymbol"], "total": 1000.0 * p["quantity"]} for p in params]}
+
+
+def test_can_place_from_cache(kiteconnect):
+    estimator = MarginEstimator(kiteconnect)
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket) as basket_order_margins, \
+            patch.object(kiteconnect, "margins", return_value=dict(MARGINS, equity={"net": 90000.0})) as margins:
+        estimator.prefetch([order(), order("NIFTY21JUN15000PE")])
+        assert basket_order_margins.call_count == 1
+
+        # Quantities in the same bucket are scaled from the cached margin.
+        assert estimator.estimate(order(quantity=75)) == 75000
+        assert estimator.can_place(order(quantity=75), reserve=False)
+        assert not estimator.can_place(order(quantity=100), reserve=False)
+        assert estimator.can_place(order("NIFTY21JUN15000PE", quantity=25), reserve=False)
+        assert basket_order_margins.call_count == 1
+        assert margins.call_count == 1
+
+        # Orders which aren't cached are fetched.
+        assert estimator.estimate(order(transaction_type="BUY")) is None
+        assert estimator.can_place(order(transaction_type="BUY"), reserve=False)
+        assert basket_order_margins.call_count == 2
+
+        # Commodity orders use the commodity funds.
+        assert not estimator.can_place(order("CRUDEOIL21JUNFUT", quantity=10, exchange="MCX"))
+
+
+def test_approved_orders_are_reserved(kiteconnect):
+    estimator = MarginEstimator(kiteconnect, headroom=0)
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket), \
+            patch.object(kiteconnect, "margins", return_value=MARGINS) as margins:
+        estimator.prefetch([order()])
+
+        # Each order needs 60% of the funds, so only the first fits.
+        first = order(quantity=60)
+        assert estimator.can_place(first)
+        assert estimator.available() == 40000
+        assert [estimator.can_place(order(quantity=60)) for _ in range(4)] == [False] * 4
+
+        # Fetched funds don't include orders which aren't placed yet.
+        estimator.refresh_funds()
+        assert estimator.available() == 40000
+
+        # They include placed orders, whose reservations are dropped.
+        estimator.placed(first)
+        margins.return_value = dict(MARGINS, equity={"net": 40000.0})
+        estimator.refresh_funds()
+        assert estimator.available() == 40000
+        assert margins.call_count == 3
+
+        second = order(quantity=30)
+        assert estimator.can_place(second)
+        estimator.release(second)
+        assert estimator.available() == 40000
+
+
+def test_check_between_approvals_keeps_reservations(kiteconnect):
+    estimator = MarginEstimator(kiteconnect, headroom=0.1)
+    funds = {"equity": {"net": 100.0}}
+
+    def basket_units(params, consider_positions=True, mode=None):
+        return {"orders": [{"total": 95.0 * p["quantity"]} for p in params]}
+
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket_units), \
+            patch.object(kiteconnect, "margins", return_value=funds), \
+            patch.object(kiteconnect, "order_margins", return_value=[{"total": 95.0}]):
+        first, second = order(quantity=1), order(quantity=1)
+        assert estimator.can_place(first)
+
+        # The exact check started for the first order refreshes the funds.
+        assert estimator.check(first).result(timeout=1)
+        assert estimator.available() == 5
+        assert not estimator.can_place(second)
+
+    estimator.close()
+
+
+def test_funds_expire(kiteconnect):
+    estimator = MarginEstimator(kiteconnect, funds_ttl=0.05)
+    with patch.object(kiteconnect, "margins", return_value=MARGINS) as margins:
+        estimator.available()
+        estimator.available()
+        assert margins.call_count == 1
+
+        time.sleep(0.06)
+        estimator.available()
+        assert margins.call_count == 2
+
+
+def test_zero_quantity(kiteconnect):
+    estimator = MarginEstimator(kiteconnect)
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket):
+        estimator.prefetch([order(quantity=0)])
+
+    assert estimator.estimate(order(quantity=1)) is None
+    with pytest.raises(ex.InputException):
+        estimator.can_place(order(quantity=0))
+
+
+def test_price_moves_invalidate(kiteconnect):
+    estimator = MarginEstimator(kiteconnect, price_threshold=0.01)
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket):
+        estimator.prefetch([order()])
+
+    estimator.update_price("NFO", "NIFTY21JUN15000CE", 100)
+    estimator.update_price("NFO", "NIFTY21JUN15000CE", 100.9)
+    estimator.update_price("NFO", "NIFTY21JUN15000PE", 200)
+    assert estimator.estimate(order()) == 50000
+
+    estimator.update_price("NFO", "NIFTY21JUN15000CE", 101.5)
+    assert estimator.estimate(order()) is None
+
+
+def test_position_changes_invalidate(kiteconnect):
+    estimator = MarginEstimator(kiteconnect)
+    positions = {"net": [{"exchange": "NFO", "tradingsymbol": "NIFTY21JUN15000CE", "product": "NRML", "quantity": 0}]}
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket):
+        estimator.prefetch([order()])
+
+    estimator.update_positions(positions)
+    estimator.update_positions(positions)
+    assert estimator.estimate(order()) == 50000
+
+    positions["net"][0]["quantity"] = -50
+    estimator.update_positions(positions)
+    assert estimator.estimate(order()) is None
+
+
+def test_exact_check_near_available_funds(kiteconnect):
+    estimator = MarginEstimator(kiteconnect, headroom=0.1)
+    checks = []
+
+    def exact(params):
+        return [{"total": 990.0 * params[0]["quantity"]}]
+
+    estimator.on_check = lambda estimator, order, required, available: checks.append((required, available))
+
+    with patch.object(kiteconnect, "basket_order_margins", side_effect=basket), \
+            patch.object(kiteconnect, "margins", return_value=MARGINS), \
+            patch.object(kiteconnect, "order_margins", side_effect=exact) as order_margins:
+        estimator.prefetch([order()])
+        assert estimator.can_place(order(quantity=80), reserve=False)
+        assert order_margins.call_count == 0
+
+        assert estimator.can_place(order(quantity=95))
+        future = estimator.check(order(quantity=95))
+        assert future.result(timeout=1) is True
+        assert estimator.estimate(order(quantity=95)) == 94050
+        assert order_margins.call_count == 1
+
+        assert not estimator.check(order(quantity=200)).result(timeout=1)
+
+    assert checks[0] == (94050.0, 100000.0)
+    estimator.close()
@@ -0,0 +1,55 @@
+# coding: utf-8
+"""Market state book tests"""
+import struct
+
+from kiteconnect import MarketStateBook
+from tests.unit.test_ticker import frame, full_packet
+
+
+def test_get_returns_latest_state(kiteticker):
+    book = MarketStateBook()
+    full = kiteticker._parse_binary(frame(full_packet(408065, 150000)))[0]
+    book.update([full])
+
+    assert book.get(408065) == full
+    assert book.ltp(408065) == 1500.0
+    assert book.ltp(256265) is None
+    assert book.get(256265) is None
+
+    # An ltp tick updates the price and keeps the rest of the state.
+    kiteticker.on_ticks = book.on_ticks
+    kiteticker._on_message(None, frame(struct.pack(">2I", 408065, 150500)), True)
+
+    state = book.get(408065)
+    assert state["last_price"] == 1505.0
+    assert state["mode"] == "ltp"
+    assert state["ohlc"] == full["ohlc"]
+    assert state["depth"] == full["depth"]
+    assert state["oi"] == full["oi"]
+
+
+def test_snapshot(kiteticker):
+    book = MarketStateBook()
+    ticks = kiteticker._parse_binary(frame(struct.pack(">2I", 256265, 1500000), full_packet(408065, 150000)))
+    book.update(ticks)
+
+    assert book.snapshot() == {256265: ticks[0], 408065: ticks[1]}
+    assert book.snapshot([256265, 738561]) == {256265: ticks[0]}
+    assert len(book) == 2
+
+    book.clear()
+    assert book.snapshot() == {}
+    assert book.ltp(256265) is None
+
+
+def test_on_change(kiteticker):
+    book = MarketStateBook()
+    changes = []
+    book.on_change = lambda book, tokens: changes.append(tokens)
+
+    for prices in [(1500000, 150000), (1500000, 150100), (1500100, 150100)]:
+        book.update(kiteticker._parse_binary(frame(*[struct.pack(">2I", token, price)
+                                                     for token, price in zip((256265, 408065), prices)])))
+
+    assert changes == [[256265, 408065], [408065], [256265]]
+    assert book.updated_at(256265) is not None
@@ -0,0 +1,99 @@
+# coding: utf-8
+"""Order tracker tests"""
+import json
+import asyncio
+import pytest
+from mock import patch
+
+from kiteconnect import OrderTracker
+
+
+class Ticker(object):
+
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.on_order_update = None
+
+    def is_connected(self):
+        return self.connected
+
+
+def order(status, order_id="1", average_price=0, filled_quantity=0):
+    return {"order_id": order_id, "status": status, "average_price": average_price,
+            "filled_quantity": filled_quantity}
+
+
+def test_resolves_on_order_update(kiteconnect, kiteticker):
+    tracker = OrderTracker(kiteconnect, ticker=kiteticker)
+    updates = []
+    tracker.on_update = lambda tracker, order: updates.append(order["status"])
+    future = tracker.track("1")
+
+    for data in [order("OPEN"), order("COMPLETE", average_price=1500.5, filled_quantity=15)]:
+        kiteticker._parse_text_message(json.dumps({"type": "order", "data": data}))
+
+    assert future.result(timeout=1)["average_price"] == 1500.5
+    assert updates == ["OPEN", "COMPLETE"]
+    assert tracker.track("1") is not future
+    assert tracker.track("1").result(timeout=0)["filled_quantity"] == 15
+    tracker.close()
+
+
+def test_update_before_track(kiteconnect):
+    tracker = OrderTracker(kiteconnect, ticker=Ticker())
+    tracker.on_order_update(None, order("REJECTED", order_id="2"))
+
+    assert tracker.track("2").result(timeout=0)["status"] == "REJECTED"
+
+
+def test_polls_while_socket_is_down(kiteconnect):
+    ticker = Ticker(connected=False)
+    tracker = OrderTracker(kiteconnect, ticker=ticker, poll_initial_delay=0.01, poll_max_delay=0.04)
+    responses = [[order("OPEN")], Exception("timeout"), [order("OPEN"), order("COMPLETE", average_price=10)]]
+    calls = []
+
+    def order_history(order_id):
+        calls.append(order_id)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with patch.object(kiteconnect, "order_history", side_effect=order_history):
+        assert tracker.track("1").result(timeout=2)["average_price"] == 10
+
+    assert calls == ["1", "1", "1"]
+    tracker.close()
+
+
+def test_no_polling_while_socket_is_up(kiteconnect):
+    tracker = OrderTracker(kiteconnect, ticker=Ticker(), poll_initial_delay=0.01)
+    with patch.object(kiteconnect, "order_history") as order_history:
+        future = tracker.track("1")
+        with pytest.raises(Exception):
+            future.result(timeout=0.1)
+
+        assert order_history.call_count == 0
+
+    tracker.close()
+    assert future.cancelled()
+
+
+def test_wait(kiteconnect):
+    tracker = OrderTracker(kiteconnect, ticker=Ticker())
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, tracker.update, order("CANCELLED"))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await tracker.wait("1", timeout=0)
+
+        return await tracker.wait("1", timeout=1)
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(main())["status"] == "CANCELLED"
+    finally:
+        loop.close()
+        tracker.close()
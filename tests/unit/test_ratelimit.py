@@ -0,0 +1,79 @@
+# coding: utf-8
+"""Rate limiter tests"""
+import time
+import asyncio
+import threading
+import responses
+
+from kiteconnect import RateLimiter
+from kiteconnect.ratelimit import TokenBucket
+
+
+def test_route_groups():
+    limiter = RateLimiter()
+    assert limiter.group("market.quote.ltp") == "quote"
+    assert limiter.group("market.historical") == "historical"
+    assert limiter.group("order.place") == "orders"
+    assert limiter.group("portfolio.positions") == "default"
+
+
+def test_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+
+    waits = [bucket.reserve() for _ in range(3)]
+    # Reservations are handed out one slot apart.
+    assert 0.09 < waits[0] <= 0.1
+    assert 0.19 < waits[1] <= 0.2
+    assert 0.29 < waits[2] <= 0.3
+
+
+def test_acquire_across_threads():
+    limiter = RateLimiter(limits={"quote": 20})
+    start = time.monotonic()
+
+    threads = [threading.Thread(target=limiter.acquire, args=("market.quote",)) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 20 requests fit in the burst, the next 10 are paced at 20 per second.
+    assert time.monotonic() - start >= 0.45
+
+    m = limiter.metrics()["quote"]
+    assert m["requests"] == 30
+    assert m["queued"] == 0
+    assert 0.45 <= m["max_wait"] <= 0.5
+    assert limiter.metrics()["default"]["requests"] == 0
+
+
+def test_acquire_async():
+    limiter = RateLimiter(limits={"historical": 10}, burst={"historical": 1})
+
+    async def burst():
+        await asyncio.gather(*[limiter.acquire_async("market.historical") for _ in range(3)])
+
+    start = time.monotonic()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(burst())
+    finally:
+        loop.close()
+
+    assert time.monotonic() - start >= 0.19
+    assert limiter.metrics()["historical"]["requests"] == 3
+
+
+@responses.activate
+def test_request_uses_rate_limiter(kiteconnect):
+    kiteconnect.rate_limiter = RateLimiter()
+    responses.add(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["portfolio.positions"]),
+        body='{"status": "success", "data": {"net": [], "day": []}}',
+        content_type="application/json"
+    )
+    kiteconnect.positions()
+    assert kiteconnect.rate_limiter.metrics()["default"]["requests"] == 1
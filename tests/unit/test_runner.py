@@ -0,0 +1,147 @@
+# coding: utf-8
+"""Strategy runner tests"""
+import time
+import datetime
+import threading
+from mock import patch
+
+from kiteconnect import InstrumentCache, Strategy, StrategyRunner
+from tests.unit.test_instruments import INSTRUMENTS_CSV
+
+
+class Counter(Strategy):
+
+    def __init__(self, cycles, interval=0.01, fail=False, duration=0):
+        self.interval = interval
+        self.cycles = cycles
+        self.fail = fail
+        self.duration = duration
+        self.events = []
+        self.errors = []
+        self.done = threading.Event()
+        self.running = 0
+        self.overlapped = False
+
+    def setup(self, runner):
+        self.events.append("setup")
+
+    def signal(self, runner):
+        self.running += 1
+        self.overlapped = self.overlapped or self.running > 1
+        time.sleep(self.duration)
+        self.running -= 1
+
+        count = len([e for e in self.events if e == "signal"]) + 1
+        self.events.append("signal")
+        if self.fail and count == 1:
+            raise ValueError("no data")
+        return count
+
+    def orders(self, runner, signal):
+        self.events.append(("orders", signal))
+        if len(self.events) > self.cycles:
+            self.done.set()
+
+    def teardown(self, runner):
+        self.events.append("teardown")
+
+    def on_error(self, runner, exception):
+        self.errors.append(str(exception))
+
+
+def test_runs_strategies_on_their_intervals(kiteconnect):
+    runner = StrategyRunner(kiteconnect)
+    fast, slow = Counter(cycles=6), Counter(cycles=1, interval=60)
+    durations = []
+    runner.on_cycle = lambda runner, strategy, seconds: durations.append(strategy.name)
+    runner.add(fast)
+    runner.add(slow)
+
+    runner.start()
+    assert fast.done.wait(2)
+    runner.stop()
+
+    assert fast.events[0] == "setup"
+    assert fast.events[1:7] == ["signal", ("orders", 1), "signal", ("orders", 2), "signal", ("orders", 3)]
+    assert fast.events[-1] == "teardown"
+
+    # The slow strategy ran once when the runner started.
+    assert slow.events == ["setup", "signal", ("orders", 1), "teardown"]
+    assert durations.count("Counter") == (len(fast.events) - 2) // 2 + 1
+
+
+def test_failed_signal_skips_orders(kiteconnect):
+    runner = StrategyRunner(kiteconnect)
+    strategy = Counter(cycles=3, fail=True)
+    runner.add(strategy)
+
+    runner.start()
+    assert strategy.done.wait(2)
+    runner.stop()
+
+    assert strategy.errors == ["no data"]
+    assert strategy.events[1:4] == ["signal", "signal", ("orders", 2)]
+
+
+def test_slow_cycles_do_not_overlap(kiteconnect):
+    runner = StrategyRunner(kiteconnect)
+    strategy = Counter(cycles=4, interval=0.01, duration=0.035)
+    runner.add(strategy)
+
+    runner.start()
+    assert strategy.done.wait(2)
+    runner.stop()
+
+    assert not strategy.overlapped
+    assert runner.overruns >= 3
+
+
+def test_add_while_running(kiteconnect):
+    runner = StrategyRunner(kiteconnect)
+    runner.start()
+
+    strategy = Counter(cycles=2)
+    runner.add(strategy)
+    assert strategy.done.wait(2)
+    runner.stop()
+
+    assert strategy.events[0] == "setup"
+    assert strategy.events[-1] == "teardown"
+
+
+def test_index_is_reused(kiteconnect, tmpdir):
+    cache = InstrumentCache(kiteconnect, path=str(tmpdir))
+    cache._now = lambda: datetime.datetime(2024, 10, 21, 10, 0)
+    runner = StrategyRunner(kiteconnect, instruments=cache)
+
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV):
+        index = runner.index("NFO")
+        assert index.get(9604354)["tradingsymbol"] == "BANKNIFTY24OCT51000CE"
+        assert runner.index("NFO") is index
+
+        # An unchanged dump keeps the index.
+        cache.refresh("NFO")
+        assert runner.index("NFO") is index
+
+    with patch.object(kiteconnect, "_get", return_value=INSTRUMENTS_CSV.replace(b"24OCT", b"24NOV")):
+        cache.refresh("NFO")
+        assert runner.index("NFO").get(9604354)["tradingsymbol"] == "BANKNIFTY24NOV51000CE"
+
+
+def test_stop_from_a_hook(kiteconnect):
+    runner = StrategyRunner(kiteconnect)
+
+    class StopAtClose(Counter):
+
+        def orders(self, runner, signal):
+            Counter.orders(self, runner, signal)
+            runner.stop()
+
+    strategy = StopAtClose(cycles=0)
+    runner.add(strategy)
+    thread = runner.start()
+
+    assert strategy.done.wait(2)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert strategy.events == ["setup", "signal", ("orders", 1), "teardown"]
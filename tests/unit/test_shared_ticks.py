@@ -0,0 +1,75 @@
+# coding: utf-8
+"""Shared tick table tests"""
+import os
+import struct
+import multiprocessing
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import SharedTickTable
+from tests.unit.test_ticker import frame, full_packet
+
+pytest.importorskip("multiprocessing.shared_memory")
+
+
+@pytest.fixture()
+def table():
+    table = SharedTickTable("kite_test_{}".format(os.getpid()), capacity=2, create=True)
+    yield table
+    table.close()
+    table.unlink()
+
+
+def test_get_returns_written_ticks(table, kiteticker):
+    ticks = kiteticker._parse_binary(frame(
+        full_packet(408065, 150000),
+        struct.pack(">7I", 256265, 1500000, 1510000, 1490000, 1495000, 1480000, 0),
+        struct.pack(">2I", 5633 << 8 | 1, 123456)))
+
+    table.write(ticks)
+    reader = SharedTickTable(table.name)
+    try:
+        assert reader.get(408065) == ticks[0]
+        assert reader.get(256265) == ticks[1]
+        assert reader.value(408065, "volume_traded") == 1000
+        assert reader.value(408065, "last_trade_time") == ticks[0]["last_trade_time"]
+        assert reader.value(256265, "oi") is None
+        assert reader.get(738561) is None
+
+        # The table is full, so the third instrument is dropped.
+        assert sorted(reader.tokens()) == [256265, 408065]
+        assert table.dropped == 1
+
+        with pytest.raises(ex.InputException):
+            reader.value(408065, "depth")
+    finally:
+        reader.close()
+
+
+def test_sequence_changes_on_every_tick(table, kiteticker):
+    assert table.sequence(256265) == 0
+
+    for price in (1500000, 1500100):
+        table.write(kiteticker._parse_binary(frame(struct.pack(">2I", 256265, price))))
+
+    assert table.sequence(256265) == 2
+    assert table.value(256265, "last_price") == 15001.0
+
+
+def read_ltp(name, token, queue):
+    table = SharedTickTable(name)
+    queue.put(table.value(token, "last_price"))
+    table.close()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_read_from_another_process(table, kiteticker):
+    table.write(kiteticker._parse_binary(frame(struct.pack(">2I", 256265, 1500000))))
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=read_ltp, args=(table.name, 256265, queue))
+    process.start()
+    process.join(10)
+
+    assert queue.get(timeout=1) == 15000.0
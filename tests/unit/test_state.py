@@ -0,0 +1,94 @@
+# coding: utf-8
+"""State store tests"""
+import datetime
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import StateStore
+
+
+def journal(store):
+    with open(store.path, "rb") as f:
+        return f.read().splitlines()
+
+
+def test_state_survives_reopen(tmpdir):
+    path = str(tmpdir.join("state.jsonl"))
+    with StateStore(path) as store:
+        store.set("signal", {"EMA_Signal": "Buy", "close": 22150.5})
+        store.set("order", {"order_id": "1", "timestamp": datetime.datetime(2021, 5, 31, 9, 15)})
+        store.set("avg_price", 121.5)
+        store.delete("avg_price")
+        store.delete("missing")
+        assert len(journal(store)) == 4
+
+    store = StateStore(path)
+    assert store.items() == {
+        "signal": {"EMA_Signal": "Buy", "close": 22150.5},
+        "order": {"order_id": "1", "timestamp": "2021-05-31T09:15:00"},
+    }
+    assert "avg_price" not in store
+
+
+def test_batch_is_one_write(tmpdir):
+    store = StateStore(str(tmpdir.join("state.jsonl")))
+    with store.batch():
+        store.set("a", 1)
+        store.update({"b": 2, "c": 3})
+
+        # Nothing is written until the batch ends, but reads see the changes.
+        assert journal(store) == []
+        assert store.get("b") == 2
+
+    assert len(journal(store)) == 1
+    store.close()
+
+    assert StateStore(store.path).items() == {"a": 1, "b": 2, "c": 3}
+
+
+def test_partial_last_line_is_skipped(tmpdir):
+    path = str(tmpdir.join("state.jsonl"))
+    with StateStore(path) as store:
+        store.set("a", 1)
+        store.update({"a": 2, "b": 2})
+
+    # A crash in the middle of writing a batch.
+    with open(path, "ab") as f:
+        f.write(b'{"b":[{"k":"a","v":3},{"k":')
+
+    with StateStore(path) as store:
+        assert store.items() == {"a": 2, "b": 2}
+        store.set("c", 3)
+
+    assert StateStore(path).items() == {"a": 2, "b": 2, "c": 3}
+
+
+def test_corrupt_entry_raises(tmpdir):
+    path = str(tmpdir.join("state.jsonl"))
+    with open(path, "wb") as f:
+        f.write(b'{"k":"a","v":1}\n{"k":\n{"k":"b","v":2}\n')
+
+    with pytest.raises(ex.DataException):
+        StateStore(path)
+
+
+def test_compaction(tmpdir):
+    path = str(tmpdir.join("state.jsonl"))
+    store = StateStore(path, compact_after=10)
+    for i in range(11):
+        store.set("ltp", i)
+
+    assert journal(store) == [b'{"k":"ltp","v":10}']
+    assert not tmpdir.join("state.jsonl.tmp").exists()
+
+    store.set("avg_price", 121.5)
+    store.close()
+    assert StateStore(path).items() == {"ltp": 10, "avg_price": 121.5}
+
+
+def test_unserialisable_values_are_rejected(tmpdir):
+    store = StateStore(str(tmpdir.join("state.jsonl")))
+    with pytest.raises(TypeError):
+        store.set("a", object())
+
+    assert "a" not in store
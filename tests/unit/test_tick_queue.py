@@ -0,0 +1,102 @@
+# coding: utf-8
+"""Tick queue tests"""
+import struct
+import threading
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import TickQueue
+
+
+def tick(token, last_price):
+    return {"instrument_token": token, "last_price": last_price}
+
+
+def ltp_frame(*prices):
+    packets = [struct.pack(">2I", 256265, price) for price in prices]
+    return struct.pack(">H", len(packets)) + b"".join(struct.pack(">H", len(p)) + p for p in packets)
+
+
+def test_invalid_policy():
+    with pytest.raises(ex.InputException):
+        TickQueue(policy="latest")
+
+
+def test_drop_oldest():
+    queue = TickQueue(maxsize=2, policy=TickQueue.DROP_OLDEST)
+    queue.put([tick(1, 1), tick(1, 2), tick(2, 3)])
+
+    assert queue.get() == [tick(1, 2), tick(2, 3)]
+    assert queue.dropped == 1
+    assert queue.get(timeout=0) == []
+
+
+def test_conflate():
+    queue = TickQueue(maxsize=2, policy=TickQueue.CONFLATE)
+    queue.put([tick(1, 1), tick(2, 2), tick(1, 3)])
+    assert len(queue) == 2
+    assert queue.conflated == 1
+
+    # Token 1 keeps its place with its latest tick, and a new token drops the oldest one.
+    queue.put([tick(3, 4)])
+    assert queue.get() == [tick(2, 2), tick(3, 4)]
+    assert queue.dropped == 1
+
+
+def test_max_batch():
+    queue = TickQueue(max_batch=2)
+    queue.put([tick(1, i) for i in range(5)])
+
+    assert [len(queue.get()) for _ in range(3)] == [2, 2, 1]
+
+
+def test_block_waits_for_consumer():
+    queue = TickQueue(maxsize=2, policy=TickQueue.BLOCK)
+    producer = threading.Thread(target=queue.put, args=([tick(1, i) for i in range(5)],))
+    producer.start()
+
+    received = []
+    while len(received) < 5:
+        received.extend(queue.get(timeout=1))
+
+    producer.join(1)
+    assert [t["last_price"] for t in received] == list(range(5))
+    assert queue.dropped == 0
+
+
+def test_close_ends_consumer():
+    queue = TickQueue()
+    queue.put([tick(1, 1)])
+    queue.close()
+    queue.put([tick(1, 2)])
+
+    assert queue.get() == [tick(1, 1)]
+    assert queue.get() is None
+
+
+def test_ticker_calls_on_ticks_from_queue(kiteticker):
+    kiteticker.tick_queue = TickQueue(policy=TickQueue.CONFLATE)
+    called = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def on_ticks(ws, ticks):
+        calls.append((threading.current_thread().name, [t["last_price"] for t in ticks]))
+        called.set()
+        release.wait(1)
+
+    kiteticker.on_ticks = on_ticks
+
+    # The first message is delivered at once, the rest arrive while the callback is busy.
+    kiteticker._on_message(None, ltp_frame(100), True)
+    called.wait(1)
+
+    kiteticker._on_message(None, ltp_frame(101, 102), True)
+    kiteticker._on_message(None, ltp_frame(103), True)
+    release.set()
+
+    kiteticker.tick_queue.close()
+    kiteticker.tick_queue.join(1)
+
+    assert calls == [("kiteconnect-ticks", [1.0]), ("kiteconnect-ticks", [1.03])]
+    assert kiteticker.tick_queue.conflated == 2
@@ -2,7 +2,10 @@
 """Ticker tests"""
 import six
 import json
+import struct
+import pytest
 from mock import Mock
+from datetime import datetime
 from base64 import b64encode
 from hashlib import sha1
 
@@ -46,3 +49,130 @@ class TestTicker:
         assert protocol.state == protocol.STATE_OPEN
 
         protocol.sendMessage(six.b(json.dumps({"message": "blah"})))
+
+
+def frame(*packets):
+    """Build a binary ticker frame from a list of packets."""
+    return struct.pack(">H", len(packets)) + b"".join(struct.pack(">H", len(p)) + p for p in packets)
+
+
+def full_packet(instrument_token, last_price):
+    depth = b"".join(struct.pack(">IIH2x", 10 * (i + 1), last_price - 5 + i, i + 1) for i in range(10))
+    return struct.pack(">16I", instrument_token, last_price, 25, last_price - 2, 1000, 600, 400,
+                       last_price - 10, last_price + 10, last_price - 20, last_price - 100,
+                       1622431800, 5000, 5100, 4900, 1622431801) + depth
+
+
+def test_parse_binary(kiteticker):
+    nse, cds, index = 408065 << 8 | 1, 1 << 8 | 3, 256265 << 8 | 9
+    ticks = kiteticker._parse_binary(frame(
+        struct.pack(">2I", nse, 150050),
+        struct.pack(">8I", index, 1700000, 1710000, 1690000, 1695000, 0, 0, 1622431801),
+        struct.pack(">11I", cds, 750000000, 1, 749000000, 10, 20, 30, 740000000, 760000000, 730000000, 0),
+        full_packet(nse, 150050),
+        b"\x00" * 12,
+    ))
+
+    assert [t["mode"] for t in ticks] == ["ltp", "full", "quote", "full"]
+    assert ticks[0] == {"tradable": True, "mode": "ltp", "instrument_token": nse, "last_price": 1500.5}
+
+    assert ticks[1]["tradable"] is False
+    assert ticks[1]["ohlc"] == {"high": 17100.0, "low": 16900.0, "open": 16950.0, "close": 0.0}
+    assert ticks[1]["change"] == 0
+    assert ticks[1]["exchange_timestamp"] == datetime.fromtimestamp(1622431801)
+
+    assert ticks[2]["last_price"] == 75.0
+    assert ticks[2]["volume_traded"] == 10
+    assert "depth" not in ticks[2]
+
+    full = ticks[3]
+    assert full["ohlc"] == {"open": 1500.4, "high": 1500.6, "low": 1500.3, "close": 1499.5}
+    assert full["change"] == (1500.5 - 1499.5) * 100 / 1499.5
+    assert full["last_trade_time"] == datetime.fromtimestamp(1622431800)
+    assert (full["oi"], full["oi_day_high"], full["oi_day_low"]) == (5000, 5100, 4900)
+    assert full["depth"]["buy"][0] == {"quantity": 10, "price": 1500.45, "orders": 1}
+    assert full["depth"]["sell"][4] == {"quantity": 100, "price": 1500.54, "orders": 10}
+
+
+def test_parse_binary_truncated(kiteticker):
+    nse = 408065 << 8 | 1
+    data = frame(struct.pack(">2I", nse, 100), full_packet(nse, 150050))
+
+    # Incomplete packets at the end of a frame are skipped.
+    assert len(kiteticker._parse_binary(data[:-1])) == 1
+    assert kiteticker._parse_binary(b"\x00") == []
+
+
+def test_parse_binary_batch(kiteticker):
+    np = pytest.importorskip("numpy")
+    nse, cds, index = 408065 << 8 | 1, 1 << 8 | 3, 256265 << 8 | 9
+    data = frame(
+        struct.pack(">2I", nse, 150050),
+        struct.pack(">8I", index, 1700000, 1710000, 1690000, 1695000, 0, 0, 1622431801),
+        struct.pack(">11I", cds, 750000000, 1, 749000000, 10, 20, 30, 740000000, 760000000, 730000000, 0),
+        full_packet(nse, 150050),
+    )
+    batch = kiteticker._parse_binary_batch(data)
+    ticks = kiteticker._parse_binary(data)
+
+    assert batch["instrument_token"].tolist() == [t["instrument_token"] for t in ticks]
+    assert batch["mode"].tolist() == [t["mode"] for t in ticks]
+    assert batch["tradable"].tolist() == [True, False, True, True]
+    assert batch["last_price"].tolist() == [t["last_price"] for t in ticks]
+    assert batch["volume_traded"].tolist() == [0, 0, 10, 1000]
+    assert np.isnan(batch["close"][0]) and np.isnan(batch["change"][0])
+    assert batch["change"][1:].tolist() == [t["change"] for t in ticks[1:]]
+    assert batch["oi"].tolist() == [0, 0, 0, 5000]
+    assert batch["exchange_timestamp"].tolist() == [0, 1622431801 * 10 ** 9, 0, 1622431801 * 10 ** 9]
+
+    assert batch["depth"].shape == (4, 10, 3)
+    assert np.isnan(batch["depth"][:3]).all()
+    full = ticks[3]["depth"]
+    assert batch["depth"][3].tolist() == [[e["quantity"], e["price"], e["orders"]] for e in full["buy"] + full["sell"]]
+
+
+def test_on_tick_batch(kiteticker):
+    pytest.importorskip("numpy")
+    batches = []
+    kiteticker.on_tick_batch = lambda ws, batch: batches.append(batch)
+
+    kiteticker._on_message(None, frame(struct.pack(">2I", 408065 << 8 | 1, 150050)), True)
+    assert batches[0]["last_price"].tolist() == [1500.5]
+
+
+def test_parse_binary_lazy(kiteticker):
+    nse, index = 408065 << 8 | 1, 256265 << 8 | 9
+    data = frame(
+        struct.pack(">2I", nse, 150050),
+        struct.pack(">8I", index, 1700000, 1710000, 1690000, 1695000, 0, 0, 1622431801),
+        full_packet(nse, 150050),
+    )
+    ticks = kiteticker._parse_binary_lazy(data)
+
+    # Lazy ticks compare equal to, and have the same keys as, the dict ticks.
+    assert ticks == kiteticker._parse_binary(data)
+    assert [list(t) for t in ticks] == [list(t) for t in kiteticker._parse_binary(data)]
+
+    full = ticks[2]
+    assert full.instrument_token == nse
+    assert full.last_price == 1500.5
+    assert full["depth"]["buy"][0] == {"quantity": 10, "price": 1500.45, "orders": 1}
+    assert full.exchange_timestamp == datetime.fromtimestamp(1622431801)
+    assert full.get("missing") is None
+
+    assert "depth" not in ticks[0]
+    with pytest.raises(KeyError):
+        ticks[0]["depth"]
+    with pytest.raises(AttributeError):
+        ticks[0].depth
+
+
+def test_lazy_ticks_callback(kiteticker):
+    received = []
+    kiteticker.lazy_ticks = True
+    kiteticker.on_ticks = lambda ws, ticks: received.extend(ticks)
+
+    kiteticker._on_message(None, frame(struct.pack(">2I", 408065 << 8 | 1, 150050)), True)
+    assert type(received[0]).__name__ == "LazyTick"
+    assert dict(received[0]) == {"tradable": True, "mode": "ltp", "instrument_token": 408065 << 8 | 1,
+                                 "last_price": 1500.5}
@@ -0,0 +1,128 @@
+# coding: utf-8
+"""KiteTickerPool tests"""
+import json
+import struct
+import pytest
+
+import kiteconnect.exceptions as ex
+from kiteconnect import KiteTickerPool
+
+
+class FakeWebSocket(object):
+    """Records the messages a connection sends."""
+
+    STATE_OPEN = 3
+    STATE_CLOSED = 4
+
+    def __init__(self):
+        self.state = self.STATE_OPEN
+        self.messages = []
+
+    def sendMessage(self, payload, isBinary=False):  # noqa
+        self.messages.append(json.loads(payload))
+
+    def sendClose(self, code=None, reason=None):  # noqa
+        self.state = self.STATE_CLOSED
+
+
+def open_connection(pool, i):
+    ticker = pool.tickers[i]
+    ticker.ws = FakeWebSocket()
+    ticker._on_open(ticker.ws)
+    return ticker.ws
+
+
+def close_connection(pool, i):
+    ticker = pool.tickers[i]
+    ticker.ws.state = FakeWebSocket.STATE_CLOSED
+    ticker._on_close(ticker.ws, 1006, None)
+
+
+@pytest.fixture()
+def pool():
+    return KiteTickerPool("<API-KEY>", "<ACCESS-TOKEN>", connections=3, max_tokens=5)
+
+
+def test_subscribe_before_connect(pool):
+    pool.subscribe(list(range(1, 10)))
+    assert [load["tokens"] for load in pool.loads()] == [3, 3, 3]
+
+    # Tokens are sent with their mode when each connection opens.
+    pool.set_mode(pool.MODE_FULL, [1])
+    ws = open_connection(pool, pool.tickers.index(pool._owners[1]))
+    modes = {m["v"][0]: m["v"][1] for m in ws.messages if m["a"] == "mode"}
+    assert modes["full"] == [1]
+    assert len(modes["quote"]) == 2
+
+
+def test_balance_by_mode_weight():
+    pool = KiteTickerPool("<API-KEY>", "<ACCESS-TOKEN>", connections=2)
+    pool.set_mode(pool.MODE_FULL, [1])
+    pool.subscribe([2, 3, 4, 5])
+
+    # One full mode token weighs about as much as four quote mode tokens.
+    loads = pool.loads()
+    assert [load["tokens"] for load in loads] == [1, 4]
+    assert [load["weight"] for load in loads] == [184, 176]
+    assert pool.subscribed_tokens == {1: "full", 2: "quote", 3: "quote", 4: "quote", 5: "quote"}
+
+
+def test_capacity(pool):
+    pool.subscribe(list(range(15)))
+    with pytest.raises(ex.InputException):
+        pool.subscribe([100])
+
+    # Already subscribed tokens don't need room.
+    pool.set_mode(pool.MODE_LTP, [1, 2])
+
+
+def test_unsubscribe(pool):
+    pool.subscribe([1, 2, 3])
+    ws = open_connection(pool, 0)
+    assert pool._owners[1] is pool.tickers[0]
+
+    pool.unsubscribe([1, 2, 3])
+    assert pool.subscribed_tokens == {}
+    assert ws.messages[-1] == {"a": "unsubscribe", "v": [1]}
+
+
+def test_rebalance_on_close_and_open(pool):
+    pool.subscribe(list(range(1, 10)))
+    sockets = [open_connection(pool, i) for i in range(3)]
+
+    close_connection(pool, 2)
+    assert [load["tokens"] for load in pool.loads()] == [5, 4, 0]
+    moved = [t for m in sockets[0].messages + sockets[1].messages if m["a"] == "subscribe" for t in m["v"]]
+    assert sorted(moved) == list(range(1, 10))
+
+    # Once it reconnects, tokens are spread again and the open connections unsubscribe them.
+    sockets[2] = open_connection(pool, 2)
+    assert [load["tokens"] for load in pool.loads()] == [3, 3, 3]
+    assert {m["a"] for m in sockets[2].messages} == {"subscribe", "mode"}
+    assert any(m["a"] == "unsubscribe" for m in sockets[0].messages)
+
+
+def test_noreconnect_rebalances(pool):
+    pool.subscribe(list(range(1, 10)))
+    for i in range(3):
+        open_connection(pool, i)
+
+    pool.tickers[0]._on_noreconnect()
+    assert [load["tokens"] for load in pool.loads()] == [0, 5, 4]
+    assert len(pool.subscribed_tokens) == 9
+
+
+def test_merged_callbacks(pool):
+    events = []
+    pool.on_ticks = lambda ws, ticks: events.append((ws, ticks[0]["instrument_token"]))
+    pool.on_order_update = lambda ws, data: events.append((ws, data["order_id"]))
+
+    packet = struct.pack(">2I", 256, 100)
+    frame = struct.pack(">H", 1) + struct.pack(">H", len(packet)) + packet
+    order = json.dumps({"type": "order", "data": {"order_id": "1", "status": "COMPLETE"}})
+    for ticker in pool.tickers:
+        ticker._on_message(ticker.ws, frame, True)
+        ticker._on_message(ticker.ws, order, False)
+
+    # Ticks of every connection, and one copy of the order update.
+    assert events == [(pool, 256), (pool, "1"), (pool, 256), (pool, 256)]